@@ -12,6 +12,7 @@ def create_simulation():
     from models.simulation import Simulation
     from models.team import Team
     from services.league_service import initialize_league
+    from services.simulation_service import new_simulation_seed
     
     user_id = int(get_jwt_identity())  # Convert string identity back to int
     data = request.get_json()
@@ -30,6 +31,18 @@ def create_simulation():
     if num_teams not in [4, 6, 8, 10, 12]:
         return jsonify({'error': 'Number of teams must be 4, 6, 8, 10, or 12'}), 400
     
+    # Optional master seed - the same seed replays the same schedule, draft and games
+    seed = data.get('seed')
+    if seed is None:
+        seed = new_simulation_seed()
+    else:
+        try:
+            seed = int(seed)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Seed must be an integer'}), 400
+        if not 0 <= seed < 2 ** 63:
+            return jsonify({'error': 'Seed must be between 0 and 2^63 - 1'}), 400
+    
     # Create simulation
     simulation = Simulation(
         user_id=user_id,
@@ -39,7 +52,8 @@ def create_simulation():
         current_season=1,
         current_date=date(1980, 10, 1),  # Start in October 1980
         status='draft',
-        draft_pick=1
+        draft_pick=1,
+        seed=seed
     )
     
     db.session.add(simulation)
@@ -209,9 +223,121 @@ def simulate_to_playoffs(simulation_id):
     if not simulation or simulation.user_id != user_id:
         return jsonify({'error': 'Simulation not found or unauthorized'}), 404
     
+    data = request.get_json(silent=True) or {}
+    
+    if data.get('background'):
+        return _enqueue(simulation_id, user_id, 'simulate_to_playoffs', {'parallel': data.get('parallel')})
+    
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+    
     from services.game_service import simulate_season_to_playoffs
-    result = simulate_season_to_playoffs(simulation_id)
+    result = _run_with_progress(
+        simulation_id,
+        lambda progress: simulate_season_to_playoffs(
+            simulation_id, parallel=data.get('parallel'), progress=progress
+        )
+    )
+    
+    return jsonify(result), 200
+
+@bp.route('/<int:simulation_id>/simulate-to-date', methods=['POST'])
+@jwt_required()
+def simulate_to_date(simulation_id):
+    """Simulate regular season games up to and including a date"""
+    from models.simulation import Simulation
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        target_date = date.fromisoformat(str(data.get('date')))
+    except ValueError:
+        return jsonify({'error': 'date must be an ISO date (YYYY-MM-DD)'}), 400
+    
+    error = _regular_season_step_error(simulation)
+    if error:
+        return error
+    
+    from services.game_service import simulate_to_date as run_to_date
+    result = _run_with_progress(
+        simulation_id,
+        lambda progress: run_to_date(
+            simulation_id, target_date, parallel=data.get('parallel'), progress=progress
+        )
+    )
+    return jsonify(result), 200
+
+@bp.route('/<int:simulation_id>/simulate-days', methods=['POST'])
+@jwt_required()
+def simulate_days(simulation_id):
+    """Simulate the next N game-days of the regular season"""
+    from models.simulation import Simulation
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    days = data.get('days', 1)
+    if isinstance(days, bool) or not isinstance(days, int) or days < 1:
+        return jsonify({'error': 'days must be a positive integer'}), 400
+    
+    error = _regular_season_step_error(simulation)
+    if error:
+        return error
+    
+    from services.game_service import simulate_days as run_days
+    result = _run_with_progress(
+        simulation_id,
+        lambda progress: run_days(
+            simulation_id, days, parallel=data.get('parallel'), progress=progress
+        )
+    )
+    return jsonify(result), 200
+
+def _active_job_error(simulation_id):
+    """409 response while a background job owns the simulation, else None.
+    
+    Every synchronous simulation path checks this so a request never plays
+    games alongside a job on the same season.
+    """
+    from services.job_service import get_active_job
+    
+    if get_active_job(simulation_id):
+        return jsonify({'error': 'A simulation job is already queued or running'}), 409
+    return None
+
+def _regular_season_step_error(simulation):
+    """Error response if the regular season can't be stepped right now, else None"""
+    if simulation.status != 'season':
+        return jsonify({'error': 'Simulation is not in the regular season'}), 400
+    return _active_job_error(simulation.id)
+
+@bp.route('/<int:simulation_id>/games/<int:game_id>/replay', methods=['GET'])
+@jwt_required()
+def replay_game(simulation_id, game_id):
+    """Re-simulate a played game from its stored seed (debugging, nothing is saved)"""
+    from models.simulation import Simulation
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
     
+    from services.game_service import replay_game as replay
+    result = replay(simulation_id, game_id)
+    if 'error' in result:
+        status_code = 404 if result['error'] == 'Game not found' else 400
+        return jsonify(result), status_code
     return jsonify(result), 200
 
 @bp.route('/<int:simulation_id>/enter-playoffs', methods=['POST'])
@@ -247,6 +373,19 @@ def get_playoffs(simulation_id):
     result = get_playoff_bracket(simulation_id)
     return jsonify(result), 200
 
+def _finished_cup_winner(simulation):
+    """Cup winner of the playoffs just played, if they are over.
+
+    If the final just ended the season has already been advanced, so the
+    previous season's bracket is the one to check.
+    """
+    from services.playoff_service import playoff_bracket
+
+    check_season = simulation.current_season
+    if simulation.status == 'season':
+        check_season = simulation.current_season - 1
+    return playoff_bracket(simulation.id, check_season)['cup_winner']
+
 @bp.route('/<int:simulation_id>/playoffs/simulate-game', methods=['POST'])
 @jwt_required()
 def simulate_playoff_game(simulation_id):
@@ -261,6 +400,10 @@ def simulate_playoff_game(simulation_id):
     if not simulation or simulation.user_id != user_id:
         return jsonify({'error': 'Simulation not found or unauthorized'}), 404
 
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+
     # Get all active series in current round
     active_series = PlayoffSeries.query.filter_by(
         simulation_id=simulation_id,
@@ -271,9 +414,13 @@ def simulate_playoff_game(simulation_id):
     if not active_series:
         return jsonify({'error': 'No active playoff series'}), 400
 
+    # Load team payloads once for every series
+    from services.league_snapshot import LeagueSnapshot
+    snapshot = LeagueSnapshot(simulation_id)
+
     results = []
     for series in active_series:
-        result = sim_game(simulation_id, series.id)
+        result = sim_game(simulation_id, series.id, snapshot=snapshot)
         results.append(result)
 
     # Check for any errors
@@ -287,36 +434,8 @@ def simulate_playoff_game(simulation_id):
     
     # Check if playoffs are complete - find Stanley Cup winner
     # NOTE: sim_game may have called _check_and_advance_to_next_season internally
-    cup_winner = None
-    playoffs_complete = False
-    
-    # Determine which season to check - if we just advanced, check the previous season
-    check_season = simulation.current_season
-    if simulation.status == 'season':
-        check_season = simulation.current_season - 1
-    
-    # Find completed Stanley Cup Final
-    from models.team import Team
-    all_complete_series = PlayoffSeries.query.filter_by(
-        simulation_id=simulation_id,
-        season=check_season,
-        status='complete'
-    ).order_by(PlayoffSeries.round.desc()).all()
-    
-    for series_item in all_complete_series:
-        higher_team = Team.query.get(series_item.higher_seed_team_id)
-        lower_team = Team.query.get(series_item.lower_seed_team_id)
-        if higher_team and lower_team and higher_team.conference != lower_team.conference:
-            if series_item.winner_team_id:
-                winner_team = Team.query.get(series_item.winner_team_id)
-                if winner_team:
-                    playoffs_complete = True
-                    cup_winner = {
-                        'id': winner_team.id,
-                        'city': winner_team.city,
-                        'name': winner_team.name
-                    }
-            break
+    cup_winner = _finished_cup_winner(simulation)
+    playoffs_complete = cup_winner is not None
 
     return jsonify({
         'message': f'Simulated {len(results)} games',
@@ -332,7 +451,6 @@ def simulate_playoff_round(simulation_id):
     from extensions import db
     from models.simulation import Simulation
     from models.game import PlayoffSeries
-    from services.game_service import simulate_playoff_game as sim_game
 
     user_id = int(get_jwt_identity())
     simulation = Simulation.query.get(simulation_id)
@@ -340,6 +458,10 @@ def simulate_playoff_round(simulation_id):
     if not simulation or simulation.user_id != user_id:
         return jsonify({'error': 'Simulation not found or unauthorized'}), 404
 
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+
     # Get all active series
     active_series = PlayoffSeries.query.filter_by(
         simulation_id=simulation_id,
@@ -359,81 +481,20 @@ def simulate_playoff_round(simulation_id):
     if not round_series:
         return jsonify({'error': 'No active series in current round'}), 400
 
-    # Simulate games until the round is complete
-    total_games = 0
-    max_iterations = 100  # Safety limit to prevent infinite loops
-    iterations = 0
-
-    while iterations < max_iterations:
-        iterations += 1
-        games_this_iteration = 0
-        
-        # Get all active series in the current round (refresh from DB)
-        active_round_series = PlayoffSeries.query.filter_by(
-            simulation_id=simulation_id,
-            season=simulation.current_season,
-            round=current_round,
-            status='in_progress'
-        ).all()
-        
-        if not active_round_series:
-            # Round is complete
-            break
-        
-        # Simulate one game for each active series in the round
-        for series in active_round_series:
-            result = sim_game(simulation_id, series.id)
-            if 'error' not in result:
-                games_this_iteration += 1
-                total_games += 1
-            # If there's an error, we'll still continue with other series
-        
-        # If no games were simulated this iteration, break
-        if games_this_iteration == 0:
-            break
+    # Play the round's series to the end in memory - one engine call, one commit
+    from services.playoff_service import resolve_playoffs
+    from services.game_service import advance_season
+    resolved = resolve_playoffs(simulation_id, through_round=current_round)
+    total_games = resolved['games_simulated']
+    if resolved['playoffs_complete']:
+        advance_season(simulation)
 
     # Refresh simulation from DB to get latest status
     db.session.refresh(simulation)
     
     # Check if playoffs are complete - find Stanley Cup winner
-    # NOTE: By this point, _check_and_advance_to_next_season may have already been called
-    # inside sim_game when a series completed. So we need to check the PREVIOUS season
-    # (current_season - 1 if status is now 'season', otherwise current_season)
-    cup_winner = None
-    playoffs_complete = False
-    
-    # Determine which season to check - if we just advanced, check the previous season
-    check_season = simulation.current_season
-    if simulation.status == 'season':
-        # We may have just advanced, check previous season
-        check_season = simulation.current_season - 1
-    
-    # Find completed Stanley Cup Final (series with teams from different conferences)
-    from models.team import Team
-    all_complete_series = PlayoffSeries.query.filter_by(
-        simulation_id=simulation_id,
-        season=check_season,
-        status='complete'
-    ).order_by(PlayoffSeries.round.desc()).all()
-    
-    for series in all_complete_series:
-        higher_team = Team.query.get(series.higher_seed_team_id)
-        lower_team = Team.query.get(series.lower_seed_team_id)
-        if higher_team and lower_team and higher_team.conference != lower_team.conference:
-            # This is the Stanley Cup Final
-            if series.winner_team_id:
-                winner_team = Team.query.get(series.winner_team_id)
-                if winner_team:
-                    playoffs_complete = True
-                    cup_winner = {
-                        'id': winner_team.id,
-                        'city': winner_team.city,
-                        'name': winner_team.name
-                    }
-            break
-    
-    # _check_and_advance_to_next_season is already called inside sim_game when series complete
-    # No need to call it again here
+    cup_winner = _finished_cup_winner(simulation)
+    playoffs_complete = cup_winner is not None
 
     return jsonify({
         'message': f'Simulated round {current_round}',
@@ -444,6 +505,47 @@ def simulate_playoff_round(simulation_id):
         'cup_winner': cup_winner
     }), 200
 
+@bp.route('/<int:simulation_id>/playoffs/simulate-remaining', methods=['POST'])
+@jwt_required()
+def simulate_remaining_playoffs(simulation_id):
+    """Simulate every remaining playoff game in one transaction and advance the season"""
+    from models.simulation import Simulation
+    from models.team import Team
+    from services.playoff_service import resolve_playoffs
+    from services.game_service import advance_season
+
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+
+    if simulation.status != 'playoffs':
+        return jsonify({'error': 'Simulation is not in the playoffs'}), 400
+
+    resolved = resolve_playoffs(simulation_id)
+    cup_winner = None
+    if resolved['playoffs_complete']:
+        advance_season(simulation)
+        winner_team = Team.query.get(resolved['champion_id'])
+        cup_winner = {
+            'id': winner_team.id,
+            'city': winner_team.city,
+            'name': winner_team.name
+        }
+
+    return jsonify({
+        'message': f"Simulated {resolved['games_simulated']} playoff games",
+        'games_simulated': resolved['games_simulated'],
+        'simulation_status': simulation.status,
+        'playoffs_complete': resolved['playoffs_complete'],
+        'cup_winner': cup_winner
+    }), 200
+
 @bp.route('/<int:simulation_id>/simulate-season', methods=['POST'])
 @jwt_required()
 def simulate_full_season(simulation_id):
@@ -456,11 +558,263 @@ def simulate_full_season(simulation_id):
     if not simulation or simulation.user_id != user_id:
         return jsonify({'error': 'Simulation not found or unauthorized'}), 404
     
+    data = request.get_json(silent=True) or {}
+    if data.get('background'):
+        return _enqueue(simulation_id, user_id, 'simulate_season')
+    
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+    
     from services.game_service import simulate_full_season
-    result = simulate_full_season(simulation_id)
+    result = _run_with_progress(
+        simulation_id,
+        lambda progress: simulate_full_season(simulation_id, progress=progress)
+    )
+    
+    if 'error' in result:
+        return jsonify(result), 400
+    return jsonify(result), 200
+
+@bp.route('/<int:simulation_id>/simulate-seasons', methods=['POST'])
+@jwt_required()
+def simulate_seasons(simulation_id):
+    """Simulate several seasons back to back (default: the rest of the simulation)"""
+    from models.simulation import Simulation
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    seasons = data.get('seasons')
+    if seasons is not None and (isinstance(seasons, bool) or not isinstance(seasons, int) or seasons < 1):
+        return jsonify({'error': 'seasons must be a positive integer'}), 400
+    
+    if data.get('background'):
+        return _enqueue(simulation_id, user_id, 'simulate_seasons', {
+            'seasons': seasons,
+            'parallel': data.get('parallel')
+        })
+    
+    error = _active_job_error(simulation_id)
+    if error:
+        return error
+    
+    from services.dynasty_service import simulate_seasons as run_seasons
+    result = _run_with_progress(
+        simulation_id,
+        lambda progress: run_seasons(
+            simulation_id, seasons=seasons, parallel=data.get('parallel'), progress=progress
+        )
+    )
     
+    if 'error' in result:
+        return jsonify(result), 400
     return jsonify(result), 200
 
+def _run_with_progress(simulation_id, run):
+    """Run a simulation inside the request, pushing progress to open streams"""
+    from services.progress_service import progress_publisher, publish_finished
+    
+    try:
+        result = run(progress_publisher(simulation_id))
+    except Exception as e:
+        publish_finished(simulation_id, 'failed', error=str(e))
+        raise
+    publish_finished(simulation_id, 'completed', result)
+    return result
+
+def _enqueue(simulation_id, user_id, job_type, params=None):
+    from services.job_service import enqueue_job
+    
+    job, error = enqueue_job(simulation_id, user_id, job_type, params)
+    if error:
+        status_code = 409 if 'already' in error else 400
+        return jsonify({'error': error}), status_code
+    return jsonify({'job_id': job.id, 'job': job.to_dict()}), 202
+
+@bp.route('/<int:simulation_id>/jobs', methods=['GET', 'POST'])
+@jwt_required()
+def simulation_jobs(simulation_id):
+    """List a simulation's background jobs, or enqueue a new one"""
+    from models.simulation import Simulation
+    from models.job import SimulationJob
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if not data.get('job_type'):
+            return jsonify({'error': 'Missing job_type'}), 400
+        return _enqueue(simulation_id, user_id, data['job_type'], data.get('params'))
+    
+    jobs = SimulationJob.query.filter_by(simulation_id=simulation_id)\
+        .order_by(SimulationJob.id.desc())\
+        .limit(20)\
+        .all()
+    return jsonify({'jobs': [job.to_dict() for job in jobs]}), 200
+
+@bp.route('/<int:simulation_id>/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_simulation_job(simulation_id, job_id):
+    """Get status and progress of a background job"""
+    from models.simulation import Simulation
+    from models.job import SimulationJob
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    job = SimulationJob.query.filter_by(id=job_id, simulation_id=simulation_id).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job': job.to_dict()}), 200
+
+@bp.route('/<int:simulation_id>/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_simulation_job(simulation_id, job_id):
+    """Cancel a queued job, or stop a running one at its next checkpoint"""
+    from models.simulation import Simulation
+    from models.job import SimulationJob
+    from services.job_service import cancel_job, ACTIVE_STATUSES
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    job = SimulationJob.query.filter_by(id=job_id, simulation_id=simulation_id).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status not in ACTIVE_STATUSES:
+        return jsonify({'error': f'Job already {job.status}'}), 400
+    
+    job = cancel_job(job)
+    return jsonify({'job': job.to_dict()}), 200
+
+@bp.route('/<int:simulation_id>/progress-stream', methods=['GET'])
+@jwt_required()
+def progress_stream(simulation_id):
+    """Server-sent events with simulation progress, pushed by the simulation loop.
+    
+    Sends 'progress' events (games done/total, current date, latest scores)
+    and a final 'finished' event. When idle the stream checks the
+    simulation_jobs row, so jobs running in another process still report.
+    """
+    import json
+    import queue
+    from flask import Response, stream_with_context
+    from extensions import db
+    from config import Config
+    from models.simulation import Simulation
+    from models.job import SimulationJob
+    from services.job_service import get_active_job, ACTIVE_STATUSES
+    from services.progress_service import broker, progress_event
+    
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+    
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+    
+    subscriber = broker.subscribe(simulation_id)
+    # Don't hold a database connection for the lifetime of the stream
+    db.session.rollback()
+    
+    def sse(event):
+        return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    def generate():
+        watched_job_id = None
+        try:
+            # Sent right away so clients know they are subscribed before starting a run
+            yield ': connected\n\n'
+            latest = broker.latest(simulation_id)
+            if latest and latest['type'] == 'progress':
+                yield sse(latest)
+            
+            while True:
+                try:
+                    event = subscriber.get(timeout=Config.PROGRESS_HEARTBEAT)
+                except queue.Empty:
+                    if watched_job_id:
+                        job = SimulationJob.query.get(watched_job_id)
+                    else:
+                        job = get_active_job(simulation_id)
+                    db.session.rollback()
+                    
+                    if job is None:
+                        yield ': keepalive\n\n'
+                        continue
+                    watched_job_id = job.id
+                    if job.status not in ACTIVE_STATUSES:
+                        yield sse({'type': 'finished', 'status': job.status,
+                                   'result': job.result, 'error': job.error})
+                        break
+                    if job.progress_stage:
+                        yield sse(progress_event(job.progress_stage, job.progress_done, job.progress_total))
+                    else:
+                        yield ': keepalive\n\n'
+                    continue
+                
+                yield sse(event)
+                if event['type'] == 'finished':
+                    break
+        finally:
+            broker.unsubscribe(simulation_id, subscriber)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/<int:simulation_id>/export/<table>', methods=['GET'])
+@jwt_required()
+def export_table(simulation_id, table):
+    """Stream one of the simulation's tables as CSV, NDJSON or Parquet.
+
+    Rows are read with a server-side cursor and sent batch by batch, so the
+    response starts right away and memory stays flat.
+    """
+    from flask import Response, stream_with_context
+    from models.simulation import Simulation
+    from services.export_service import FORMATS, TABLES, export_chunks, parquet_available
+
+    user_id = int(get_jwt_identity())
+    simulation = Simulation.query.get(simulation_id)
+
+    if not simulation or simulation.user_id != user_id:
+        return jsonify({'error': 'Simulation not found or unauthorized'}), 404
+
+    fmt = request.args.get('format', 'csv')
+    if table not in TABLES:
+        return jsonify({'error': f"Unknown table '{table}'. Use one of: {', '.join(TABLES)}"}), 400
+    if fmt not in FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}"}), 400
+    if fmt == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export needs pyarrow installed on the server'}), 501
+
+    mimetype, extension = FORMATS[fmt]
+    return Response(
+        stream_with_context(export_chunks(simulation_id, table, fmt)),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="simulation-{simulation_id}-{table}.{extension}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @bp.route('/<int:simulation_id>/simulation-progress', methods=['GET'])
 @jwt_required()
 def get_simulation_progress(simulation_id):
@@ -1,6 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func, desc
+from services.response_cache import versioned_response
 
 bp = Blueprint('stats', __name__)
 
@@ -14,19 +14,74 @@ def calculate_player_overall(position, is_goalie, off, def_val, phys, lead, cons
     phys_component = phys * 0.9 * (lead / 100.0) * (const / 100.0)
     return round((off_component + def_component + phys_component) / 2.5, 1)
 
+def _stat_line(row):
+    """Stats page entry for a player_totals row"""
+    stat = row._mapping
+    stat_dict = {
+        'player_id': stat['player_id'],
+        'player_name': stat['player_name'],
+        'player_overall': calculate_player_overall(
+            stat['position'], stat['is_goalie'], stat['off'], stat['def_val'], stat['phys'], stat['lead'], stat['const']
+        ),
+        'position': stat['position'],
+        'team_id': stat['team_id'],
+        'team_name': stat['team_name'],
+        'games_played': stat['games_played'],
+        'goals': stat['goals'],
+        'assists': stat['assists'],
+        'points': stat['goals'] + stat['assists'],  # Points = goals + assists
+        'plus_minus': stat['plus_minus'],
+        'hits': stat['hits'],
+        'blocks': stat['blocks'],
+        'shots': stat['shots'],
+        'time_on_ice': stat['time_on_ice'],
+        'takeaways': stat['takeaways'],
+        'giveaways': stat['giveaways'],
+        'saves': stat['saves'],
+        'goals_against': stat['goals_against'],
+        'shots_against': stat['shots_against'],
+        'wins': stat['wins'] if stat['position'] == 'G' else None
+    }
+    
+    # Calculate save percentage and GAA for goalies
+    if stat['position'] == 'G' and stat['shots_against'] > 0:
+        stat_dict['save_percentage'] = round(stat['saves'] / stat['shots_against'] * 100, 3)
+        stat_dict['goals_against_average'] = round(stat['goals_against'] / (stat['games_played'] or 1), 2) if stat['games_played'] else 0.0
+    else:
+        stat_dict['save_percentage'] = None
+        stat_dict['goals_against_average'] = None
+    return stat_dict
+
+POSITION_FILTERS = {
+    'forward': ['C', 'LW', 'RW'],
+    'defenseman': ['LD', 'RD'],
+    'skater': ['C', 'LW', 'RW', 'LD', 'RD'],
+    'goalie': ['G'],
+}
+
+def _leaderboard_args():
+    """sort_by / order / limit / cursor query parameters for player_totals"""
+    return {
+        'sort_by': request.args.get('sort_by'),
+        'order': request.args.get('order'),
+        'limit': request.args.get('limit', default=100, type=int),
+        'cursor': request.args.get('cursor')
+    }
+
 @bp.route('/season/<int:simulation_id>', methods=['GET'])
 @jwt_required()
+@versioned_response
 def get_season_stats(simulation_id):
     """Get current season stats"""
     from extensions import db
-    from models.game import PlayerStat, Game
     from models.player import Player
     from models.team import Team, Roster
     from models.simulation import Simulation
+    from services.stats_service import MAX_PAGE_SIZE, player_totals
     
     season = request.args.get('season', type=int)
     team_id = request.args.get('team_id', type=int)
-    position_filter = request.args.get('position_filter')  # 'forward', 'defenseman', or None
+    position_filter = request.args.get('position_filter')  # 'forward', 'defenseman', 'skater', 'goalie' or None
     game_type = request.args.get('game_type', default='regular')  # 'regular', 'playoff', or 'all'
     
     # If no season specified, use current_season from simulation
@@ -35,68 +90,24 @@ def get_season_stats(simulation_id):
         if simulation:
             season = simulation.current_season
     
-    # Build base query with Game join (needed for filtering and wins calculation)
-    # Note: Player.overall is calculated, not a column - we need the raw attributes
-    base_query = db.session.query(
-        Player.id,
-        Player.name,
-        Player.position,
-        Player.is_goalie,
-        Player.off,
-        Player.def_.label('def_val'),
-        Player.phys,
-        Player.lead,
-        Player.const,
-        Team.id.label('team_id'),
-        Team.name.label('team_name'),
-        Game.id.label('game_id'),
-        Game.home_team_id,
-        Game.away_team_id,
-        Game.home_score,
-        Game.away_score,
-        Game.is_playoff,
-        PlayerStat.goals,
-        PlayerStat.assists,
-        PlayerStat.plus_minus,
-        PlayerStat.hits,
-        PlayerStat.blocks,
-        PlayerStat.shots,
-        PlayerStat.time_on_ice,
-        PlayerStat.takeaways,
-        PlayerStat.giveaways,
-        # Goalie stats
-        PlayerStat.saves,
-        PlayerStat.goals_against,
-        PlayerStat.shots_against
-    ).join(PlayerStat, Player.id == PlayerStat.player_id)\
-     .join(Team, PlayerStat.team_id == Team.id)\
-     .join(Game, PlayerStat.game_id == Game.id)\
-     .filter(Team.simulation_id == simulation_id)
-    
-    # Apply filters - always filter by season (current_season if not specified)
-    if season:
-        base_query = base_query.filter(Game.season == season)
+    positions = POSITION_FILTERS.get(position_filter)
+    leaderboard_args = _leaderboard_args()
     
-    # Filter by game type (regular season vs playoffs)
-    if game_type == 'regular':
-        base_query = base_query.filter(Game.is_playoff == False)
-    elif game_type == 'playoff':
-        base_query = base_query.filter(Game.is_playoff == True)
-    # If game_type == 'all', don't filter by is_playoff
-    
-    if team_id:
-        base_query = base_query.filter(Team.id == team_id)
-    
-    if position_filter == 'forward':
-        base_query = base_query.filter(Player.position.in_(['C', 'LW', 'RW']))
-    elif position_filter == 'defenseman':
-        base_query = base_query.filter(Player.position.in_(['LD', 'RD']))
-    
-    # Get all rows for aggregation
-    all_rows = base_query.all()
+    # Grouped, sorted and paged in the database
+    try:
+        top_rows, next_cursor = player_totals(
+            simulation_id,
+            game_type=game_type,
+            season=season,
+            team_id=team_id,
+            positions=positions,
+            **leaderboard_args
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # If no stats found, return all rostered players with 0 stats
-    if len(all_rows) == 0:
+    if len(top_rows) == 0 and not request.args.get('cursor'):
         # Get all players from rosters for the simulation
         roster_query = db.session.query(
             Player.id,
@@ -117,10 +128,8 @@ def get_season_stats(simulation_id):
         if team_id:
             roster_query = roster_query.filter(Team.id == team_id)
         
-        if position_filter == 'forward':
-            roster_query = roster_query.filter(Player.position.in_(['C', 'LW', 'RW']))
-        elif position_filter == 'defenseman':
-            roster_query = roster_query.filter(Player.position.in_(['LD', 'RD']))
+        if positions:
+            roster_query = roster_query.filter(Player.position.in_(positions))
         
         rostered_players = roster_query.all()
         
@@ -152,298 +161,56 @@ def get_season_stats(simulation_id):
             }
             result_stats.append(stat_dict)
         
-        # Sort by overall rating (descending) for initial display
+        # Every stat ties at 0 whatever sort_by is, so sort by overall rating (descending) for initial display
         result_stats.sort(key=lambda x: x.get('player_overall') or 0, reverse=True)
+        limit = max(1, min(leaderboard_args['limit'], MAX_PAGE_SIZE))
         
         return jsonify({
-            'stats': result_stats[:100]
+            'stats': result_stats[:limit],
+            'next_cursor': None
         }), 200
     
-    # Aggregate stats by player
-    player_stats_dict = {}
-    for row in all_rows:
-        player_id = row.id
-        if player_id not in player_stats_dict:
-            player_stats_dict[player_id] = {
-                'player_id': row.id,
-                'player_name': row.name,
-                'position': row.position,
-                'player_overall': calculate_player_overall(
-                    row.position, row.is_goalie, row.off, row.def_val, row.phys, row.lead, row.const
-                ),
-                'team_id': row.team_id,
-                'team_name': row.team_name,
-                'games_played': 0,
-                'goals': 0,
-                'assists': 0,
-                'points': 0,
-                'plus_minus': 0,
-                'hits': 0,
-                'blocks': 0,
-                'shots': 0,
-                'time_on_ice': 0,
-                'takeaways': 0,
-                'giveaways': 0,
-                'saves': 0,
-                'goals_against': 0,
-                'shots_against': 0,
-                'wins': 0,
-                'game_ids': set()
-            }
-        
-        stat = player_stats_dict[player_id]
-        
-        # Track unique games
-        is_new_game = row.game_id not in stat['game_ids']
-        if is_new_game:
-            stat['game_ids'].add(row.game_id)
-            stat['games_played'] += 1
-            
-            # Calculate wins for goalies
-            if row.position == 'G':
-                # Determine if goalie's team won
-                goalie_team_id = row.team_id
-                if goalie_team_id == row.home_team_id:
-                    # Goalie is on home team
-                    if row.home_score is not None and row.away_score is not None and row.home_score > row.away_score:
-                        stat['wins'] += 1
-                elif goalie_team_id == row.away_team_id:
-                    # Goalie is on away team
-                    if row.home_score is not None and row.away_score is not None and row.away_score > row.home_score:
-                        stat['wins'] += 1
-        
-        # Accumulate stats (these can be per-period or per-game, so always add)
-        stat['goals'] += row.goals or 0
-        stat['assists'] += row.assists or 0
-        stat['plus_minus'] += row.plus_minus or 0
-        stat['hits'] += row.hits or 0
-        stat['blocks'] += row.blocks or 0
-        stat['shots'] += row.shots or 0
-        stat['time_on_ice'] += row.time_on_ice or 0
-        stat['takeaways'] += row.takeaways or 0
-        stat['giveaways'] += row.giveaways or 0
-        stat['saves'] += row.saves or 0
-        stat['goals_against'] += row.goals_against or 0
-        stat['shots_against'] += row.shots_against or 0
-    
-    # Convert to list and calculate percentages
-    result_stats = []
-    for player_id, stat in player_stats_dict.items():
-        stat_dict = {
-            'player_id': stat['player_id'],
-            'player_name': stat['player_name'],
-            'player_overall': stat['player_overall'],
-            'team_name': stat['team_name'],
-            'position': stat['position'],
-            'games_played': stat['games_played'],
-            'goals': stat['goals'],
-            'assists': stat['assists'],
-            'points': stat['goals'] + stat['assists'],  # Points = goals + assists
-            'plus_minus': stat['plus_minus'],
-            'hits': stat['hits'],
-            'blocks': stat['blocks'],
-            'shots': stat['shots'],
-            'time_on_ice': stat['time_on_ice'],
-            'takeaways': stat['takeaways'],
-            'giveaways': stat['giveaways'],
-            'saves': stat['saves'],
-            'goals_against': stat['goals_against'],
-            'shots_against': stat['shots_against'],
-            'wins': stat['wins'] if stat['position'] == 'G' else None
-        }
-        
-        # Calculate save percentage and GAA for goalies
-        if stat['position'] == 'G' and stat['shots_against'] > 0:
-            stat_dict['save_percentage'] = round(stat['saves'] / stat['shots_against'] * 100, 3)
-            stat_dict['goals_against_average'] = round(stat['goals_against'] / (stat['games_played'] or 1), 2) if stat['games_played'] else 0.0
-        else:
-            stat_dict['save_percentage'] = None
-            stat_dict['goals_against_average'] = None
-        
-        result_stats.append(stat_dict)
-    
-    # Sort: goalies by save_percentage (desc), skaters by points (desc)
-    # Frontend will filter by viewMode, so this is just for initial ordering
-    result_stats.sort(key=lambda x: (
-        x['save_percentage'] if x['position'] == 'G' and x['save_percentage'] is not None else 0,
-        x['points'] if x['position'] != 'G' else 0
-    ), reverse=True)
-    
+    # Default order: goalies by save_percentage (desc), skaters by points (desc)
     return jsonify({
-        'stats': result_stats[:100]
+        'stats': [_stat_line(row) for row in top_rows],
+        'next_cursor': next_cursor
     }), 200
 
 @bp.route('/all-time/<int:simulation_id>', methods=['GET'])
 @jwt_required()
+@versioned_response
 def get_alltime_stats(simulation_id):
     """Get all-time stats across all seasons"""
-    from extensions import db
-    from models.game import PlayerStat, Game
-    from models.player import Player
-    from models.team import Team
+    from services.stats_service import player_totals
     
     game_type = request.args.get('game_type', default='regular')  # 'regular', 'playoff', or 'all'
+    position_filter = request.args.get('position_filter')  # 'forward', 'defenseman', 'skater', 'goalie'
+    team_id = request.args.get('team_id', type=int)
     
     try:
-        # Build base query with Game join (needed for wins calculation for goalies)
-        base_query = db.session.query(
-            Player.id,
-            Player.name,
-            Player.position,
-            Player.is_goalie,
-            Player.off,
-            Player.def_.label('def_val'),
-            Player.phys,
-            Player.lead,
-            Player.const,
-            Team.id.label('team_id'),
-            Team.name.label('team_name'),
-            Game.id.label('game_id'),
-            Game.home_team_id,
-            Game.away_team_id,
-            Game.home_score,
-            Game.away_score,
-            Game.is_playoff,
-            PlayerStat.goals,
-            PlayerStat.assists,
-            PlayerStat.plus_minus,
-            PlayerStat.hits,
-            PlayerStat.blocks,
-            PlayerStat.shots,
-            # Goalie stats
-            PlayerStat.saves,
-            PlayerStat.goals_against,
-            PlayerStat.shots_against
-        ).join(PlayerStat, Player.id == PlayerStat.player_id)\
-         .join(Team, PlayerStat.team_id == Team.id)\
-         .join(Game, PlayerStat.game_id == Game.id)\
-         .filter(Team.simulation_id == simulation_id)
+        # Summed over every season, sorted and paged in the database
+        top_rows, next_cursor = player_totals(
+            simulation_id,
+            game_type=game_type,
+            team_id=team_id,
+            positions=POSITION_FILTERS.get(position_filter),
+            **_leaderboard_args()
+        )
         
-        # Filter by game type (regular season vs playoffs)
-        if game_type == 'regular':
-            base_query = base_query.filter(Game.is_playoff == False)
-        elif game_type == 'playoff':
-            base_query = base_query.filter(Game.is_playoff == True)
-        # If game_type == 'all', don't filter by is_playoff
-        
-        # Get all rows for aggregation
-        all_rows = base_query.all()
-        
-        # Aggregate stats by player
-        player_stats_dict = {}
-        for row in all_rows:
-            player_id = row.id
-            if player_id not in player_stats_dict:
-                player_stats_dict[player_id] = {
-                    'player_id': row.id,
-                    'player_name': row.name,
-                    'position': row.position,
-                    'player_overall': calculate_player_overall(
-                        row.position, row.is_goalie, row.off, row.def_val, row.phys, row.lead, row.const
-                    ),
-                    'team_id': row.team_id,
-                    'team_name': row.team_name,
-                    'games_played': 0,
-                    'goals': 0,
-                    'assists': 0,
-                    'points': 0,
-                    'plus_minus': 0,
-                    'hits': 0,
-                    'blocks': 0,
-                    'shots': 0,
-                    'saves': 0,
-                    'goals_against': 0,
-                    'shots_against': 0,
-                    'wins': 0,
-                    'game_ids': set()
-                }
-            
-            stat = player_stats_dict[player_id]
-            
-            # Track unique games
-            is_new_game = row.game_id not in stat['game_ids']
-            if is_new_game:
-                stat['game_ids'].add(row.game_id)
-                stat['games_played'] += 1
-                
-                # Calculate wins for goalies
-                if row.position == 'G':
-                    # Determine if goalie's team won
-                    goalie_team_id = row.team_id
-                    if goalie_team_id == row.home_team_id:
-                        # Goalie is on home team
-                        if row.home_score is not None and row.away_score is not None and row.home_score > row.away_score:
-                            stat['wins'] += 1
-                    elif goalie_team_id == row.away_team_id:
-                        # Goalie is on away team
-                        if row.home_score is not None and row.away_score is not None and row.away_score > row.home_score:
-                            stat['wins'] += 1
-            
-            # Accumulate stats
-            stat['goals'] += row.goals or 0
-            stat['assists'] += row.assists or 0
-            stat['plus_minus'] += row.plus_minus or 0
-            stat['hits'] += row.hits or 0
-            stat['blocks'] += row.blocks or 0
-            stat['shots'] += row.shots or 0
-            stat['saves'] += row.saves or 0
-            stat['goals_against'] += row.goals_against or 0
-            stat['shots_against'] += row.shots_against or 0
-        
-        # Convert to list and calculate percentages
-        result_stats = []
-        for player_id, stat in player_stats_dict.items():
-            stat_dict = {
-                'player_id': stat['player_id'],
-                'player_name': stat['player_name'],
-                'player_overall': stat['player_overall'],
-                'position': stat['position'],
-                'team_id': stat['team_id'],
-                'team_name': stat['team_name'],
-                'games_played': stat['games_played'],
-                'goals': stat['goals'],
-                'assists': stat['assists'],
-                'points': stat['goals'] + stat['assists'],  # Points = goals + assists
-                'plus_minus': stat['plus_minus'],
-                'hits': stat['hits'],
-                'blocks': stat['blocks'],
-                'shots': stat['shots'],
-                'saves': stat['saves'],
-                'goals_against': stat['goals_against'],
-                'shots_against': stat['shots_against'],
-                'wins': stat['wins'] if stat['position'] == 'G' else None
-            }
-            
-            # Calculate save percentage and GAA for goalies
-            if stat['position'] == 'G' and stat['shots_against'] > 0:
-                stat_dict['save_percentage'] = round(stat['saves'] / stat['shots_against'] * 100, 3)
-                stat_dict['goals_against_average'] = round(stat['goals_against'] / (stat['games_played'] or 1), 2) if stat['games_played'] else 0.0
-            else:
-                stat_dict['save_percentage'] = None
-                stat_dict['goals_against_average'] = None
-            
-            result_stats.append(stat_dict)
-        
-        # Sort: goalies by save_percentage (desc), skaters by points (desc)
-        result_stats.sort(key=lambda x: (
-            x['save_percentage'] if x['position'] == 'G' and x['save_percentage'] is not None else 0,
-            x['points'] if x['position'] != 'G' else 0
-        ), reverse=True)
-        
-        return jsonify({
-            'stats': result_stats[:100]
-        }), 200
-    except Exception as e:
-        # If there's an error (e.g., no data yet, database issue), return empty list
-        print(f"Error in get_alltime_stats: {e}")
-        import traceback
-        traceback.print_exc()
         return jsonify({
-            'stats': []
+            'stats': [_stat_line(row) for row in top_rows],
+            'next_cursor': next_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception:
+        # Not a 200, so versioned_response never caches the failure
+        current_app.logger.exception('Failed to load all-time stats for simulation %s', simulation_id)
+        return jsonify({'error': 'Could not load all-time stats'}), 500
 
 @bp.route('/standings/<int:simulation_id>', methods=['GET'])
 @jwt_required()
+@versioned_response
 def get_standings(simulation_id):
     """Get league standings"""
     from extensions import db
@@ -492,3 +259,84 @@ def get_standings(simulation_id):
         'western': western
     }), 200
 
+
+def _team_line(row):
+    """Team stats entry for a team_totals row"""
+    team = row._mapping
+    
+    def record(prefix):
+        return {
+            'wins': team[f'{prefix}wins'],
+            'losses': team[f'{prefix}losses'],
+            'ot_losses': team[f'{prefix}ot_losses'],
+            'goals_for': team[f'{prefix}goals_for'],
+            'goals_against': team[f'{prefix}goals_against']
+        }
+    
+    return {
+        'team_id': team['team_id'],
+        'team_name': team['team_name'],
+        'games_played': team['games_played'],
+        **record(''),
+        'shots_for': team['shots'],
+        'shots_against': team['shots_against'],
+        'hits': team['hits'],
+        'blocks': team['blocks'],
+        'takeaways': team['takeaways'],
+        'giveaways': team['giveaways'],
+        'saves': team['saves'],
+        'save_percentage': round(team['saves'] / team['shots_against'] * 100, 3) if team['shots_against'] else None,
+        'home': record('home_'),
+        'away': record('away_'),
+        'overtime': {'wins': team['overtime_wins'], 'losses': team['overtime_losses']},
+        'shootout': {'wins': team['shootout_wins'], 'losses': team['shootout_losses']},
+        'playoffs': {
+            'games_played': team['playoff_games_played'],
+            'wins': team['playoff_wins'],
+            'losses': team['playoff_losses'],
+            'overtime_wins': team['playoff_overtime_wins'],
+            'overtime_losses': team['playoff_overtime_losses'],
+            'series_won': team['playoff_series_won'],
+            'series_lost': team['playoff_series_lost']
+        }
+    }
+
+@bp.route('/teams/season/<int:simulation_id>', methods=['GET'])
+@jwt_required()
+@versioned_response
+def get_team_season_stats(simulation_id):
+    """Get per-team aggregates for a season"""
+    from models.simulation import Simulation
+    from services.stats_service import team_totals
+    
+    season = request.args.get('season', type=int)
+    game_type = request.args.get('game_type', default='regular')  # 'regular', 'playoff', or 'all'
+    if game_type not in ('regular', 'playoff', 'all'):
+        return jsonify({'error': "game_type must be 'regular', 'playoff' or 'all'"}), 400
+    
+    # If no season specified, use current_season from simulation
+    if season is None:
+        simulation = Simulation.query.get(simulation_id)
+        if not simulation:
+            return jsonify({'error': 'Simulation not found'}), 404
+        season = simulation.current_season
+    
+    return jsonify({
+        'season': season,
+        'teams': [_team_line(row) for row in team_totals(simulation_id, season=season, game_type=game_type)]
+    }), 200
+
+@bp.route('/teams/all-time/<int:simulation_id>', methods=['GET'])
+@jwt_required()
+@versioned_response
+def get_team_alltime_stats(simulation_id):
+    """Get per-team aggregates across all seasons"""
+    from services.stats_service import team_totals
+    
+    game_type = request.args.get('game_type', default='regular')  # 'regular', 'playoff', or 'all'
+    if game_type not in ('regular', 'playoff', 'all'):
+        return jsonify({'error': "game_type must be 'regular', 'playoff' or 'all'"}), 400
+    
+    return jsonify({
+        'teams': [_team_line(row) for row in team_totals(simulation_id, game_type=game_type)]
+    }), 200
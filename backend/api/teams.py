@@ -77,6 +77,7 @@ def manage_lines(team_id):
     from models.team import Team, LineAssignment
     from models.simulation import Simulation
     from services.lines_service import auto_populate_lines
+    from services.simulation_service import bump_lineup_version
     
     user_id = int(get_jwt_identity())
     team = Team.query.get(team_id)
@@ -133,6 +134,7 @@ def manage_lines(team_id):
             )
             db.session.add(line)
     
+    bump_lineup_version(team_id)
     db.session.commit()
     
     return jsonify({'message': 'Lines updated successfully'}), 200
@@ -144,6 +146,7 @@ def update_play_style(team_id):
     from extensions import db
     from models.team import Team
     from models.simulation import Simulation
+    from services.simulation_service import bump_lineup_version
     
     user_id = int(get_jwt_identity())
     team = Team.query.get(team_id)
@@ -164,6 +167,7 @@ def update_play_style(team_id):
         return jsonify({'error': f'Invalid play style. Must be one of: {", ".join(valid_styles)}'}), 400
     
     team.play_style = play_style
+    bump_lineup_version(team_id)
     db.session.commit()
     
     return jsonify({
@@ -178,6 +182,7 @@ def sign_free_agent(team_id):
     from extensions import db
     from models.team import Team, Roster
     from models.simulation import Simulation
+    from services.simulation_service import bump_lineup_version, bump_data_version
     
     user_id = int(get_jwt_identity())
     team = Team.query.get(team_id)
@@ -213,6 +218,8 @@ def sign_free_agent(team_id):
     )
     
     db.session.add(roster_entry)
+    bump_lineup_version(team_id)
+    bump_data_version(simulation.id)
     db.session.commit()
     
     return jsonify({'message': 'Player signed successfully'}), 200
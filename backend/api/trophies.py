@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from sqlalchemy import func, desc
+from services.response_cache import versioned_response
 
 bp = Blueprint('trophies', __name__)
 
@@ -27,6 +28,7 @@ NHL_TROPHIES = {
 
 @bp.route('/<int:simulation_id>', methods=['GET'])
 @jwt_required()
+@versioned_response
 def get_trophies(simulation_id):
     """Get trophy winners by season"""
     from extensions import db
@@ -72,6 +74,7 @@ def get_trophy_definitions():
 
 @bp.route('/simulation-ranking/<int:simulation_id>', methods=['GET'])
 @jwt_required()
+@versioned_response
 def get_simulation_ranking(simulation_id):
     """Get team rankings by Stanley Cup wins"""
     from extensions import db
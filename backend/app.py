@@ -1,4 +1,5 @@
 from flask import Flask, jsonify
+import click
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
@@ -54,7 +55,7 @@ CORS(
 
 # Ensure all models are registered before handling requests
 with app.app_context():
-    from models import user, simulation, team, game, player, trophy  # noqa: F401
+    from models import user, simulation, team, game, player, trophy, job, schedule  # noqa: F401
 
 # Import and register blueprints
 def register_blueprints():
@@ -70,6 +71,50 @@ def register_blueprints():
 
 register_blueprints()
 
+@app.before_request
+def start_job_workers():
+    # Started on the first request so scripts importing the app never run jobs
+    from services.job_service import ensure_job_workers
+    ensure_job_workers(app)
+
+@app.cli.command('rebuild-season-stats')
+@click.option('--simulation-id', type=int, default=None, help='Only rebuild this simulation')
+def rebuild_season_stats_command(simulation_id):
+    """Recompute player_season_stats from player_stats, then player_career_stats."""
+    from services.stats_service import rebuild_career_stats, rebuild_season_stats
+    rows = rebuild_season_stats(simulation_id)
+    simulations = rebuild_career_stats(simulation_id)
+    db.session.commit()
+    click.echo(f'Rebuilt {rows} player season stat rows and the career stats of {simulations} simulation(s)')
+
+@app.cli.command('export-simulation')
+@click.argument('simulation_id', type=int)
+@click.option('--table', 'tables', multiple=True, help='Table to export (repeatable, default all)')
+@click.option('--format', 'fmt', default='csv', show_default=True, help='csv, ndjson or parquet')
+@click.option('--output-dir', default='.', show_default=True, type=click.Path(file_okay=False))
+def export_simulation_command(simulation_id, tables, fmt, output_dir):
+    """Write a simulation's tables to <output-dir>/simulation-<id>-<table>.<ext>."""
+    from models.simulation import Simulation
+    from services.export_service import FORMATS, TABLES, export_chunks, parquet_available
+    if db.session.get(Simulation, simulation_id) is None:
+        raise click.ClickException(f'Simulation {simulation_id} not found')
+    for table in tables:
+        if table not in TABLES:
+            raise click.BadParameter(f"Unknown table '{table}'. Use one of: {', '.join(TABLES)}", param_hint='--table')
+    if fmt not in FORMATS:
+        raise click.BadParameter(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}", param_hint='--format')
+    if fmt == 'parquet' and not parquet_available():
+        raise click.ClickException('Parquet export needs pyarrow installed')
+
+    os.makedirs(output_dir, exist_ok=True)
+    extension = FORMATS[fmt][1]
+    for table in tables or TABLES:
+        path = os.path.join(output_dir, f'simulation-{simulation_id}-{table}.{extension}')
+        with open(path, 'wb') as f:
+            for chunk in export_chunks(simulation_id, table, fmt):
+                f.write(chunk)
+        click.echo(f'Wrote {path}')
+
 @app.route('/api/health')
 def health():
     return {'status': 'healthy'}, 200
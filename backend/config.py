@@ -8,3 +8,30 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key')
     RUST_BINARY_PATH = os.getenv('RUST_BINARY_PATH', '../simulation/target/release/hockey_sim')
+    # Long-lived engine workers (see services/engine_pool.py)
+    ENGINE_POOL_SIZE = int(os.getenv('ENGINE_POOL_SIZE', '2'))
+    ENGINE_TIMEOUT = float(os.getenv('ENGINE_TIMEOUT', '30'))  # seconds per engine call
+    ENGINE_BATCH_SIZE = int(os.getenv('ENGINE_BATCH_SIZE', '50'))  # games per engine call
+    # Serialized team payloads kept per process (see simulation_service.get_cached_team_data)
+    TEAM_PAYLOAD_CACHE_SIZE = int(os.getenv('TEAM_PAYLOAD_CACHE_SIZE', '512'))
+    # 'packed' (compact binary, see services/engine_wire.py) or 'json' (readable, for debugging)
+    ENGINE_WIRE_FORMAT = os.getenv('ENGINE_WIRE_FORMAT', 'packed')
+    # Games simulated between commits; progress is pushed per engine batch regardless
+    SIMULATION_COMMIT_GAMES = int(os.getenv('SIMULATION_COMMIT_GAMES', '250'))
+    # Spread regular-season slates over all engine workers
+    PARALLEL_SIMULATION = os.getenv('PARALLEL_SIMULATION', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Background simulation jobs (see services/job_service.py)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))  # worker threads per web process
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))  # seconds between queue polls
+    # A running job without a heartbeat for this long is assumed dead and resumed by another worker
+    JOB_STALE_AFTER = float(os.getenv('JOB_STALE_AFTER', '300'))
+    JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', '30'))  # keep well below JOB_STALE_AFTER
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    PROGRESS_HEARTBEAT = float(os.getenv('PROGRESS_HEARTBEAT', '5'))  # seconds between idle SSE checks
+    
+    # Stats/standings/trophies responses kept per web process (see services/response_cache.py)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))
+    
+    # Rows per server-side cursor fetch, and per CSV/NDJSON chunk or Parquet row group (see services/export_service.py)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '5000'))
@@ -28,6 +28,11 @@ CREATE TABLE simulations (
     status VARCHAR(20) DEFAULT 'draft',  -- draft, season, playoffs, completed
     draft_pick INTEGER DEFAULT 1,
     is_active BOOLEAN DEFAULT TRUE,  -- False if user quit/left the simulation
+    seed BIGINT,  -- Master seed for schedule, draft and game RNG
+    checkpoint JSON,  -- Resume cursor: last committed game {season, stage, date, game_id}
+    checkpoint_at TIMESTAMP,
+    data_version INTEGER NOT NULL DEFAULT 0,  -- Bumped when games, standings, trophies or rosters change
+    career_stats_season INTEGER NOT NULL DEFAULT 0,  -- Last season folded into player_career_stats
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -77,7 +82,8 @@ CREATE TABLE teams (
     conference VARCHAR(10) NOT NULL,  -- Eastern, Western
     user_controlled BOOLEAN DEFAULT FALSE,
     coach_id INTEGER REFERENCES coaches(id),
-    play_style VARCHAR(20) DEFAULT 'auto'  -- Trap, Possession, Dump & Chase, Rush, Shoot & Crash, auto
+    play_style VARCHAR(20) DEFAULT 'auto',  -- Trap, Possession, Dump & Chase, Rush, Shoot & Crash, auto
+    lineup_version INTEGER NOT NULL DEFAULT 0  -- Bumped when lines, play style or coach change
 );
 
 CREATE INDEX idx_teams_simulation_id ON teams(simulation_id);
@@ -131,7 +137,10 @@ CREATE TABLE games (
     is_playoff BOOLEAN DEFAULT FALSE,
     playoff_round INTEGER,  -- 1-4
     simulated BOOLEAN DEFAULT FALSE,
-    series_id INTEGER REFERENCES playoff_series(id)  -- Reference to playoff series
+    series_id INTEGER REFERENCES playoff_series(id),  -- Reference to playoff series
+    seed BIGINT,  -- Engine seed - replays the game exactly
+    went_to_overtime BOOLEAN NOT NULL DEFAULT FALSE,
+    went_to_shootout BOOLEAN NOT NULL DEFAULT FALSE
 );
 
 CREATE INDEX idx_games_simulation_id ON games(simulation_id);
@@ -140,6 +149,7 @@ CREATE INDEX idx_games_date ON games(date);
 CREATE INDEX idx_games_home_team_id ON games(home_team_id);
 CREATE INDEX idx_games_away_team_id ON games(away_team_id);
 CREATE INDEX idx_games_is_playoff ON games(is_playoff);
+CREATE INDEX idx_games_schedule ON games(simulation_id, season, is_playoff, simulated, date);
 
 -- ============================================
 -- PLAYER STATS TABLE (Per-game statistics)
@@ -172,6 +182,66 @@ CREATE INDEX idx_player_stats_player_id ON player_stats(player_id);
 CREATE INDEX idx_player_stats_team_id ON player_stats(team_id);
 CREATE UNIQUE INDEX idx_player_stats_unique ON player_stats(game_id, player_id);
 
+-- ============================================
+-- PLAYER SEASON STATS TABLE (Materialized season totals)
+-- ============================================
+-- Kept in step with player_stats in the same transaction;
+-- `flask rebuild-season-stats` recomputes it.
+CREATE TABLE player_season_stats (
+    id SERIAL PRIMARY KEY,
+    simulation_id INTEGER NOT NULL REFERENCES simulations(id) ON DELETE CASCADE,
+    season INTEGER NOT NULL,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    game_type VARCHAR(10) NOT NULL,  -- regular, playoff
+    games_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,  -- games the player's team won
+    goals INTEGER NOT NULL DEFAULT 0,
+    assists INTEGER NOT NULL DEFAULT 0,
+    shots INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    blocks INTEGER NOT NULL DEFAULT 0,
+    plus_minus INTEGER NOT NULL DEFAULT 0,
+    time_on_ice INTEGER NOT NULL DEFAULT 0,
+    takeaways INTEGER NOT NULL DEFAULT 0,
+    giveaways INTEGER NOT NULL DEFAULT 0,
+    saves INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    shots_against INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX idx_player_season_stats_unique ON player_season_stats(simulation_id, season, player_id, team_id, game_type);
+CREATE INDEX idx_player_season_stats_leaderboard ON player_season_stats(simulation_id, game_type, season, player_id);
+
+-- ============================================
+-- PLAYER CAREER STATS TABLE (Rollup of completed seasons)
+-- ============================================
+-- Each season is added from player_season_stats once, when it ends;
+-- simulations.career_stats_season is the last season folded in.
+CREATE TABLE player_career_stats (
+    id SERIAL PRIMARY KEY,
+    simulation_id INTEGER NOT NULL REFERENCES simulations(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    game_type VARCHAR(10) NOT NULL,  -- regular, playoff
+    games_played INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    goals INTEGER NOT NULL DEFAULT 0,
+    assists INTEGER NOT NULL DEFAULT 0,
+    shots INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    blocks INTEGER NOT NULL DEFAULT 0,
+    plus_minus INTEGER NOT NULL DEFAULT 0,
+    time_on_ice INTEGER NOT NULL DEFAULT 0,
+    takeaways INTEGER NOT NULL DEFAULT 0,
+    giveaways INTEGER NOT NULL DEFAULT 0,
+    saves INTEGER NOT NULL DEFAULT 0,
+    goals_against INTEGER NOT NULL DEFAULT 0,
+    shots_against INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX idx_player_career_stats_unique ON player_career_stats(simulation_id, game_type, player_id, team_id);
+
 -- ============================================
 -- STANDINGS TABLE (Season standings)
 -- ============================================
@@ -236,6 +306,52 @@ CREATE INDEX idx_trophies_trophy_type ON trophies(trophy_type);
 CREATE INDEX idx_trophies_player_id ON trophies(player_id);
 CREATE INDEX idx_trophies_team_id ON trophies(team_id);
 
+-- ============================================
+-- SIMULATION JOBS TABLE (Background simulation queue)
+-- ============================================
+CREATE TABLE simulation_jobs (
+    id SERIAL PRIMARY KEY,
+    simulation_id INTEGER NOT NULL REFERENCES simulations(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    job_type VARCHAR(50) NOT NULL,  -- simulate_season, simulate_to_playoffs
+    params JSON,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed, cancelled
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    progress_stage VARCHAR(30),  -- regular_season, playoffs
+    progress_done INTEGER,
+    progress_total INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    heartbeat_at TIMESTAMP,  -- last checkpoint of the running worker
+    result JSON,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX idx_simulation_jobs_simulation_id ON simulation_jobs(simulation_id);
+CREATE INDEX idx_simulation_jobs_status ON simulation_jobs(status);
+-- At most one queued or running job per simulation
+CREATE UNIQUE INDEX idx_simulation_jobs_one_active ON simulation_jobs(simulation_id) WHERE status IN ('queued', 'running');
+
+-- ============================================
+-- SCHEDULE TEMPLATES (Precomputed regular season per league size)
+-- ============================================
+-- Slots 0 .. size/2 - 1 are Eastern teams, the rest Western.
+-- Rows are generated on first use of a league size.
+CREATE TABLE schedule_template_games (
+    id SERIAL PRIMARY KEY,
+    league_size INTEGER NOT NULL,
+    game_number INTEGER NOT NULL,
+    day_index INTEGER NOT NULL,
+    day_offset INTEGER NOT NULL,  -- days after the season start date
+    home_slot INTEGER NOT NULL,
+    away_slot INTEGER NOT NULL,
+    seed_salt BIGINT NOT NULL  -- XORed with the season seed
+);
+
+CREATE UNIQUE INDEX idx_schedule_template_games_unique ON schedule_template_games(league_size, game_number);
+
 -- ============================================
 -- NOTES
 -- ============================================
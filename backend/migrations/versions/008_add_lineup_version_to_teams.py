@@ -0,0 +1,24 @@
+"""Add lineup_version to teams for the engine payload cache
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bumped whenever lines, play style or coach change
+    op.add_column('teams', sa.Column('lineup_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('teams', 'lineup_version')
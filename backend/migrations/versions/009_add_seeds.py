@@ -0,0 +1,26 @@
+"""Add master seed to simulations and engine seed to games
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing simulations get a seed derived from their id on first use
+    op.add_column('simulations', sa.Column('seed', sa.BigInteger(), nullable=True))
+    op.add_column('games', sa.Column('seed', sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('games', 'seed')
+    op.drop_column('simulations', 'seed')
@@ -0,0 +1,29 @@
+"""Ensure the (game_id, player_id) unique index on player_stats exists
+
+Bulk stat inserts use it as their ON CONFLICT target. Databases created
+from database_schema.sql already have it.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_player_stats_unique', 'player_stats', ['game_id', 'player_id'],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    # The index predates this migration in schema-created databases
+    pass
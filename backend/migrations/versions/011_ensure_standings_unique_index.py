@@ -0,0 +1,29 @@
+"""Ensure the (team_id, simulation_id, season) unique index on standings exists
+
+The standings upsert uses it as its ON CONFLICT target. Databases created
+from database_schema.sql already have it.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_standings_unique', 'standings', ['team_id', 'simulation_id', 'season'],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    # The index predates this migration in schema-created databases
+    pass
@@ -0,0 +1,50 @@
+"""Add simulation_jobs table for background simulation
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'simulation_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('simulation_id', sa.Integer(), sa.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('progress_stage', sa.String(length=30), nullable=True),
+        sa.Column('progress_done', sa.Integer(), nullable=True),
+        sa.Column('progress_total', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_simulation_jobs_simulation_id', 'simulation_jobs', ['simulation_id'])
+    op.create_index('idx_simulation_jobs_status', 'simulation_jobs', ['status'])
+    # At most one queued or running job per simulation - enqueue_job relies on it
+    op.create_index(
+        'idx_simulation_jobs_one_active',
+        'simulation_jobs',
+        ['simulation_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+
+
+def downgrade():
+    op.drop_table('simulation_jobs')
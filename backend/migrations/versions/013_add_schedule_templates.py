@@ -0,0 +1,40 @@
+"""Add schedule_template_games table for precomputed schedules
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are generated on first use for each league size
+    op.create_table(
+        'schedule_template_games',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('league_size', sa.Integer(), nullable=False),
+        sa.Column('game_number', sa.Integer(), nullable=False),
+        sa.Column('day_index', sa.Integer(), nullable=False),
+        sa.Column('day_offset', sa.Integer(), nullable=False),
+        sa.Column('home_slot', sa.Integer(), nullable=False),
+        sa.Column('away_slot', sa.Integer(), nullable=False),
+        sa.Column('seed_salt', sa.BigInteger(), nullable=False),
+    )
+    op.create_index(
+        'idx_schedule_template_games_unique',
+        'schedule_template_games',
+        ['league_size', 'game_number'],
+        unique=True
+    )
+
+
+def downgrade():
+    op.drop_table('schedule_template_games')
@@ -0,0 +1,27 @@
+"""Add composite index for selecting unplayed games by date
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_games_schedule',
+        'games',
+        ['simulation_id', 'season', 'is_playoff', 'simulated', 'date'],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('idx_games_schedule', table_name='games')
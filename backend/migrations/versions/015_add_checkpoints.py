@@ -0,0 +1,29 @@
+"""Add simulation resume cursor and job heartbeats
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('simulations', sa.Column('checkpoint', sa.JSON(), nullable=True))
+    op.add_column('simulations', sa.Column('checkpoint_at', sa.DateTime(), nullable=True))
+    op.add_column('simulation_jobs', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('simulation_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('simulation_jobs', 'heartbeat_at')
+    op.drop_column('simulation_jobs', 'attempts')
+    op.drop_column('simulations', 'checkpoint_at')
+    op.drop_column('simulations', 'checkpoint')
@@ -0,0 +1,65 @@
+"""Add player_season_stats table with per-season player totals
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+STAT_COLUMNS = (
+    'goals', 'assists', 'shots', 'hits', 'blocks', 'plus_minus', 'time_on_ice',
+    'takeaways', 'giveaways', 'saves', 'goals_against', 'shots_against'
+)
+
+
+def upgrade():
+    op.create_table(
+        'player_season_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('simulation_id', sa.Integer(), sa.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('team_id', sa.Integer(), sa.ForeignKey('teams.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('game_type', sa.String(length=10), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('wins', sa.Integer(), nullable=False, server_default='0'),
+        *[sa.Column(column, sa.Integer(), nullable=False, server_default='0') for column in STAT_COLUMNS]
+    )
+    op.create_index(
+        'idx_player_season_stats_unique',
+        'player_season_stats',
+        ['simulation_id', 'season', 'player_id', 'team_id', 'game_type'],
+        unique=True
+    )
+
+    # Backfill from the stats already recorded (same query as `flask rebuild-season-stats`)
+    sums = ', '.join(f'COALESCE(SUM(ps.{column}), 0)' for column in STAT_COLUMNS)
+    op.execute(f"""
+        INSERT INTO player_season_stats
+            (simulation_id, season, player_id, team_id, game_type, games_played, wins, {', '.join(STAT_COLUMNS)})
+        SELECT g.simulation_id, g.season, ps.player_id, ps.team_id,
+               CASE WHEN g.is_playoff THEN 'playoff' ELSE 'regular' END,
+               COUNT(DISTINCT ps.game_id),
+               SUM(CASE
+                   WHEN ps.team_id = g.home_team_id AND g.home_score > g.away_score THEN 1
+                   WHEN ps.team_id = g.away_team_id AND g.away_score > g.home_score THEN 1
+                   ELSE 0
+               END),
+               {sums}
+        FROM player_stats ps
+        JOIN games g ON g.id = ps.game_id
+        GROUP BY g.simulation_id, g.season, ps.player_id, ps.team_id,
+                 CASE WHEN g.is_playoff THEN 'playoff' ELSE 'regular' END
+    """)
+
+
+def downgrade():
+    op.drop_table('player_season_stats')
@@ -0,0 +1,23 @@
+"""Add data_version to simulations for cached read endpoints
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('simulations', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('simulations', 'data_version')
@@ -0,0 +1,26 @@
+"""Add leaderboard index on player_season_stats
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'idx_player_season_stats_leaderboard',
+        'player_season_stats',
+        ['simulation_id', 'game_type', 'season', 'player_id']
+    )
+
+
+def downgrade():
+    op.drop_index('idx_player_season_stats_leaderboard', table_name='player_season_stats')
@@ -0,0 +1,60 @@
+"""Add player_career_stats rollup of completed seasons
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+SUMMED_COLUMNS = (
+    'games_played', 'wins', 'goals', 'assists', 'shots', 'hits', 'blocks', 'plus_minus',
+    'time_on_ice', 'takeaways', 'giveaways', 'saves', 'goals_against', 'shots_against'
+)
+
+
+def upgrade():
+    op.create_table(
+        'player_career_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('simulation_id', sa.Integer(), sa.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('team_id', sa.Integer(), sa.ForeignKey('teams.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('game_type', sa.String(length=10), nullable=False),
+        *[sa.Column(column, sa.Integer(), nullable=False, server_default='0') for column in SUMMED_COLUMNS]
+    )
+    op.create_index(
+        'idx_player_career_stats_unique',
+        'player_career_stats',
+        ['simulation_id', 'game_type', 'player_id', 'team_id'],
+        unique=True
+    )
+    op.add_column(
+        'simulations',
+        sa.Column('career_stats_season', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Fold every completed season in (same result as `flask rebuild-season-stats`)
+    sums = ', '.join(f'SUM(pss.{column})' for column in SUMMED_COLUMNS)
+    op.execute(f"""
+        INSERT INTO player_career_stats
+            (simulation_id, player_id, team_id, game_type, {', '.join(SUMMED_COLUMNS)})
+        SELECT pss.simulation_id, pss.player_id, pss.team_id, pss.game_type, {sums}
+        FROM player_season_stats pss
+        JOIN simulations s ON s.id = pss.simulation_id
+        WHERE pss.season < s.current_season
+        GROUP BY pss.simulation_id, pss.player_id, pss.team_id, pss.game_type
+    """)
+    op.execute("UPDATE simulations SET career_stats_season = GREATEST(current_season - 1, 0)")
+
+
+def downgrade():
+    op.drop_column('simulations', 'career_stats_season')
+    op.drop_table('player_career_stats')
@@ -0,0 +1,26 @@
+"""Add overtime and shootout flags to games
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '020'
+down_revision = '019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Games saved before this revision did not keep the flags; they read as regulation games
+    op.add_column('games', sa.Column('went_to_overtime', sa.Boolean(), nullable=False, server_default='false'))
+    op.add_column('games', sa.Column('went_to_shootout', sa.Boolean(), nullable=False, server_default='false'))
+
+
+def downgrade():
+    op.drop_column('games', 'went_to_shootout')
+    op.drop_column('games', 'went_to_overtime')
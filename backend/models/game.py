@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Game(db.Model):
     __tablename__ = 'games'
+    __table_args__ = (
+        # Next unplayed games of a season by date (simulate-to-date / simulate-days)
+        db.Index('idx_games_schedule', 'simulation_id', 'season', 'is_playoff', 'simulated', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     simulation_id = db.Column(db.Integer, db.ForeignKey('simulations.id'), nullable=False)
@@ -16,6 +20,9 @@ class Game(db.Model):
     playoff_round = db.Column(db.Integer, nullable=True)  # 1-4
     series_id = db.Column(db.Integer, db.ForeignKey('playoff_series.id'), nullable=True)
     simulated = db.Column(db.Boolean, default=False)
+    seed = db.Column(db.BigInteger, nullable=True)  # Engine seed - replays the game exactly
+    went_to_overtime = db.Column(db.Boolean, nullable=False, default=False, server_default='false')
+    went_to_shootout = db.Column(db.Boolean, nullable=False, default=False, server_default='false')
     
     # Relationships
     player_stats = db.relationship('PlayerStat', backref='game', lazy=True, cascade='all, delete-orphan')
@@ -33,7 +40,10 @@ class Game(db.Model):
             'is_playoff': self.is_playoff,
             'playoff_round': self.playoff_round,
             'series_id': self.series_id,
-            'simulated': self.simulated
+            'simulated': self.simulated,
+            'seed': str(self.seed) if self.seed is not None else None,
+            'went_to_overtime': self.went_to_overtime,
+            'went_to_shootout': self.went_to_shootout
         }
 
 class PlayoffSeries(db.Model):
@@ -72,6 +82,10 @@ class PlayoffSeries(db.Model):
 
 class PlayerStat(db.Model):
     __tablename__ = 'player_stats'
+    __table_args__ = (
+        # One stat line per player per game - bulk inserts rely on it to skip duplicates
+        db.Index('idx_player_stats_unique', 'game_id', 'player_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     game_id = db.Column(db.Integer, db.ForeignKey('games.id'), nullable=False)
@@ -114,8 +128,132 @@ class PlayerStat(db.Model):
             'shots_against': self.shots_against
         }
 
+class PlayerSeasonStat(db.Model):
+    """Season totals of a player for one team and game type, kept in step with player_stats.
+    
+    Rows are upserted in the transaction that writes the game stats (see
+    services/stats_service.py) and can be rebuilt from player_stats with
+    `flask rebuild-season-stats`.
+    """
+    __tablename__ = 'player_season_stats'
+    __table_args__ = (
+        # Target of the season stats upsert
+        db.Index('idx_player_season_stats_unique', 'simulation_id', 'season', 'player_id', 'team_id', 'game_type', unique=True),
+        # Leaderboards: one game type of a season (or of all seasons), grouped by player
+        db.Index('idx_player_season_stats_leaderboard', 'simulation_id', 'game_type', 'season', 'player_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    simulation_id = db.Column(db.Integer, db.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False)
+    season = db.Column(db.Integer, nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    game_type = db.Column(db.String(10), nullable=False)  # regular, playoff
+    games_played = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)  # Games the player's team won
+    
+    # Totals of the player_stats columns
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    shots = db.Column(db.Integer, nullable=False, default=0)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    blocks = db.Column(db.Integer, nullable=False, default=0)
+    plus_minus = db.Column(db.Integer, nullable=False, default=0)
+    time_on_ice = db.Column(db.Integer, nullable=False, default=0)
+    takeaways = db.Column(db.Integer, nullable=False, default=0)
+    giveaways = db.Column(db.Integer, nullable=False, default=0)
+    saves = db.Column(db.Integer, nullable=False, default=0)
+    goals_against = db.Column(db.Integer, nullable=False, default=0)
+    shots_against = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'simulation_id': self.simulation_id,
+            'season': self.season,
+            'player_id': self.player_id,
+            'team_id': self.team_id,
+            'game_type': self.game_type,
+            'games_played': self.games_played,
+            'wins': self.wins,
+            'goals': self.goals,
+            'assists': self.assists,
+            'shots': self.shots,
+            'hits': self.hits,
+            'blocks': self.blocks,
+            'plus_minus': self.plus_minus,
+            'time_on_ice': self.time_on_ice,
+            'takeaways': self.takeaways,
+            'giveaways': self.giveaways,
+            'saves': self.saves,
+            'goals_against': self.goals_against,
+            'shots_against': self.shots_against
+        }
+
+class PlayerCareerStat(db.Model):
+    """Career totals of a player per team and game type over the simulation's completed seasons.
+    
+    Seasons are folded in from player_season_stats once, when they end
+    (Simulation.career_stats_season is the last one folded); all-time
+    stats add the seasons after it.
+    """
+    __tablename__ = 'player_career_stats'
+    __table_args__ = (
+        # Target of the season-end upsert; also serves all-time leaderboards
+        db.Index('idx_player_career_stats_unique', 'simulation_id', 'game_type', 'player_id', 'team_id', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    simulation_id = db.Column(db.Integer, db.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id', ondelete='CASCADE'), nullable=False)
+    game_type = db.Column(db.String(10), nullable=False)  # regular, playoff
+    games_played = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)  # Games the player's team won
+    
+    # Totals of the player_stats columns
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    shots = db.Column(db.Integer, nullable=False, default=0)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    blocks = db.Column(db.Integer, nullable=False, default=0)
+    plus_minus = db.Column(db.Integer, nullable=False, default=0)
+    time_on_ice = db.Column(db.Integer, nullable=False, default=0)
+    takeaways = db.Column(db.Integer, nullable=False, default=0)
+    giveaways = db.Column(db.Integer, nullable=False, default=0)
+    saves = db.Column(db.Integer, nullable=False, default=0)
+    goals_against = db.Column(db.Integer, nullable=False, default=0)
+    shots_against = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'simulation_id': self.simulation_id,
+            'player_id': self.player_id,
+            'team_id': self.team_id,
+            'game_type': self.game_type,
+            'games_played': self.games_played,
+            'wins': self.wins,
+            'goals': self.goals,
+            'assists': self.assists,
+            'shots': self.shots,
+            'hits': self.hits,
+            'blocks': self.blocks,
+            'plus_minus': self.plus_minus,
+            'time_on_ice': self.time_on_ice,
+            'takeaways': self.takeaways,
+            'giveaways': self.giveaways,
+            'saves': self.saves,
+            'goals_against': self.goals_against,
+            'shots_against': self.shots_against
+        }
+
 class Standing(db.Model):
     __tablename__ = 'standings'
+    __table_args__ = (
+        # Target of the standings upsert in StandingsAccumulator.flush
+        db.Index('idx_standings_unique', 'team_id', 'simulation_id', 'season', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
@@ -0,0 +1,53 @@
+from extensions import db
+from datetime import datetime
+
+class SimulationJob(db.Model):
+    """A queued or running background simulation (see services/job_service.py)"""
+    __tablename__ = 'simulation_jobs'
+    __table_args__ = (
+        # At most one queued or running job per simulation - enqueue_job relies on it
+        db.Index(
+            'idx_simulation_jobs_one_active', 'simulation_id', unique=True,
+            postgresql_where=db.text("status IN ('queued', 'running')")
+        ),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    simulation_id = db.Column(db.Integer, db.ForeignKey('simulations.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    job_type = db.Column(db.String(50), nullable=False)  # simulate_season, simulate_to_playoffs
+    params = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed, cancelled
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    progress_stage = db.Column(db.String(30), nullable=True)  # regular_season, playoffs
+    progress_done = db.Column(db.Integer, nullable=True)
+    progress_total = db.Column(db.Integer, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Last checkpoint of the running worker
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'simulation_id': self.simulation_id,
+            'job_type': self.job_type,
+            'params': self.params,
+            'status': self.status,
+            'cancel_requested': self.cancel_requested,
+            'progress': {
+                'stage': self.progress_stage,
+                'done': self.progress_done,
+                'total': self.progress_total
+            },
+            'attempts': self.attempts,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
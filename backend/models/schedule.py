@@ -0,0 +1,22 @@
+from extensions import db
+
+class ScheduleTemplateGame(db.Model):
+    """One game of the precomputed regular season schedule for a league size.
+
+    Teams are referred to by slot: 0 .. size/2 - 1 are Eastern, the rest
+    Western. Seasons are materialized from these rows (see
+    services/schedule_service.py).
+    """
+    __tablename__ = 'schedule_template_games'
+    __table_args__ = (
+        db.Index('idx_schedule_template_games_unique', 'league_size', 'game_number', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    league_size = db.Column(db.Integer, nullable=False)
+    game_number = db.Column(db.Integer, nullable=False)
+    day_index = db.Column(db.Integer, nullable=False)
+    day_offset = db.Column(db.Integer, nullable=False)  # Days after the season start date
+    home_slot = db.Column(db.Integer, nullable=False)
+    away_slot = db.Column(db.Integer, nullable=False)
+    seed_salt = db.Column(db.BigInteger, nullable=False)  # XORed with the season seed
@@ -14,6 +14,14 @@ class Simulation(db.Model):
     status = db.Column(db.String(20), default='draft')  # draft, season, playoffs, completed
     draft_pick = db.Column(db.Integer, default=1)  # Current draft pick number
     is_active = db.Column(db.Boolean, default=True)  # False if user quit/left the simulation
+    seed = db.Column(db.BigInteger, nullable=True)  # Master seed for schedule, draft and game RNG
+    # Resume cursor - last committed game: {season, stage, date, game_id}
+    checkpoint = db.Column(db.JSON, nullable=True)
+    checkpoint_at = db.Column(db.DateTime, nullable=True)
+    # Bumped whenever games, standings, trophies or rosters change - versions cached responses
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Last season folded into player_career_stats
+    career_stats_season = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -37,5 +45,10 @@ class Simulation(db.Model):
             'status': self.status,
             'draft_pick': self.draft_pick,
             'is_active': self.is_active if hasattr(self, 'is_active') else True,  # Fallback for old records
+            'seed': str(self.seed) if self.seed is not None else None,  # String - exceeds JS integer precision
+            'checkpoint': self.checkpoint,
+            'checkpoint_at': self.checkpoint_at.isoformat() if self.checkpoint_at else None,
+            'data_version': self.data_version,
+            'career_stats_season': self.career_stats_season,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -11,6 +11,7 @@ class Team(db.Model):
     user_controlled = db.Column(db.Boolean, default=False)
     coach_id = db.Column(db.Integer, db.ForeignKey('coaches.id'), nullable=True)
     play_style = db.Column(db.String(20), default='auto')  # auto, trap, possession, dump_chase, rush, shoot_crash
+    lineup_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped when lines, play style or coach change
     
     # Relationships
     roster_entries = db.relationship('Roster', backref='team', lazy=True, cascade='all, delete-orphan')
@@ -3,7 +3,7 @@ from extensions import db
 from models.team import Team, Roster
 from models.player import Player, Coach
 from sqlalchemy import text
-import random
+from services.simulation_service import simulation_rng, bump_data_version
 
 class DraftManager:
     def __init__(self, simulation_id):
@@ -68,7 +68,8 @@ class DraftManager:
 
         result = db.session.execute(
             text(
-                "UPDATE teams SET coach_id = :coach_id "
+                "UPDATE teams SET coach_id = :coach_id, "
+                "lineup_version = lineup_version + 1 "
                 "WHERE id = :team_id AND simulation_id = :simulation_id "
                 "AND coach_id IS NULL"
             ),
@@ -291,6 +292,7 @@ class DraftManager:
             simulation = Simulation.query.get(self.simulation_id)
             if simulation:
                 simulation.draft_pick = self.current_pick + 1  # Convert back to 1-based
+            bump_data_version(self.simulation_id)
             
             # Commit everything together - atomic operation
             db.session.commit()
@@ -451,9 +453,11 @@ class DraftManager:
                 if player_overall >= best_overall_rating - delta:
                     candidates.append(player)
             
-            # Randomly select from candidates
+            # Randomly select from candidates (seeded per pick for reproducible drafts)
             if candidates:
-                best_option = random.choice(candidates)
+                from models.simulation import Simulation
+                rng = simulation_rng(Simulation.query.get(self.simulation_id), 'draft', self.current_pick)
+                best_option = rng.choice(sorted(candidates, key=lambda p: p.id))
                 best_type = 'player'
                 best_score = best_option.calculate_overall()  # Set best_score for coach comparison
                 player_selected = True
@@ -0,0 +1,99 @@
+"""Multi-season runs: play the remaining seasons of a simulation in one go.
+
+Each season goes through the same steps as simulate-season (regular
+season, playoffs, trophies, rollover), but team payloads come from one
+LeagueSnapshot kept for the whole run, and progress events carry the
+season being played so a client can follow the run end to end.
+"""
+from models.simulation import Simulation
+from models.game import PlayoffSeries
+from services.league_snapshot import LeagueSnapshot
+
+RUNNABLE_STATUSES = ('season', 'season_end', 'playoffs')
+
+
+def remaining_seasons(simulation):
+    """Seasons left up to year_length, counting the current one"""
+    return max(simulation.year_length - simulation.current_season + 1, 0)
+
+
+def _season_progress(progress, season, season_number, seasons_total):
+    """Wrap a progress hook so every event says which season of the run it belongs to"""
+    if progress is None:
+        return None
+
+    def report(stage, done, total, **details):
+        progress(
+            stage, done, total,
+            season=season,
+            season_number=season_number,
+            seasons_total=seasons_total,
+            **details
+        )
+    return report
+
+
+def _champion_id(simulation_id, season):
+    final = PlayoffSeries.query.filter_by(
+        simulation_id=simulation_id,
+        season=season
+    ).order_by(PlayoffSeries.round.desc()).first()
+    return final.winner_team_id if final else None
+
+
+def simulate_seasons(simulation_id, seasons=None, parallel=None, progress=None):
+    """Simulate the next `seasons` seasons (default: all remaining ones).
+
+    Every season is committed as it goes, so a stopped run keeps the
+    seasons it finished. progress gets the regular season and playoff
+    events of each season, plus a 'seasons' event (checkpoint) after each
+    rollover with done/total counted in seasons.
+    """
+    from services.game_service import simulate_full_season
+
+    simulation = Simulation.query.get(simulation_id)
+    if simulation.status not in RUNNABLE_STATUSES:
+        return {'error': 'Simulation is not in a season'}
+
+    seasons_total = remaining_seasons(simulation)
+    if seasons is not None:
+        seasons_total = min(seasons, seasons_total)
+
+    snapshot = LeagueSnapshot(simulation_id)
+    team_names = {team_id: team.name for team_id, team in snapshot.teams.items()}
+    champions = []
+
+    for season_number in range(1, seasons_total + 1):
+        season = simulation.current_season
+        result = simulate_full_season(
+            simulation_id,
+            progress=_season_progress(progress, season, season_number, seasons_total),
+            parallel=parallel,
+            snapshot=snapshot
+        )
+        if 'error' in result:
+            return result
+
+        champion_id = _champion_id(simulation_id, season)
+        champions.append({
+            'season': season,
+            'team_id': champion_id,
+            'team_name': team_names.get(champion_id)
+        })
+        if progress:
+            progress(
+                'seasons', season_number, seasons_total,
+                checkpoint=True,
+                season=season,
+                champion=team_names.get(champion_id)
+            )
+
+        # Pick up lineup or coach changes made while the run was going
+        snapshot.refresh()
+
+    return {
+        'message': f'Simulated {len(champions)} seasons',
+        'seasons_simulated': len(champions),
+        'next_season': simulation.current_season,
+        'champions': champions
+    }
@@ -0,0 +1,212 @@
+"""Pool of long-lived Rust simulation engine workers"""
+import atexit
+import json
+import os
+import queue
+import struct
+import subprocess
+import threading
+from config import Config
+from services import engine_wire
+
+WIRE_FORMATS = ('json', 'packed')
+
+
+class EngineError(RuntimeError):
+    """Raised when the simulation engine fails to return a result"""
+
+
+class EngineTimeout(EngineError):
+    """Raised when a worker does not answer within the call timeout"""
+
+
+class EngineWorker:
+    """A single hockey_sim process running in --serve mode.
+
+    With the json wire format requests and responses are single JSON lines
+    on stdin/stdout; with packed they are length-prefixed binary frames (see
+    engine_wire.py). A reader thread moves responses into a queue so reads
+    can time out.
+    """
+
+    def __init__(self, binary_path, wire_format='json'):
+        self.binary_path = binary_path
+        self.wire_format = wire_format
+        self.process = None
+        self._responses = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [self.binary_path, '--serve', '--wire', self.wire_format],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # Engine panics go to the server log
+            bufsize=0
+        )
+        self._responses = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_frames if self.wire_format == 'packed' else self._read_responses,
+            args=(self.process.stdout, self._responses),
+            daemon=True
+        )
+        reader.start()
+
+    @staticmethod
+    def _read_responses(stream, responses):
+        for line in iter(stream.readline, b''):
+            responses.put(line)
+        responses.put(None)  # EOF - process exited
+
+    @staticmethod
+    def _read_frames(stream, responses):
+        while True:
+            payload = engine_wire.read_frame(stream)
+            responses.put(payload)
+            if payload is None:
+                break  # EOF - process exited
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def kill(self):
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def request(self, payload, timeout):
+        """Send one encoded request and wait for its response"""
+        if not self.is_alive():
+            self.start()
+
+        if self.wire_format == 'packed':
+            message = engine_wire.frame(payload)
+        else:
+            message = payload + b'\n'
+
+        try:
+            self.process.stdin.write(message)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.kill()
+            raise EngineError(f"Simulation engine worker exited: {e}")
+
+        try:
+            line = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            # Kill the worker so a late response can't be read by the next caller
+            self.kill()
+            raise EngineTimeout(f"Simulation engine timed out after {timeout}s")
+
+        if line is None:
+            self.kill()
+            raise EngineError("Simulation engine worker exited unexpectedly")
+
+        return line
+
+
+class EnginePool:
+    """Fixed-size pool of engine workers shared by all simulation calls"""
+
+    def __init__(self, size, binary_path, timeout, wire_format='json'):
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown engine wire format: {wire_format}")
+        self.size = max(1, int(size))
+        self.binary_path = binary_path
+        self.timeout = timeout
+        self.wire_format = wire_format
+        self._idle = queue.Queue()
+        self._workers = [EngineWorker(binary_path, wire_format) for _ in range(self.size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def simulate(self, payload, timeout=None):
+        """Run one engine request on the next idle worker and return the parsed result"""
+        if self.wire_format == 'packed':
+            request_line = engine_wire.encode_request(payload)
+        else:
+            request_line = json.dumps(payload, separators=(',', ':')).encode()
+        timeout = timeout if timeout is not None else self.timeout
+
+        worker = self._idle.get()
+        try:
+            try:
+                line = worker.request(request_line, timeout)
+            except EngineTimeout:
+                # Not retried - the request itself is the likely cause
+                raise
+            except EngineError:
+                # Worker crashed mid-request; request() restarts it on the retry
+                line = worker.request(request_line, timeout)
+        finally:
+            self._idle.put(worker)
+
+        try:
+            if self.wire_format == 'packed':
+                result = engine_wire.decode_response(line, single='games' not in payload)
+            else:
+                result = json.loads(line)
+        except (json.JSONDecodeError, struct.error) as e:
+            raise EngineError(f"Failed to parse Rust simulation output: {e}")
+
+        if isinstance(result, dict) and 'error' in result:
+            raise EngineError(f"Rust simulation failed: {result['error']}")
+        return result
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_engine_pool():
+    """Get the shared engine pool, starting it on first use"""
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            rust_binary = Config.RUST_BINARY_PATH
+            if not os.path.exists(rust_binary):
+                raise RuntimeError(
+                    f"Rust simulation binary not found at {rust_binary}. "
+                    f"Please compile it by running: cd simulation && cargo build --release"
+                )
+            _pool = EnginePool(
+                Config.ENGINE_POOL_SIZE,
+                rust_binary,
+                Config.ENGINE_TIMEOUT,
+                Config.ENGINE_WIRE_FORMAT
+            )
+    return _pool
+
+
+def shutdown_engine_pool():
+    global _pool
+    with _pool_lock:
+        old_pool = _pool
+        _pool = None
+    if old_pool is not None:
+        old_pool.shutdown()
+
+
+atexit.register(shutdown_engine_pool)
@@ -0,0 +1,161 @@
+"""Packed binary wire format for the engine workers.
+
+Mirrors simulation/src/wire.rs - see that file for the byte layout. Requests
+are always batches; a single-game payload is sent as a batch of one. Player
+names, team names and cities are not sent, so result stats carry player ids
+only (no 'player_name').
+"""
+import struct
+
+STATUS_OK = 0
+
+GAME_PLAYOFF = 1
+GAME_SEEDED = 2
+
+RESULT_OVERTIME = 1
+RESULT_SHOOTOUT = 2
+
+_FRAME_LEN = struct.Struct('<I')
+_TEAM_COUNT = struct.Struct('<H')
+_GAME_COUNT = struct.Struct('<I')
+_TEAM_ID = struct.Struct('<i')
+_COACH = struct.Struct('<ih')
+_LINE_COUNT = struct.Struct('<H')
+_LINE_NUMBER = struct.Struct('<h')
+_PLAYER_ID = struct.Struct('<i')
+_RATINGS = struct.Struct('<5h')
+_GAME = struct.Struct('<iiBQ')
+_RESULT_HEADER = struct.Struct('<hhBHH')
+_STAT = struct.Struct('<i12h')
+
+STAT_FIELDS = (
+    'goals', 'assists', 'shots', 'hits', 'blocks', 'plus_minus', 'time_on_ice',
+    'takeaways', 'giveaways', 'saves', 'goals_against', 'shots_against'
+)
+
+
+def frame(payload):
+    return _FRAME_LEN.pack(len(payload)) + payload
+
+
+def _read_exact(stream, size):
+    # Unbuffered pipes may return short reads
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(stream):
+    """Read one length-prefixed frame from a binary stream; None on EOF"""
+    header = _read_exact(stream, _FRAME_LEN.size)
+    if header is None:
+        return None
+    (length,) = _FRAME_LEN.unpack(header)
+    return _read_exact(stream, length)
+
+
+def _pack_str(value):
+    data = (value or '').encode()
+    if len(data) > 255:
+        raise ValueError(f"String too long for engine wire format: {value!r}")
+    return bytes((len(data),)) + data
+
+
+def _pack_team(team):
+    parts = [_TEAM_ID.pack(team['id']), _pack_str(team.get('play_style'))]
+    coach = team.get('coach')
+    if coach:
+        parts.append(b'\x01')
+        parts.append(_COACH.pack(coach['id'], coach['rating']))
+        parts.append(_pack_str(coach.get('coach_type')))
+    else:
+        parts.append(b'\x00')
+
+    parts.append(_LINE_COUNT.pack(len(team['lines'])))
+    for line in team['lines']:
+        player = line['player']
+        parts.append(_pack_str(line['line_type']))
+        parts.append(_LINE_NUMBER.pack(line['line_number']))
+        parts.append(_pack_str(line['position']))
+        parts.append(_PLAYER_ID.pack(player['id']))
+        parts.append(_pack_str(player['position']))
+        parts.append(_pack_str(player.get('player_type')))
+        parts.append(_RATINGS.pack(
+            player['off'], player['def'], player['phys'], player['lead'], player['const']
+        ))
+    return b''.join(parts)
+
+
+def encode_request(payload):
+    """Encode a batch or single-game payload dict as a packed request"""
+    if 'games' in payload:
+        teams = payload['teams']
+        games = payload['games']
+    else:
+        teams = [payload['home_team'], payload['away_team']]
+        games = [{
+            'home_team_id': payload['home_team']['id'],
+            'away_team_id': payload['away_team']['id'],
+            'is_playoff': payload.get('is_playoff', False),
+            'seed': payload.get('seed')
+        }]
+
+    parts = [_TEAM_COUNT.pack(len(teams))]
+    parts.extend(_pack_team(team) for team in teams)
+    parts.append(_GAME_COUNT.pack(len(games)))
+    for game in games:
+        flags = 0
+        if game.get('is_playoff'):
+            flags |= GAME_PLAYOFF
+        seed = game.get('seed')
+        if seed is not None:
+            flags |= GAME_SEEDED
+        parts.append(_GAME.pack(game['home_team_id'], game['away_team_id'], flags, seed or 0))
+    return b''.join(parts)
+
+
+def _unpack_stats(buf, offset, count):
+    stats = []
+    for _ in range(count):
+        values = _STAT.unpack_from(buf, offset)
+        offset += _STAT.size
+        stat = dict(zip(STAT_FIELDS, values[1:]))
+        stat['player_id'] = values[0]
+        stats.append(stat)
+    return stats, offset
+
+
+def decode_response(buf, single=False):
+    """Decode a packed response into the same dicts the JSON format produces.
+
+    Error responses become {'error': message}. With single=True the first
+    game result is returned instead of a {'results': [...]} batch.
+    """
+    if not buf or buf[0] != STATUS_OK:
+        return {'error': bytes(buf[1:]).decode(errors='replace')}
+
+    (game_count,) = _GAME_COUNT.unpack_from(buf, 1)
+    offset = 1 + _GAME_COUNT.size
+    results = []
+    for _ in range(game_count):
+        home_score, away_score, flags, home_count, away_count = _RESULT_HEADER.unpack_from(buf, offset)
+        offset += _RESULT_HEADER.size
+        home_stats, offset = _unpack_stats(buf, offset, home_count)
+        away_stats, offset = _unpack_stats(buf, offset, away_count)
+        results.append({
+            'home_score': home_score,
+            'away_score': away_score,
+            'home_stats': home_stats,
+            'away_stats': away_stats,
+            'went_to_overtime': bool(flags & RESULT_OVERTIME),
+            'went_to_shootout': bool(flags & RESULT_SHOOTOUT)
+        })
+
+    if single:
+        return results[0]
+    return {'results': results}
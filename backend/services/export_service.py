@@ -0,0 +1,158 @@
+"""Streaming bulk export of a simulation's tables.
+
+Rows are read with a server-side cursor (yield_per) and encoded batch by
+batch into CSV, NDJSON or Parquet chunks, so memory stays flat however
+many seasons a simulation has. export_chunks is a generator of bytes used
+by both the export endpoint (as a streamed response) and
+`flask export-simulation` (written to files).
+
+Parquet is written with pyarrow (in requirements.txt). It is imported
+lazily, so an install without it still serves CSV and NDJSON.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from sqlalchemy import select, BigInteger, Boolean, Date, DateTime, Integer
+from extensions import db
+from config import Config
+from models.game import Game, PlayerStat, PlayoffSeries, Standing
+from models.trophy import Trophy
+
+TABLES = ('games', 'player_stats', 'standings', 'playoff_series', 'trophies')
+# format: (mimetype, file extension)
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def _table_select(table, simulation_id):
+    """Export query for one table, in id order"""
+    if table == 'player_stats':
+        # player_stats has no simulation_id - the season comes along for convenience
+        return select(*PlayerStat.__table__.columns, Game.season)\
+            .join(Game, PlayerStat.game_id == Game.id)\
+            .where(Game.simulation_id == simulation_id)\
+            .order_by(PlayerStat.id)
+    model = {
+        'games': Game,
+        'standings': Standing,
+        'playoff_series': PlayoffSeries,
+        'trophies': Trophy,
+    }[table]
+    return select(model.__table__).where(model.simulation_id == simulation_id).order_by(model.id)
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _batches(query):
+    """Row batches from a server-side cursor"""
+    result = db.session.execute(query.execution_options(yield_per=Config.EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(columns, batches):
+    for rows in batches:
+        yield ''.join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + '\n' for row in rows
+        ).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what pyarrow writes until it is drained"""
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_schema(query):
+    import pyarrow as pa
+    fields = []
+    for column in query.selected_columns:
+        column_type = column.type
+        if isinstance(column_type, BigInteger):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int32()
+        elif isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp('us')
+        elif isinstance(column_type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _parquet_chunks(query, batches):
+    """One row group per batch; the file footer comes with the last chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _arrow_schema(query)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in batches:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(simulation_id, table, fmt):
+    """Bytes of one table of a simulation in the given format, batch by batch.
+
+    table must be one of TABLES and fmt one of FORMATS (parquet only when
+    parquet_available()). Holds the session's connection until exhausted.
+    """
+    query = _table_select(table, simulation_id)
+    columns = [column.name for column in query.selected_columns]
+    batches = _batches(query)
+    if fmt == 'csv':
+        return _csv_chunks(columns, batches)
+    if fmt == 'ndjson':
+        return _ndjson_chunks(columns, batches)
+    return _parquet_chunks(query, batches)
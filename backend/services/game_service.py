@@ -1,274 +1,150 @@
 """Game simulation and scheduling service"""
+from flask import current_app
 from extensions import db
 from models.simulation import Simulation
 from models.team import Team
 from models.game import Game, PlayerStat, Standing, PlayoffSeries
 from datetime import datetime, timedelta, date
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import random
-from services.simulation_service import simulate_game
+from config import Config
+from services.simulation_service import (
+    simulate_games, simulate_games_parallel, derive_game_seed,
+    get_simulation_seed, bump_data_version
+)
+from services.schedule_service import materialize_season_schedule
+from services.engine_pool import get_engine_pool
+from services.league_snapshot import LeagueSnapshot
 
 def generate_season_schedule(simulation_id, season):
-    """Generate schedule for a season with intra-conference preference"""
-    # Check if schedule already exists for this season
-    existing_games = Game.query.filter_by(
+    """Generate the regular season schedule with intra-conference preference.
+
+    Games are materialized from the league size's schedule template (see
+    schedule_service); every game-day is a slate where no team plays twice.
+    Returns the season's games in schedule order.
+    """
+    simulation = Simulation.query.get(simulation_id)
+    materialize_season_schedule(simulation, season)
+    db.session.commit()
+    return _season_games(simulation_id, season)
+
+def _season_games(simulation_id, season):
+    return Game.query.filter_by(
         simulation_id=simulation_id,
         season=season,
         is_playoff=False
-    ).first()
-    
-    if existing_games:
-        # Schedule already exists, return existing games
-        return Game.query.filter_by(
-            simulation_id=simulation_id,
-            season=season,
-            is_playoff=False
-        ).all()
-    
-    teams = Team.query.filter_by(simulation_id=simulation_id).all()
-    num_teams = len(teams)
-    
-    # Always 82 games per team (NHL standard)
-    games_per_team = 82
-    
-    games = []
-    start_date = date(1980 + season - 1, 10, 1)  # Start in October
-    current_date = start_date
+    ).order_by(Game.date, Game.id).all()
+
+def _playoff_game_seed(simulation, season, round_num, higher_seed_id, lower_seed_id, game_number):
+    return derive_game_seed(
+        get_simulation_seed(simulation), season, 'playoff',
+        round_num, higher_seed_id, lower_seed_id, game_number
+    )
+
+def _game_seed(game):
+    """Engine seed for a game - independent of batch and worker placement.
     
-    # Organize teams by conference
-    eastern_teams = [t for t in teams if t.conference == 'Eastern']
-    western_teams = [t for t in teams if t.conference == 'Western']
-    team_conference_map = {t.id: t.conference for t in teams}
+    Games created before seeds were stored get one derived from their id,
+    saved with the result so the game can still be replayed.
+    """
+    if game.seed is None:
+        game.seed = derive_game_seed(get_simulation_seed(game.simulation), game.season, 'game', game.id)
+    return game.seed
+
+def group_into_slates(games):
+    """Split games (in schedule order) into consecutive slates where no team plays twice.
     
-    # Separate pairs into intra-conference and inter-conference
-    intra_conference_pairs = []
-    inter_conference_pairs = []
+    Game-days of generated schedules are already conflict-free, so each date
+    becomes one slate; the team check still splits older schedules.
+    """
+    slates = []
+    current_slate = []
+    teams_in_slate = set()
     
-    for i, team1 in enumerate(teams):
-        for j, team2 in enumerate(teams):
-            if i < j:  # Avoid duplicates and self-pairs
-                if team1.conference == team2.conference:
-                    intra_conference_pairs.append((team1.id, team2.id))
-                else:
-                    inter_conference_pairs.append((team1.id, team2.id))
-    
-    # Calculate exact distribution to reach games_per_team
-    # For 12 teams: 6 per conference
-    # Each team has: 5 intra-conference opponents + 6 inter-conference opponents = 11 total
-    # We want 82 games total per team
-    # Strategy: favor intra-conference (more games vs same conference)
-    
-    num_intra_opponents = max(len(eastern_teams), len(western_teams)) - 1  # Teams in same conference - 1
-    num_inter_opponents = min(len(eastern_teams), len(western_teams))  # Teams in other conference
-    
-    # Calculate exact games per opponent type
-    # Formula: (intra_games * num_intra) + (inter_games * num_inter) = games_per_team
-    # We want to favor intra, so let's set intra_games = inter_games + 1 (or more)
-    
-    # Start with equal distribution
-    base_games = games_per_team // (num_intra_opponents + num_inter_opponents)
-    remaining = games_per_team % (num_intra_opponents + num_inter_opponents)
-    
-    # Assign base games
-    intra_games = base_games
-    inter_games = base_games
-    
-    # Distribute remaining games to favor intra-conference
-    # Give as many as possible to intra, then to inter if needed
-    if remaining >= num_intra_opponents:
-        # Give 1 extra to all intra opponents
-        intra_games += 1
-        remaining -= num_intra_opponents
-        # Give remaining to inter
-        if remaining > 0 and num_inter_opponents > 0:
-            extra_per_inter = remaining // num_inter_opponents
-            inter_games += extra_per_inter
-            remaining -= (extra_per_inter * num_inter_opponents)
-    else:
-        # Give remaining games to intra (not enough for all)
-        # We'll handle these in the remaining games distribution
-        pass
-    
-    # Verify calculation matches target exactly
-    total_from_base = (intra_games * num_intra_opponents) + (inter_games * num_inter_opponents)
-    
-    # If calculation doesn't match exactly, adjust
-    if total_from_base != games_per_team:
-        # Adjust inter_games to reach exact target
-        diff = games_per_team - total_from_base
-        if diff != 0 and num_inter_opponents > 0:
-            adjustment = diff // num_inter_opponents
-            inter_games += adjustment
-            # Recalculate to verify
-            total_from_base = (intra_games * num_intra_opponents) + (inter_games * num_inter_opponents)
-    
-    # At this point, total_from_base should equal games_per_team exactly
-    # No remaining games should be needed if calculation is correct
-    
-    matchups = []
-    
-    # Add intra-conference games (more games vs same conference)
-    for home_id, away_id in intra_conference_pairs:
-        for k in range(intra_games):
-            if k % 2 == 0:
-                matchups.append((home_id, away_id))
-            else:
-                matchups.append((away_id, home_id))
-    
-    # Add inter-conference games (fewer games vs other conference)
-    for home_id, away_id in inter_conference_pairs:
-        for k in range(inter_games):
-            if k % 2 == 0:
-                matchups.append((home_id, away_id))
-            else:
-                matchups.append((away_id, home_id))
-    
-    # Count games per team to verify and add any remaining games
-    team_ids = [t.id for t in teams]
-    games_per_team_count = {}
-    for team_id in team_ids:
-        games_per_team_count[team_id] = 0
-    
-    for home_id, away_id in matchups:
-        games_per_team_count[home_id] += 1
-        games_per_team_count[away_id] += 1
-    
-    # Check if we need to add more games (use actual count)
-    # Verify all teams have the same number of games (should be exact if calculation is correct)
-    remaining_games = {}
-    all_teams_same = True
-    expected_count = None
-    
-    for team_id in team_ids:
-        current_count = games_per_team_count[team_id]
-        if expected_count is None:
-            expected_count = current_count
-        elif current_count != expected_count:
-            all_teams_same = False
-        
-        needed = games_per_team - current_count
-        if needed > 0:
-            remaining_games[team_id] = needed
-        elif needed < 0:
-            # Team has too many games - this shouldn't happen but log it
-            print(f"WARNING: Team {team_id} has {current_count} games, expected {games_per_team}")
-    
-    # Only run remaining distribution if teams don't already have exactly games_per_team
-    if remaining_games and sum(remaining_games.values()) > 0:
-        # Prefer intra-conference pairs for remaining games
-        random.shuffle(intra_conference_pairs)
-        random.shuffle(inter_conference_pairs)
-        prioritized_pairs = intra_conference_pairs + inter_conference_pairs
-        
-        # Keep adding games until all teams have their remaining games
-        # Only add exactly what's needed based on actual counts
-        max_iterations = games_per_team * num_teams  # Safety limit (should be much less)
-        iterations = 0
-        
-        while sum(remaining_games.values()) > 0 and iterations < max_iterations:
-            iterations += 1
-            made_progress = False
-            
-            # Try intra-conference pairs first, then inter-conference
-            for home_id, away_id in prioritized_pairs:
-                if remaining_games[home_id] > 0 and remaining_games[away_id] > 0:
-                    if random.random() < 0.5:
-                        matchups.append((home_id, away_id))
-                    else:
-                        matchups.append((away_id, home_id))
-                    remaining_games[home_id] -= 1
-                    remaining_games[away_id] -= 1
-                    made_progress = True
-                    if sum(remaining_games.values()) == 0:
-                        break
-            
-            if sum(remaining_games.values()) == 0:
-                break
-                
-            if not made_progress:
-                # If we can't find pairs where both need games, 
-                # add games for any team that still needs them
-                for team_id in team_ids:
-                    if remaining_games[team_id] > 0:
-                        # Prefer same conference opponents
-                        team_conf = team_conference_map[team_id]
-                        same_conf_opponents = [t.id for t in teams if t.conference == team_conf and t.id != team_id]
-                        other_conf_opponents = [t.id for t in teams if t.conference != team_conf]
-                        
-                        # Try same conference first
-                        opponents = same_conf_opponents + other_conf_opponents
-                        for opponent_id in opponents:
-                            if random.random() < 0.5:
-                                matchups.append((team_id, opponent_id))
-                            else:
-                                matchups.append((opponent_id, team_id))
-                            remaining_games[team_id] -= 1
-                            made_progress = True
-                            break
-                        if made_progress:
-                            break
-    
-    # Shuffle and distribute across season
-    random.shuffle(matchups)
-    
-    for home_id, away_id in matchups:
-        game = Game(
-            simulation_id=simulation_id,
-            season=season,
-            date=current_date,
-            home_team_id=home_id,
-            away_team_id=away_id,
-            is_playoff=False,
-            simulated=False
-        )
-        games.append(game)
-        
-        # Advance date (games every 2-3 days on average)
-        current_date += timedelta(days=random.choice([2, 2, 3, 3, 4]))
-    
-    # Save all games
     for game in games:
-        db.session.add(game)
-    
-    db.session.commit()
-    return games
-
-def simulate_season_to_playoffs(simulation_id):
-    """Simulate all regular season games"""
+        new_day = current_slate and game.date != current_slate[-1].date
+        if new_day or game.home_team_id in teams_in_slate or game.away_team_id in teams_in_slate:
+            slates.append(current_slate)
+            current_slate = []
+            teams_in_slate = set()
+        current_slate.append(game)
+        teams_in_slate.update((game.home_team_id, game.away_team_id))
+    
+    if current_slate:
+        slates.append(current_slate)
+    return slates
+
+def _slate_batches(slates, max_games):
+    """Group whole slates into batches of roughly max_games games"""
+    batch = []
+    for slate in slates:
+        batch.extend(slate)
+        if len(batch) >= max_games:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _latest_scores(games, results, team_names, count=5):
+    """Last few results of a batch, for progress events"""
+    return [
+        {
+            'date': game.date.isoformat(),
+            'home_team': team_names.get(game.home_team_id),
+            'away_team': team_names.get(game.away_team_id),
+            'home_score': result['home_score'],
+            'away_score': result['away_score']
+        }
+        for game, result in list(zip(games, results))[-count:]
+    ]
+
+def simulate_season_to_playoffs(simulation_id, parallel=None, progress=None, snapshot=None):
+    """Simulate all regular season games.
+    
+    In parallel mode the schedule is cut into slates (no team plays twice)
+    and each batch of slates is spread over every engine worker. Games are
+    seeded individually, so both modes produce the same results, which are
+    always applied in schedule order.
+    
+    Results are committed every SIMULATION_COMMIT_GAMES games. progress,
+    if given, is called as progress(stage, done, total, **details) after
+    every engine batch; details carry checkpoint (True right after a
+    commit), current_date and latest_scores. Raising from it at a checkpoint
+    stops the simulation with everything so far committed.
+    
+    A stopped or crashed run is resumed from the simulation's checkpoint
+    by calling this again. Pass a LeagueSnapshot to reuse team payloads
+    across calls.
+    """
     simulation = Simulation.query.get(simulation_id)
     season = simulation.current_season
     
-    # Get or create schedule
-    games = Game.query.filter_by(
-        simulation_id=simulation_id,
-        season=season,
-        is_playoff=False
-    ).all()
-    
-    if not games:
-        games = generate_season_schedule(simulation_id, season)
-    
-    # Initialize standings
+    # Schedule and standings rows - no-ops when the season already has them
+    materialize_season_schedule(simulation, season)
     initialize_standings(simulation_id, season)
     
-    # Simulate all regular season games
-    simulated_count = 0
-    commit_interval = 3  # Commit every 3 games to allow progress tracking
-    unsimulated_games = [g for g in games if not g.simulated]
-    total_to_simulate = len(unsimulated_games)
-    
-    for idx, game in enumerate(unsimulated_games):
-        result = simulate_game(game.home_team_id, game.away_team_id, False)
-        save_game_result(game, result)
-        update_standings(game, result)
-        simulated_count += 1
-        
-        # Commit periodically to allow progress tracking
-        if simulated_count % commit_interval == 0 or simulated_count == total_to_simulate:
-            db.session.commit()
+    total_games, last_date = db.session.query(db.func.count(Game.id), db.func.max(Game.date)).filter(
+        Game.simulation_id == simulation_id,
+        Game.season == season,
+        Game.is_playoff.is_(False)
+    ).one()
+    games = _games_after_checkpoint(simulation, season).order_by(Game.date, Game.id).all()
+    simulated_count = _simulate_regular_season_games(
+        simulation_id,
+        season,
+        games,
+        parallel=parallel,
+        progress=progress,
+        commit_every=Config.SIMULATION_COMMIT_GAMES,
+        done_before=total_games - len(games),
+        total=total_games,
+        snapshot=snapshot
+    )
     
     # Update simulation status
     simulation.status = 'season_end'
-    simulation.current_date = games[-1].date if games else simulation.current_date
+    simulation.current_date = last_date or simulation.current_date
     db.session.commit()
     
     return {
@@ -277,223 +153,431 @@ def simulate_season_to_playoffs(simulation_id):
         'status': 'season_end'
     }
 
-def simulate_playoff_round(simulation_id, round_num):
-    """Simulate a playoff round"""
+def _unplayed_regular_season(simulation_id, season):
+    return Game.query.filter(
+        Game.simulation_id == simulation_id,
+        Game.season == season,
+        Game.is_playoff.is_(False),
+        Game.simulated.is_(False)
+    )
+
+def _games_after_checkpoint(simulation, season):
+    """Unplayed regular season games past the simulation's resume cursor.
+    
+    Every run plays games in (date, id) order and commits the cursor with
+    them, so nothing before the cursor is left unplayed.
+    """
+    query = _unplayed_regular_season(simulation.id, season)
+    checkpoint = simulation.checkpoint
+    if checkpoint and checkpoint.get('season') == season and checkpoint.get('stage') == 'regular_season':
+        query = query.filter(
+            tuple_(Game.date, Game.id) > (date.fromisoformat(checkpoint['date']), checkpoint['game_id'])
+        )
+    return query
+
+def _record_checkpoint(simulation, stage, game):
+    """Move the resume cursor to `game`; committed together with its results"""
+    simulation.checkpoint = {
+        'season': game.season,
+        'stage': stage,
+        'date': game.date.isoformat(),
+        'game_id': game.id
+    }
+    simulation.checkpoint_at = datetime.utcnow()
+    # Games and standings changed in this transaction
+    bump_data_version(simulation.id)
+
+def _claim_unplayed(games):
+    """Lock the games' rows for this transaction and drop any already played.
+    
+    A second run over the same games (e.g. a resumed job while the old
+    one is still finishing) waits here and then skips what the other
+    committed, so no result, stat line or standings increment is applied twice.
+    """
+    if not games:
+        return games
+    unplayed = set(db.session.scalars(
+        db.select(Game.id)
+        .where(Game.id.in_([g.id for g in games]), Game.simulated.is_(False))
+        .order_by(Game.id)
+        .with_for_update()
+    ))
+    return [g for g in games if g.id in unplayed]
+
+def simulate_to_date(simulation_id, target_date, parallel=None, progress=None):
+    """Simulate the unplayed regular season games dated up to target_date.
+    
+    Only that slice of the schedule is loaded, and everything (results,
+    stats, standings, simulation date) is committed once at the end. The
+    season moves to season_end when no regular season games are left.
+    """
     simulation = Simulation.query.get(simulation_id)
     season = simulation.current_season
     
-    # Get playoff matchups
-    from services.league_service import get_playoff_teams
-    num_playoff_teams = get_playoff_teams(simulation.num_teams)
+    # No-ops once the season has its schedule and standings rows
+    materialize_season_schedule(simulation, season)
+    _insert_missing_standings(simulation_id, season)
     
-    # Get standings to determine playoff teams
-    standings = Standing.query.filter_by(
-        simulation_id=simulation_id,
-        season=season
-    ).order_by(Standing.points.desc()).limit(num_playoff_teams).all()
+    games = _games_after_checkpoint(simulation, season)\
+        .filter(Game.date <= target_date)\
+        .order_by(Game.date, Game.id).all()
     
-    playoff_teams = [s.team_id for s in standings]
-    
-    # Generate or get playoff games
-    playoff_games = Game.query.filter_by(
-        simulation_id=simulation_id,
-        season=season,
-        is_playoff=True,
-        playoff_round=round_num,
-        simulated=False
-    ).all()
-    
-    if not playoff_games:
-        # Generate playoff matchups (best-of-7 series)
-        playoff_games = generate_playoff_matchups(simulation_id, season, round_num, playoff_teams)
+    simulated_count = _simulate_regular_season_games(
+        simulation_id, season, games, parallel=parallel, progress=progress
+    )
     
-    # Simulate games
-    for game in playoff_games:
-        result = simulate_game(game.home_team_id, game.away_team_id, True)
-        save_game_result(game, result)
+    if simulation.current_date is None or target_date >= simulation.current_date:
+        simulation.current_date = target_date + timedelta(days=1)
     
+    games_left = db.session.query(_unplayed_regular_season(simulation_id, season).exists()).scalar()
+    if not games_left:
+        simulation.status = 'season_end'
     db.session.commit()
     
     return {
-        'message': f'Simulated playoff round {round_num}',
-        'games_simulated': len(playoff_games)
+        'message': f'Simulated {simulated_count} regular season games',
+        'season': season,
+        'games_simulated': simulated_count,
+        'current_date': simulation.current_date.isoformat(),
+        'status': simulation.status
     }
 
-def simulate_full_season(simulation_id):
-    """Simulate entire season including playoffs"""
+def simulate_days(simulation_id, days, parallel=None, progress=None):
+    """Simulate the next `days` game-days of the regular season (see simulate_to_date)"""
+    simulation = Simulation.query.get(simulation_id)
+    season = simulation.current_season
+    materialize_season_schedule(simulation, season)
+    
+    next_days = _games_after_checkpoint(simulation, season)\
+        .with_entities(Game.date)\
+        .distinct()\
+        .order_by(Game.date)\
+        .limit(days)\
+        .subquery()
+    last_date = db.session.query(db.func.max(next_days.c.date)).scalar()
+    
+    # Nothing left to play - simulate_to_date still closes out the season
+    if last_date is None:
+        last_date = (simulation.current_date or date.today()) - timedelta(days=1)
+    return simulate_to_date(simulation_id, last_date, parallel=parallel, progress=progress)
+
+def _simulate_regular_season_games(simulation_id, season, games, parallel=None, progress=None,
+                                   commit_every=None, done_before=0, total=None, snapshot=None):
+    """Simulate the given regular season games in engine batches.
+    
+    Results, stats and standings go into the session. With commit_every
+    set they are committed every commit_every games (a checkpoint), each
+    commit also moving the simulation's resume cursor; otherwise the
+    caller commits. Standings and the cursor are updated at the end.
+    Returns the number of games simulated.
+    """
+    if parallel is None:
+        parallel = Config.PARALLEL_SIMULATION
+    if total is None:
+        total = done_before + len(games)
+    
+    if snapshot is None:
+        snapshot = LeagueSnapshot(simulation_id)
+    simulation = Simulation.query.get(simulation_id)
+    simulated_count = 0
+    last_game = None
+    batch_size = Config.ENGINE_BATCH_SIZE
+    
+    if parallel:
+        run_batch = simulate_games_parallel
+        batches = _slate_batches(
+            group_into_slates(games),
+            batch_size * get_engine_pool().size
+        )
+    else:
+        run_batch = simulate_games
+        batches = (
+            games[start:start + batch_size]
+            for start in range(0, len(games), batch_size)
+        )
+    
+    standings = StandingsAccumulator(simulation_id, season)
+    uncommitted = 0
+    # Names read up front - committing expires the snapshot's Team objects
+    team_names = {team_id: team.name for team_id, team in snapshot.teams.items()}
+    
+    for batch in batches:
+        batch = _claim_unplayed(batch)
+        if not batch:
+            continue
+        results = run_batch(
+            [(g.home_team_id, g.away_team_id) for g in batch],
+            False,
+            snapshot=snapshot,
+            seeds=[_game_seed(g) for g in batch]
+        )
+        
+        # Apply in schedule order
+        stat_rows = []
+        for game, result in zip(batch, results):
+            save_game_result(game, result, stat_rows)
+            standings.add_game(game, result)
+            simulated_count += 1
+        bulk_insert_player_stats(stat_rows)
+        uncommitted += len(batch)
+        last_game = batch[-1]
+        
+        # Progress is pushed per batch, so commits can be much less frequent
+        checkpoint = bool(commit_every) and uncommitted >= commit_every
+        if checkpoint:
+            # Scores, stats, standings and cursor land in one transaction
+            standings.flush()
+            _record_checkpoint(simulation, 'regular_season', last_game)
+            db.session.commit()
+            uncommitted = 0
+        if progress:
+            progress(
+                'regular_season',
+                done_before + simulated_count,
+                total,
+                checkpoint=checkpoint,
+                current_date=batch[-1].date.isoformat(),
+                latest_scores=_latest_scores(batch, results, team_names)
+            )
+    
+    standings.flush()
+    if last_game is not None:
+        _record_checkpoint(simulation, 'regular_season', last_game)
+    return simulated_count
+
+def simulate_full_season(simulation_id, progress=None, parallel=None, snapshot=None):
+    """Simulate entire season including playoffs, then advance to the next season.
+    
+    progress is passed on to simulate_season_to_playoffs and also called
+    after every (committed) playoff game, with total None. The season can
+    be picked up from any regular season or playoff state.
+    """
+    simulation = Simulation.query.get(simulation_id)
+    if simulation.status not in ('season', 'season_end', 'playoffs'):
+        return {'error': 'Simulation is not in a season'}
+    if snapshot is None:
+        snapshot = LeagueSnapshot(simulation_id)
+
     # Simulate regular season
-    result = simulate_season_to_playoffs(simulation_id)
+    if simulation.status == 'season':
+        simulate_season_to_playoffs(simulation_id, parallel=parallel, progress=progress, snapshot=snapshot)
 
     # Enter playoffs and simulate through completion
-    enter_playoffs(simulation_id)
-    while True:
-        incomplete = PlayoffSeries.query.filter_by(
-            simulation_id=simulation_id,
-            season=Simulation.query.get(simulation_id).current_season,
-            status='in_progress'
-        ).count()
-        if incomplete == 0:
-            break
+    playoffs = enter_playoffs(simulation_id)
+    if 'error' in playoffs:
+        return playoffs
+    simulate_postseason(simulation_id, snapshot=snapshot, progress=progress)
+    advance_season(simulation)
 
-        series = PlayoffSeries.query.filter_by(
-            simulation_id=simulation_id,
-            season=Simulation.query.get(simulation_id).current_season,
-            status='in_progress'
-        ).order_by(PlayoffSeries.round.asc(), PlayoffSeries.id.asc()).first()
-        if not series:
-            break
-        simulate_playoff_game(simulation_id, series.id)
+    return {
+        'message': 'Season completed',
+        'next_season': simulation.current_season
+    }
 
-    simulation = Simulation.query.get(simulation_id)
+def simulate_postseason(simulation_id, snapshot=None, progress=None):
+    """Play every remaining playoff game of the current season in one transaction.
+    
+    Uses the in-memory PlayoffResolver (one engine call per round). Does
+    not advance the season (see advance_season). Returns the number of
+    games played.
+    """
+    from services.playoff_service import resolve_playoffs
+    if progress:
+        progress('playoffs', 0, None)
+    result = resolve_playoffs(simulation_id, snapshot=snapshot)
+    if progress:
+        progress('playoffs', result['games_simulated'], None, checkpoint=True)
+    return result['games_simulated']
+
+def advance_season(simulation):
+    """Award the finished season's trophies and roll over to the next season.
+    
+    The simulation row is locked and re-read first: if another request or
+    job already rolled this season over (status no longer 'playoffs', or a
+    different current_season), nothing happens. Trophies, the career stats
+    fold and the new schedule commit together with the rollover. Returns
+    True if the season was advanced.
+    """
     completed_season = simulation.current_season
-    
-    # Award trophies for the completed season
+    locked = Simulation.query.filter_by(id=simulation.id)\
+        .with_for_update().populate_existing().one()
+    if locked.status != 'playoffs' or locked.current_season != completed_season:
+        db.session.commit()  # Release the lock
+        return False
+    
+    # Award trophies for the completed season - a failure leaves the season
+    # unfinished (and retryable) rather than rolling over without them
     from services.trophy_service import award_trophies
     try:
-        award_trophies(simulation_id, completed_season)
-    except Exception as e:
-        print(f"Error awarding trophies for season {completed_season}: {e}")
-        # Continue even if trophy awarding fails
+        award_trophies(simulation.id, completed_season, commit=False)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception(
+            'Awarding trophies for season %s of simulation %s failed', completed_season, simulation.id
+        )
+        raise
     
-    simulation.current_season += 1
+    simulation.current_season = completed_season + 1
     simulation.status = 'season'
+    simulation.checkpoint = None
+    
+    # Roll the completed season into the career totals
+    from services.stats_service import fold_career_stats
+    fold_career_stats(simulation)
     
-    # Generate schedule for the new season
-    generate_season_schedule(simulation_id, simulation.current_season)
+    # Schedule for the new season - one insert from the template
+    materialize_season_schedule(simulation, simulation.current_season)
+    bump_data_version(simulation.id)
     
     db.session.commit()
-
-    return {
-        'message': 'Season completed',
-        'next_season': simulation.current_season
-    }
+    return True
 
 def initialize_standings(simulation_id, season):
     """Initialize standings for all teams"""
-    teams = Team.query.filter_by(simulation_id=simulation_id).all()
-    
-    for team in teams:
-        existing = Standing.query.filter_by(
-            team_id=team.id,
-            simulation_id=simulation_id,
-            season=season
-        ).first()
-        
-        if not existing:
-            standing = Standing(
-                team_id=team.id,
-                simulation_id=simulation_id,
-                season=season,
-                wins=0,
-                losses=0,
-                ot_losses=0,
-                points=0,
-                goals_for=0,
-                goals_against=0
-            )
-            db.session.add(standing)
-    
+    _insert_missing_standings(simulation_id, season)
+    bump_data_version(simulation_id)
     db.session.commit()
 
-def save_game_result(game, result):
-    """Save game result and player stats"""
+def _insert_missing_standings(simulation_id, season):
+    """Add zeroed standings rows for teams that have none this season (one statement)"""
+    teams = db.select(
+        Team.id,
+        db.literal(simulation_id),
+        db.literal(season),
+        *[db.literal(0)] * len(StandingsAccumulator.COLUMNS)
+    ).where(Team.simulation_id == simulation_id)
+    
+    db.session.execute(
+        pg_insert(Standing.__table__).from_select(
+            ['team_id', 'simulation_id', 'season', *StandingsAccumulator.COLUMNS],
+            teams
+        ).on_conflict_do_nothing(index_elements=['team_id', 'simulation_id', 'season'])
+    )
+
+PLAYER_STAT_FIELDS = (
+    'goals', 'assists', 'shots', 'hits', 'blocks', 'plus_minus', 'time_on_ice',
+    'takeaways', 'giveaways', 'saves', 'goals_against', 'shots_against'
+)
+
+def player_stat_rows(game, result):
+    """PlayerStat rows (plain dicts) for one simulated game"""
+    rows = []
+    for team_id, stats in ((game.home_team_id, result['home_stats']),
+                           (game.away_team_id, result['away_stats'])):
+        for stat in stats:
+            row = {field: stat.get(field, 0) for field in PLAYER_STAT_FIELDS}
+            row['game_id'] = game.id
+            row['player_id'] = stat['player_id']
+            row['team_id'] = team_id
+            rows.append(row)
+    return rows
+
+def bulk_insert_player_stats(rows):
+    """Write accumulated PlayerStat rows with multi-row INSERTs.
+    
+    Rows that already exist for the same (game_id, player_id) are skipped
+    via idx_player_stats_unique, so saving a game twice never duplicates
+    its stats. The rows actually inserted are added to player_season_stats
+    in the same transaction.
+    """
+    from services.stats_service import accumulate_season_stats
+    
+    if not rows:
+        return
+    stmt = pg_insert(PlayerStat.__table__).on_conflict_do_nothing(
+        index_elements=['game_id', 'player_id']
+    ).returning(PlayerStat.id)
+    inserted = db.session.execute(stmt, rows).scalars().all()
+    # Season totals join the game rows - make sure their scores are written
+    db.session.flush()
+    accumulate_season_stats(inserted)
+
+def save_game_result(game, result, stat_rows=None):
+    """Save game result and player stats.
+    
+    Pass a list as stat_rows to collect the stat rows for a later
+    bulk_insert_player_stats call instead of inserting them now.
+    """
     game.home_score = result['home_score']
     game.away_score = result['away_score']
+    game.went_to_overtime = result.get('went_to_overtime', False)
+    game.went_to_shootout = result.get('went_to_shootout', False)
     game.simulated = True
     
-    # Save player stats
-    for stat in result['home_stats']:
-        player_stat = PlayerStat(
-            game_id=game.id,
-            player_id=stat['player_id'],
-            team_id=game.home_team_id,
-            goals=stat['goals'],
-            assists=stat['assists'],
-            shots=stat['shots'],
-            hits=stat['hits'],
-            blocks=stat['blocks'],
-            plus_minus=stat['plus_minus'],
-            time_on_ice=stat.get('time_on_ice', 0),
-            takeaways=stat.get('takeaways', 0),
-            giveaways=stat.get('giveaways', 0),
-            saves=stat.get('saves', 0),
-            goals_against=stat.get('goals_against', 0),
-            shots_against=stat.get('shots_against', 0)
-        )
-        db.session.add(player_stat)
-    
-    for stat in result['away_stats']:
-        player_stat = PlayerStat(
-            game_id=game.id,
-            player_id=stat['player_id'],
-            team_id=game.away_team_id,
-            goals=stat['goals'],
-            assists=stat['assists'],
-            shots=stat['shots'],
-            hits=stat['hits'],
-            blocks=stat['blocks'],
-            plus_minus=stat['plus_minus'],
-            time_on_ice=stat.get('time_on_ice', 0),
-            takeaways=stat.get('takeaways', 0),
-            giveaways=stat.get('giveaways', 0),
-            saves=stat.get('saves', 0),
-            goals_against=stat.get('goals_against', 0),
-            shots_against=stat.get('shots_against', 0)
-        )
-        db.session.add(player_stat)
+    rows = player_stat_rows(game, result)
+    if stat_rows is not None:
+        stat_rows.extend(rows)
+    else:
+        bulk_insert_player_stats(rows)
 
-def update_standings(game, result):
-    """Update standings after a game"""
-    home_standing = Standing.query.filter_by(
-        team_id=game.home_team_id,
-        simulation_id=game.simulation_id,
-        season=game.season
-    ).first()
+class StandingsAccumulator:
+    """Standings changes for one simulation season, kept in memory between checkpoints.
     
-    away_standing = Standing.query.filter_by(
-        team_id=game.away_team_id,
-        simulation_id=game.simulation_id,
-        season=game.season
-    ).first()
+    add_game() applies a result in memory; flush() adds the accumulated
+    deltas to the standings rows with a single upsert in the caller's
+    transaction, so each commit shows standings that match exactly the
+    games it marks as simulated.
+    """
     
-    went_to_overtime = result.get('went_to_overtime', False)
-    went_to_shootout = result.get('went_to_shootout', False)
+    COLUMNS = ('wins', 'losses', 'ot_losses', 'points', 'goals_for', 'goals_against')
     
-    if home_standing:
-        home_standing.goals_for += result['home_score']
-        home_standing.goals_against += result['away_score']
+    def __init__(self, simulation_id, season):
+        self.simulation_id = simulation_id
+        self.season = season
+        self._deltas = {}
+    
+    def _team(self, team_id):
+        if team_id not in self._deltas:
+            self._deltas[team_id] = dict.fromkeys(self.COLUMNS, 0)
+        return self._deltas[team_id]
+    
+    def add_game(self, game, result):
+        went_to_overtime = result.get('went_to_overtime', False)
         
-        if result['home_score'] > result['away_score']:
-            home_standing.wins += 1
-            home_standing.points += 2
-        elif result['home_score'] < result['away_score']:
-            # Loss in regulation or OT
-            if went_to_overtime and not game.is_playoff:
-                # Overtime loss (OTL) - 1 point
-                home_standing.ot_losses += 1
-                home_standing.points += 1
-            else:
-                # Regulation loss
-                home_standing.losses += 1
-        # If tied, it's a playoff game that went to multiple OTs (handled above)
-    
-    if away_standing:
-        away_standing.goals_for += result['away_score']
-        away_standing.goals_against += result['home_score']
+        for team_id, goals_for, goals_against in (
+            (game.home_team_id, result['home_score'], result['away_score']),
+            (game.away_team_id, result['away_score'], result['home_score'])
+        ):
+            standing = self._team(team_id)
+            standing['goals_for'] += goals_for
+            standing['goals_against'] += goals_against
+            
+            if goals_for > goals_against:
+                standing['wins'] += 1
+                standing['points'] += 2
+            elif goals_for < goals_against:
+                # Loss in regulation or OT
+                if went_to_overtime and not game.is_playoff:
+                    # Overtime loss (OTL) - 1 point
+                    standing['ot_losses'] += 1
+                    standing['points'] += 1
+                else:
+                    # Regulation loss
+                    standing['losses'] += 1
+            # If tied, it's a playoff game that went to multiple OTs
+    
+    def flush(self):
+        """Write accumulated deltas in one INSERT ... ON CONFLICT DO UPDATE"""
+        if not self._deltas:
+            return
         
-        if result['away_score'] > result['home_score']:
-            away_standing.wins += 1
-            away_standing.points += 2
-        elif result['away_score'] < result['home_score']:
-            # Loss in regulation or OT
-            if went_to_overtime and not game.is_playoff:
-                # Overtime loss (OTL) - 1 point
-                away_standing.ot_losses += 1
-                away_standing.points += 1
-            else:
-                # Regulation loss
-                away_standing.losses += 1
-        # If tied, it's a playoff game that went to multiple OTs (handled above)
+        table = Standing.__table__
+        stmt = pg_insert(table).values([
+            dict(deltas, team_id=team_id, simulation_id=self.simulation_id, season=self.season)
+            for team_id, deltas in self._deltas.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['team_id', 'simulation_id', 'season'],
+            set_={column: table.c[column] + stmt.excluded[column] for column in self.COLUMNS}
+        )
+        db.session.execute(stmt)
+        self._deltas = {}
+
+def update_standings(game, result):
+    """Update standings after a single game"""
+    standings = StandingsAccumulator(game.simulation_id, game.season)
+    standings.add_game(game, result)
+    standings.flush()
 
 def enter_playoffs(simulation_id):
     """Create playoff bracket and enter playoffs state - conference-based"""
@@ -626,30 +710,38 @@ def _series_home_team(series, game_number):
         return series.higher_seed_team_id, series.lower_seed_team_id
     return series.lower_seed_team_id, series.higher_seed_team_id
 
-def _ensure_playoff_winner(result):
+def _ensure_playoff_winner(result, seed):
     if result['home_score'] != result['away_score']:
         return result
-    if random.random() < 0.5:
+    if random.Random(seed).random() < 0.5:
         result['home_score'] += 1
     else:
         result['away_score'] += 1
+    result['went_to_overtime'] = True
     return result
 
-def simulate_playoff_game(simulation_id, series_id):
-    """Simulate the next game in a playoff series"""
-    simulation = Simulation.query.get(simulation_id)
+def simulate_playoff_game(simulation_id, series_id, snapshot=None, advance=True):
+    """Simulate the next game in a playoff series.
+    
+    Pass a LeagueSnapshot when simulating several games in a row so the
+    team payloads are loaded once. With advance=False the season is not
+    rolled over when the last series ends - the caller does it.
+    """
+    # Locked until commit so two runs can't both play the same game number;
+    # simulation first, in the same order as PlayoffResolver and advance_season
+    simulation = Simulation.query.filter_by(id=simulation_id)\
+        .with_for_update().populate_existing().one()
     series = PlayoffSeries.query.filter_by(
         id=series_id,
         simulation_id=simulation_id,
         season=simulation.current_season
-    ).first()
+    ).with_for_update().populate_existing().first()
     if not series:
+        db.session.rollback()
         return {'error': 'Series not found'}
 
-    if series.status != 'in_progress':
-        return {'error': 'Series already completed'}
-
-    if series.next_game_number > 7:
+    if series.status != 'in_progress' or series.next_game_number > 7:
+        db.session.rollback()
         return {'error': 'Series already completed'}
 
     home_id, away_id = _series_home_team(series, series.next_game_number)
@@ -663,13 +755,21 @@ def simulate_playoff_game(simulation_id, series_id):
         is_playoff=True,
         playoff_round=series.round,
         series_id=series.id,
-        simulated=False
+        simulated=False,
+        seed=_playoff_game_seed(
+            simulation, series.season, series.round,
+            series.higher_seed_team_id, series.lower_seed_team_id, series.next_game_number
+        )
     )
     db.session.add(game)
     db.session.flush()
 
-    result = simulate_game(home_id, away_id, True)
-    result = _ensure_playoff_winner(result)
+    if snapshot is None:
+        snapshot = LeagueSnapshot(simulation_id)
+    result = simulate_games(
+        [(home_id, away_id)], True, snapshot=snapshot, seeds=[_game_seed(game)]
+    )[0]
+    result = _ensure_playoff_winner(result, game.seed)
     save_game_result(game, result)
 
     if result['home_score'] > result['away_score']:
@@ -693,19 +793,46 @@ def simulate_playoff_game(simulation_id, series_id):
         series_completed = True
 
     simulation.current_date = game_date + timedelta(days=1)
-    db.session.commit()
-
+    _record_checkpoint(simulation, 'playoffs', game)
+    # The next round is created in the same transaction as the game that completes this one
     _create_next_round_if_ready(simulation_id, simulation.current_season, series.round)
+    db.session.commit()
     
     # Check if playoffs are complete when a series finishes
     # This handles both individual game simulation and round simulation
-    if series_completed:
+    if series_completed and advance:
         # Refresh simulation object to get latest status
         db.session.refresh(simulation)
         _check_and_advance_to_next_season(simulation_id)
 
     return {'message': 'Game simulated', 'series_id': series.id}
 
+def replay_game(simulation_id, game_id):
+    """Re-run a simulated game from its stored seed without saving anything.
+    
+    The replay matches the original exactly as long as both teams' lines,
+    play style and coach are unchanged since the game was played.
+    """
+    game = Game.query.filter_by(id=game_id, simulation_id=simulation_id).first()
+    if not game:
+        return {'error': 'Game not found'}
+    if not game.simulated or game.seed is None:
+        return {'error': 'Game has no stored seed to replay'}
+    
+    result = simulate_games(
+        [(game.home_team_id, game.away_team_id)], game.is_playoff, seeds=[game.seed]
+    )[0]
+    if game.series_id:
+        result = _ensure_playoff_winner(result, game.seed)
+    
+    return {
+        'game': game.to_dict(),
+        'result': result,
+        'matches_stored_score': (
+            result['home_score'] == game.home_score and result['away_score'] == game.away_score
+        )
+    }
+
 def _check_and_advance_to_next_season(simulation_id):
     """Check if playoffs are complete and advance to next season if so"""
     # Re-query to ensure we have the latest simulation state
@@ -728,36 +855,23 @@ def _check_and_advance_to_next_season(simulation_id):
     if incomplete == 0:
         # All playoffs complete - award trophies and advance to next season
         completed_season = simulation.current_season
-        print(f"All playoff series complete for season {completed_season}. Advancing to next season...")
-        
-        from services.trophy_service import award_trophies
-        try:
-            award_trophies(simulation_id, completed_season)
-            print(f"Trophies awarded for season {completed_season}")
-        except Exception as e:
-            print(f"Error awarding trophies for season {completed_season}: {e}")
-            import traceback
-            traceback.print_exc()
-            # Continue even if trophy awarding fails
-        
-        # Re-query simulation to ensure we have the latest state
-        simulation = Simulation.query.get(simulation_id)
-        simulation.current_season += 1
-        simulation.status = 'season'
-        
-        # Generate schedule for the new season
-        generate_season_schedule(simulation_id, simulation.current_season)
-        
-        db.session.commit()
-        print(f"Playoffs complete for season {completed_season}. Advanced to season {simulation.current_season}. Status: {simulation.status}")
+        if not advance_season(simulation):
+            return
+        current_app.logger.info(
+            'Playoffs complete for season %s of simulation %s; advanced to season %s',
+            completed_season, simulation_id, simulation.current_season
+        )
 
 def _create_next_round_if_ready(simulation_id, season, round_num):
-    """Create next playoff round, keeping conferences separate until final"""
+    """Create next playoff round, keeping conferences separate until final.
+    
+    Adds the series to the session; the caller commits.
+    """
     current_series = PlayoffSeries.query.filter_by(
         simulation_id=simulation_id,
         season=season,
         round=round_num
-    ).all()
+    ).order_by(PlayoffSeries.id).all()
     if not current_series:
         return
 
@@ -773,171 +887,25 @@ def _create_next_round_if_ready(simulation_id, season, round_num):
     if existing_next:
         return
 
-    from models.team import Team
-    teams = Team.query.filter_by(simulation_id=simulation_id).all()
-    team_lookup = {t.id: t for t in teams}
-
-    # Separate winners by conference
-    eastern_winners = []
-    western_winners = []
-    
-    for series in sorted(current_series, key=lambda s: s.id):
-        winner_id = series.winner_team_id
-        winner_team = team_lookup.get(winner_id)
-        if winner_team:
-            if winner_team.conference == 'Eastern':
-                eastern_winners.append(winner_id)
-            else:
-                western_winners.append(winner_id)
-
-    # If we have both conferences with winners, keep them separate until final
-    # Final round (when only 2 teams remain total) merges conferences
-    total_winners = len(eastern_winners) + len(western_winners)
-    
-    # Check if current round is already the final (has teams from different conferences)
-    is_current_final = False
-    if len(current_series) == 1:
-        series = current_series[0]
-        higher_team = team_lookup.get(series.higher_seed_team_id)
-        lower_team = team_lookup.get(series.lower_seed_team_id)
-        if higher_team and lower_team and higher_team.conference != lower_team.conference:
-            is_current_final = True
-    
-    # Don't create another round if current round is the final
-    if is_current_final:
-        return
-    
-    if total_winners == 2:
-        # Final round - merge conferences
-        higher_seed = eastern_winners[0] if eastern_winners else western_winners[0]
-        lower_seed = western_winners[0] if western_winners else eastern_winners[0]
-        series = PlayoffSeries(
+    conferences = dict(
+        db.session.query(Team.id, Team.conference).filter(Team.simulation_id == simulation_id).all()
+    )
+    from services.playoff_service import next_round_pairs
+    for higher_seed, lower_seed in next_round_pairs(current_series, conferences.get):
+        db.session.add(PlayoffSeries(
             simulation_id=simulation_id,
             season=season,
             round=next_round,
             higher_seed_team_id=higher_seed,
             lower_seed_team_id=lower_seed
-        )
-        db.session.add(series)
-    else:
-        # Create series within each conference
-        if len(eastern_winners) >= 2:
-            num_eastern = len(eastern_winners) // 2
-            for i in range(num_eastern):
-                higher_seed = eastern_winners[i]
-                lower_seed = eastern_winners[-(i + 1)]
-                series = PlayoffSeries(
-                    simulation_id=simulation_id,
-                    season=season,
-                    round=next_round,
-                    higher_seed_team_id=higher_seed,
-                    lower_seed_team_id=lower_seed
-                )
-                db.session.add(series)
-        
-        if len(western_winners) >= 2:
-            num_western = len(western_winners) // 2
-            for i in range(num_western):
-                higher_seed = western_winners[i]
-                lower_seed = western_winners[-(i + 1)]
-                series = PlayoffSeries(
-                    simulation_id=simulation_id,
-                    season=season,
-                    round=next_round,
-                    higher_seed_team_id=higher_seed,
-                    lower_seed_team_id=lower_seed
-                )
-                db.session.add(series)
-    
-    db.session.commit()
+        ))
 
 def get_playoff_bracket(simulation_id):
     """Get playoff series grouped by round"""
-    simulation = Simulation.query.get(simulation_id)
-    season = simulation.current_season
-    series_list = PlayoffSeries.query.filter_by(
-        simulation_id=simulation_id,
-        season=season
-    ).order_by(PlayoffSeries.round.asc(), PlayoffSeries.id.asc()).all()
-
-    from models.team import Team
-    teams = Team.query.filter_by(simulation_id=simulation_id).all()
-    team_lookup = {t.id: t for t in teams}
-
-    rounds = {}
-    for series in series_list:
-        last_game = Game.query.filter_by(series_id=series.id).order_by(Game.id.desc()).first()
-        higher_team = team_lookup.get(series.higher_seed_team_id)
-        lower_team = team_lookup.get(series.lower_seed_team_id)
-        winner_team = team_lookup.get(series.winner_team_id) if series.winner_team_id else None
-        
-        # Determine conference - use higher seed team's conference, or winner's if available
-        conference = None
-        if winner_team:
-            conference = winner_team.conference
-        elif higher_team:
-            conference = higher_team.conference
-        elif lower_team:
-            conference = lower_team.conference
-        
-        rounds.setdefault(series.round, []).append({
-            **series.to_dict(),
-            'higher_seed_team': higher_team.to_dict() if higher_team else None,
-            'lower_seed_team': lower_team.to_dict() if lower_team else None,
-            'winner_team': winner_team.to_dict() if winner_team else None,
-            'conference': conference,
-            'last_game': last_game.to_dict() if last_game else None
-        })
+    from services.playoff_service import playoff_bracket
 
+    simulation = Simulation.query.get(simulation_id)
     return {
-        'rounds': rounds,
-        'season': season,
+        **playoff_bracket(simulation_id, simulation.current_season),
         'status': simulation.status
     }
-
-def generate_playoff_matchups(simulation_id, season, round_num, playoff_teams):
-    """Generate playoff matchups for a round"""
-    games = []
-    
-    # For simplicity, pair teams sequentially (1v8, 2v7, etc.)
-    matchups = []
-    num_matchups = len(playoff_teams) // (2 ** round_num)
-    
-    for i in range(num_matchups):
-        higher_seed = playoff_teams[i]
-        lower_seed = playoff_teams[-(i + 1)]
-        matchups.append((higher_seed, lower_seed))
-    
-    # Generate best-of-7 series (4 home for higher seed, 3 for lower)
-    base_date = date(1980 + season - 1, 4, 1)  # Playoffs start in April
-    
-    for home_id, away_id in matchups:
-        # Games 1, 2, 5, 7 at higher seed, games 3, 4, 6 at lower seed
-        game_locations = [
-            (home_id, away_id),  # Game 1
-            (home_id, away_id),  # Game 2
-            (away_id, home_id),  # Game 3
-            (away_id, home_id),  # Game 4
-            (home_id, away_id),  # Game 5
-            (away_id, home_id),  # Game 6
-            (home_id, away_id),  # Game 7
-        ]
-        
-        current_date = base_date + timedelta(days=(round_num - 1) * 14)
-        
-        for i, (h, a) in enumerate(game_locations):
-            game = Game(
-                simulation_id=simulation_id,
-                season=season,
-                date=current_date + timedelta(days=i * 2),
-                home_team_id=h,
-                away_team_id=a,
-                is_playoff=True,
-                playoff_round=round_num,
-                simulated=False
-            )
-            games.append(game)
-            db.session.add(game)
-    
-    db.session.commit()
-    return games
@@ -0,0 +1,293 @@
+"""Background simulation jobs backed by the simulation_jobs table.
+
+Requests enqueue a job row and return its id right away. Worker threads in
+the web process claim queued rows with SELECT ... FOR UPDATE SKIP LOCKED,
+so several processes can share the queue without an external broker.
+Workers start with the first request a process handles (scripts that
+import the app never start them).
+
+Running jobs record a heartbeat every JOB_HEARTBEAT_INTERVAL seconds from a
+timer thread, and their progress at every simulation checkpoint. A job
+whose worker died (no heartbeat for JOB_STALE_AFTER seconds) is claimed
+again and resumes from the simulation's checkpoint, up to JOB_MAX_ATTEMPTS
+times. The season(s) a job covers are fixed in its params when it is
+queued, so a resumed job never plays past them.
+"""
+import threading
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from extensions import db
+from models.job import SimulationJob
+from models.simulation import Simulation
+from services.progress_service import progress_publisher, publish_finished
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobCancelled(Exception):
+    """Raised from the progress hook when a running job has been cancelled"""
+
+
+def _checked(result):
+    # Services report refusals as {'error': ...}; a job with one has failed
+    if 'error' in result:
+        raise ValueError(result['error'])
+    return result
+
+
+def _season_passed(simulation_id, season):
+    """True once the simulation has rolled over past `season` (e.g. before a resume)"""
+    if season is None:
+        return False
+    return Simulation.query.get(simulation_id).current_season > season
+
+
+def _simulate_season(simulation_id, progress, target_season=None):
+    from services.game_service import simulate_full_season
+    if _season_passed(simulation_id, target_season):
+        return {'message': f'Season {target_season} already completed', 'next_season': target_season + 1}
+    return _checked(simulate_full_season(simulation_id, progress=progress))
+
+
+def _simulate_to_playoffs(simulation_id, progress, parallel=None, target_season=None):
+    from services.game_service import simulate_season_to_playoffs
+    if _season_passed(simulation_id, target_season):
+        return {'message': f'Season {target_season} already completed'}
+    return simulate_season_to_playoffs(simulation_id, parallel=parallel, progress=progress)
+
+
+def _simulate_seasons(simulation_id, progress, seasons=None, parallel=None, final_season=None):
+    from services.dynasty_service import simulate_seasons
+    if final_season is not None:
+        # Only what is left of the run - a resumed job already played the seasons before current_season
+        seasons = final_season - Simulation.query.get(simulation_id).current_season + 1
+        if seasons <= 0:
+            return {
+                'message': 'Simulated 0 seasons',
+                'seasons_simulated': 0,
+                'next_season': final_season + 1,
+                'champions': []
+            }
+    return _checked(simulate_seasons(simulation_id, seasons=seasons, parallel=parallel, progress=progress))
+
+
+def _target_params(simulation, job_type, params):
+    """Seasons the job covers, fixed at enqueue time so a resumed job stops where the original would have"""
+    if job_type == 'simulate_seasons':
+        from services.dynasty_service import remaining_seasons
+        seasons = remaining_seasons(simulation)
+        if isinstance(params.get('seasons'), int):
+            seasons = min(params['seasons'], seasons)
+        # At least the current season, so a finished simulation still gets the service's refusal
+        return {'final_season': simulation.current_season + max(seasons, 1) - 1}
+    return {'target_season': simulation.current_season}
+
+
+# job_type -> (handler, accepted params); target_season/final_season are set by enqueue_job
+JOB_TYPES = {
+    'simulate_season': (_simulate_season, ()),
+    'simulate_to_playoffs': (_simulate_to_playoffs, ('parallel',)),
+    'simulate_seasons': (_simulate_seasons, ('seasons', 'parallel')),
+}
+
+
+def get_active_job(simulation_id):
+    return SimulationJob.query.filter(
+        SimulationJob.simulation_id == simulation_id,
+        SimulationJob.status.in_(ACTIVE_STATUSES)
+    ).order_by(SimulationJob.id).first()
+
+
+def enqueue_job(simulation_id, user_id, job_type, params=None):
+    """Queue a job for a simulation. Returns (job, error)."""
+    if job_type not in JOB_TYPES:
+        return None, f"Unknown job type: {job_type}"
+
+    _, accepted = JOB_TYPES[job_type]
+    params = {key: value for key, value in (params or {}).items() if key in accepted}
+
+    # One job per simulation at a time - they all write the same season
+    if get_active_job(simulation_id):
+        return None, 'A simulation job is already queued or running'
+
+    simulation = Simulation.query.get(simulation_id)
+    params.update(_target_params(simulation, job_type, params))
+
+    job = SimulationJob(
+        simulation_id=simulation_id,
+        user_id=user_id,
+        job_type=job_type,
+        params=params,
+        status='queued'
+    )
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with another enqueue - idx_simulation_jobs_one_active
+        db.session.rollback()
+        return None, 'A simulation job is already queued or running'
+
+    _wake_workers.set()
+    return job, None
+
+
+def cancel_job(job):
+    """Cancel a queued job now, or ask a running job to stop at its next checkpoint"""
+    if job.status == 'queued':
+        job.status = 'cancelled'
+        job.finished_at = datetime.utcnow()
+    elif job.status == 'running':
+        job.cancel_requested = True
+    db.session.commit()
+    return job
+
+
+def _claim_next_job():
+    """Claim the oldest queued job, or a running one whose worker stopped responding"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=Config.JOB_STALE_AFTER)
+    job = SimulationJob.query.filter(or_(
+        SimulationJob.status == 'queued',
+        and_(SimulationJob.status == 'running', SimulationJob.heartbeat_at < stale_before)
+    )).order_by(SimulationJob.id)\
+        .with_for_update(skip_locked=True)\
+        .first()
+    if job is None:
+        db.session.rollback()
+        return None
+
+    if job.attempts >= Config.JOB_MAX_ATTEMPTS:
+        job.status = 'failed'
+        job.error = f'Worker stopped responding ({job.attempts} attempts)'
+        job.finished_at = now
+        db.session.commit()
+        publish_finished(job.simulation_id, job.status, error=job.error)
+        return None
+
+    job.status = 'running'
+    job.attempts += 1
+    job.started_at = job.started_at or now
+    job.heartbeat_at = now
+    db.session.commit()
+    return job
+
+
+def _progress_reporter(job):
+    publish = progress_publisher(job.simulation_id)
+
+    def report(stage, done, total, **details):
+        publish(stage, done, total, **details)
+        if not details.get('checkpoint'):
+            return
+        # The simulation has just committed, so this only touches the job row
+        db.session.refresh(job)
+        job.progress_stage = stage
+        job.progress_done = done
+        job.progress_total = total
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        if job.cancel_requested:
+            raise JobCancelled()
+    return report
+
+
+def _heartbeat(engine, job_id, attempt, stop):
+    """Touch heartbeat_at until stopped, on its own connection so long steps between checkpoints count as alive"""
+    while not stop.wait(Config.JOB_HEARTBEAT_INTERVAL):
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    update(SimulationJob)
+                    .where(
+                        SimulationJob.id == job_id,
+                        SimulationJob.status == 'running',
+                        SimulationJob.attempts == attempt  # not once another worker has reclaimed it
+                    )
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+        except Exception:
+            traceback.print_exc()
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome"""
+    handler, _ = JOB_TYPES[job.job_type]
+    job_id = job.id
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat,
+        args=(db.engine, job_id, job.attempts, stop_heartbeat),
+        name=f'simulation-job-heartbeat-{job_id}',
+        daemon=True
+    )
+    heartbeat.start()
+    try:
+        result = handler(job.simulation_id, _progress_reporter(job), **(job.params or {}))
+    except JobCancelled:
+        db.session.rollback()
+        job = SimulationJob.query.get(job_id)
+        job.status = 'cancelled'
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        job = SimulationJob.query.get(job_id)
+        job.status = 'failed'
+        job.error = str(e)
+    else:
+        job = SimulationJob.query.get(job_id)
+        job.status = 'completed'
+        job.result = result
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    publish_finished(job.simulation_id, job.status, job.result, job.error)
+
+
+def _worker_loop(app):
+    while True:
+        job = None
+        with app.app_context():
+            try:
+                job = _claim_next_job()
+                if job:
+                    run_job(job)
+            except Exception:
+                traceback.print_exc()
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+        if job is None:
+            # Jobs queued by other processes are picked up on the next poll
+            _wake_workers.wait(Config.JOB_POLL_INTERVAL)
+            _wake_workers.clear()
+
+
+_wake_workers = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def ensure_job_workers(app):
+    """Start this process's job worker threads once"""
+    if _workers or Config.JOB_WORKERS <= 0:
+        return
+    with _workers_lock:
+        if _workers:
+            return
+        for idx in range(Config.JOB_WORKERS):
+            worker = threading.Thread(
+                target=_worker_loop,
+                args=(app,),
+                name=f'simulation-job-worker-{idx}',
+                daemon=True
+            )
+            worker.start()
+            _workers.append(worker)
@@ -0,0 +1,73 @@
+"""In-memory league state used to build engine payloads"""
+from extensions import db
+from models.team import Team, LineAssignment
+from models.player import Player, Coach
+from services.simulation_service import build_team_data, get_cached_team_data, cache_team_data
+
+class LeagueSnapshot:
+    """Teams, line assignments, players and coaches of one simulation.
+
+    Everything is loaded with a few set-based queries instead of per-game
+    lookups. Teams whose lineup_version matches the payload cache skip the
+    line and coach queries. The snapshot does not watch the database: call
+    refresh() after lines, play style or coach change.
+    """
+
+    def __init__(self, simulation_id):
+        self.simulation_id = simulation_id
+        self.teams = {}
+        self._team_data = {}
+        self.refresh()
+
+    def refresh(self, team_ids=None):
+        """Reload all teams, or only the given team ids"""
+        teams_query = Team.query.filter_by(simulation_id=self.simulation_id)
+        if team_ids is not None:
+            teams_query = teams_query.filter(Team.id.in_(list(team_ids)))
+        teams = teams_query.all()
+        if not teams:
+            return
+
+        # Reuse cached payloads for teams whose lineup has not changed
+        stale_teams = []
+        for team in teams:
+            self.teams[team.id] = team
+            cached = get_cached_team_data(team)
+            if cached is not None:
+                self._team_data[team.id] = cached
+            else:
+                stale_teams.append(team)
+        if not stale_teams:
+            return
+        teams = stale_teams
+
+        loaded_ids = [t.id for t in teams]
+
+        # All line assignments with their players in one query
+        lines_by_team = {team_id: [] for team_id in loaded_ids}
+        line_rows = db.session.query(LineAssignment, Player)\
+            .join(Player, LineAssignment.player_id == Player.id)\
+            .filter(LineAssignment.team_id.in_(loaded_ids))\
+            .order_by(LineAssignment.id)\
+            .all()
+        for line, player in line_rows:
+            lines_by_team[line.team_id].append((line, player))
+
+        # All coaches in one query
+        coach_ids = {t.coach_id for t in teams if t.coach_id}
+        coaches = {}
+        if coach_ids:
+            coaches = {c.id: c for c in Coach.query.filter(Coach.id.in_(coach_ids)).all()}
+
+        for team in teams:
+            self._team_data[team.id] = cache_team_data(team, build_team_data(
+                team,
+                lines_by_team[team.id],
+                coaches.get(team.coach_id)
+            ))
+
+    def team_data(self, team_id):
+        """Engine payload for a team"""
+        if team_id not in self._team_data:
+            raise ValueError("Team not found")
+        return self._team_data[team_id]
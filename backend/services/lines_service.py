@@ -2,6 +2,7 @@
 from extensions import db
 from models.team import Team, Roster, LineAssignment
 from models.player import Player
+from services.simulation_service import bump_lineup_version
 
 
 def auto_populate_lines(team_id):
@@ -112,6 +113,7 @@ def auto_populate_lines(team_id):
     for assignment in line_assignments:
         db.session.add(assignment)
     
+    bump_lineup_version(team_id)
     db.session.commit()
     return True
 
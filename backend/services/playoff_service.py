@@ -0,0 +1,321 @@
+"""Playoff bracket resolution in memory.
+
+A playoff game's result only depends on its seed and the two team payloads,
+never on the state of its series. PlayoffResolver uses that to play a whole
+round with one engine call: every still-possible game (next game number up
+to 7) of every active series is simulated at once, results are applied in
+game order and games after a series is decided are dropped. Rounds are
+created in memory as they complete, and all games, stats and series rows
+are written in the caller's transaction when the resolver is done.
+
+The per-game path (game_service.simulate_playoff_game) stays for the UI.
+"""
+from datetime import date, timedelta
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import aliased
+from extensions import db
+from models.simulation import Simulation
+from models.game import Game, PlayoffSeries
+from models.team import Team
+from services.league_snapshot import LeagueSnapshot
+from services.simulation_service import simulate_games
+
+
+def next_round_pairs(current_series, conference_of):
+    """(higher_seed, lower_seed) team ids for the round after current_series.
+
+    current_series must all be complete and in bracket order. Conferences
+    stay separate until the final; nothing follows the final.
+    """
+    eastern_winners = []
+    western_winners = []
+    for series in current_series:
+        if series.winner_team_id is None:
+            continue
+        if conference_of(series.winner_team_id) == 'Eastern':
+            eastern_winners.append(series.winner_team_id)
+        else:
+            western_winners.append(series.winner_team_id)
+
+    # A single series between conferences is the final
+    if len(current_series) == 1:
+        series = current_series[0]
+        higher_conference = conference_of(series.higher_seed_team_id)
+        lower_conference = conference_of(series.lower_seed_team_id)
+        if higher_conference and lower_conference and higher_conference != lower_conference:
+            return []
+
+    if len(eastern_winners) + len(western_winners) == 2:
+        # Final round - merge conferences
+        higher_seed = eastern_winners[0] if eastern_winners else western_winners[0]
+        lower_seed = western_winners[0] if western_winners else eastern_winners[0]
+        return [(higher_seed, lower_seed)]
+
+    # Pair within each conference: best remaining vs worst remaining
+    pairs = []
+    for winners in (eastern_winners, western_winners):
+        if len(winners) >= 2:
+            for i in range(len(winners) // 2):
+                pairs.append((winners[i], winners[-(i + 1)]))
+    return pairs
+
+
+def _final_series(series_list, conference_of):
+    """The final of a bracket (series in round order), or None if it has not been reached"""
+    if not series_list:
+        return None
+    last_round = max(s.round for s in series_list)
+    last_series = [s for s in series_list if s.round == last_round]
+    if len(last_series) == 1 and not next_round_pairs(last_series, conference_of):
+        return last_series[0]
+    return None
+
+
+def playoff_bracket(simulation_id, season):
+    """Read model of a season's bracket: series by round with their teams and
+    last game, plus the cup winner once the final is decided.
+
+    Two queries whatever the bracket size: the series joined to their last
+    game (row_number over each series' games), and the simulation's teams.
+    """
+    ranked_games = select(
+        Game,
+        func.row_number().over(
+            partition_by=Game.series_id,
+            order_by=Game.id.desc()
+        ).label('recency')
+    ).where(
+        Game.simulation_id == simulation_id,
+        Game.season == season,
+        Game.is_playoff.is_(True),
+        Game.series_id.isnot(None)
+    ).subquery()
+    last_game = aliased(Game, ranked_games)
+
+    rows = db.session.query(PlayoffSeries, last_game).outerjoin(
+        last_game,
+        and_(last_game.series_id == PlayoffSeries.id, ranked_games.c.recency == 1)
+    ).filter(
+        PlayoffSeries.simulation_id == simulation_id,
+        PlayoffSeries.season == season
+    ).order_by(PlayoffSeries.round.asc(), PlayoffSeries.id.asc()).all()
+
+    team_lookup = {t.id: t for t in Team.query.filter_by(simulation_id=simulation_id).all()}
+
+    def conference_of(team_id):
+        team = team_lookup.get(team_id)
+        return team.conference if team else None
+
+    rounds = {}
+    for series, game in rows:
+        higher_team = team_lookup.get(series.higher_seed_team_id)
+        lower_team = team_lookup.get(series.lower_seed_team_id)
+        winner_team = team_lookup.get(series.winner_team_id) if series.winner_team_id else None
+
+        # Determine conference - use higher seed team's conference, or winner's if available
+        conference = None
+        if winner_team:
+            conference = winner_team.conference
+        elif higher_team:
+            conference = higher_team.conference
+        elif lower_team:
+            conference = lower_team.conference
+
+        rounds.setdefault(series.round, []).append({
+            **series.to_dict(),
+            'higher_seed_team': higher_team.to_dict() if higher_team else None,
+            'lower_seed_team': lower_team.to_dict() if lower_team else None,
+            'winner_team': winner_team.to_dict() if winner_team else None,
+            'conference': conference,
+            'last_game': game.to_dict() if game else None
+        })
+
+    cup_winner = None
+    final = _final_series([series for series, _ in rows], conference_of)
+    winner_team = team_lookup.get(final.winner_team_id) if final and final.winner_team_id else None
+    if winner_team:
+        cup_winner = {
+            'id': winner_team.id,
+            'city': winner_team.city,
+            'name': winner_team.name
+        }
+
+    return {
+        'rounds': rounds,
+        'season': season,
+        'cup_winner': cup_winner
+    }
+
+
+class PlayoffResolver:
+    """Bracket of one simulation season, played to completion in memory.
+
+    The simulation row and the season's series rows are loaded (and locked)
+    once. resolve() adds games, stats and new series to the session; the
+    caller commits.
+    """
+
+    def __init__(self, simulation_id, snapshot=None):
+        # Locked so concurrent resolvers (and advance_season) run one after another
+        self.simulation = Simulation.query.filter_by(id=simulation_id)\
+            .with_for_update().populate_existing().one()
+        self.season = self.simulation.current_season
+        self.snapshot = snapshot or LeagueSnapshot(simulation_id)
+        self.conferences = {
+            team_id: team.conference for team_id, team in self.snapshot.teams.items()
+        }
+        self.series = PlayoffSeries.query.filter_by(
+            simulation_id=simulation_id,
+            season=self.season
+        ).order_by(PlayoffSeries.round, PlayoffSeries.id).with_for_update().populate_existing().all()
+        self.games_played = 0
+        self.last_game = None
+
+    def round_series(self, round_num):
+        return [s for s in self.series if s.round == round_num]
+
+    def current_round(self):
+        """Lowest round with a series in progress, None when the bracket is done"""
+        active = [s.round for s in self.series if s.status == 'in_progress']
+        return min(active) if active else None
+
+    @property
+    def final(self):
+        return _final_series(self.series, self.conferences.get)
+
+    @property
+    def champion_id(self):
+        final = self.final
+        return final.winner_team_id if final else None
+
+    def resolve(self, through_round=None):
+        """Play rounds up to through_round (default: the whole postseason).
+
+        Returns the number of games played.
+        """
+        from services.game_service import bulk_insert_player_stats, player_stat_rows
+
+        played = []
+        round_date = self.simulation.current_date or date.today()
+        while True:
+            round_num = self.current_round()
+            if round_num is None or (through_round is not None and round_num > through_round):
+                break
+            last_date = self._play_round(round_num, round_date, played)
+            self._create_next_round(round_num)
+            round_date = last_date + timedelta(days=1)
+
+        if not played:
+            return 0
+
+        # One flush writes new series and every game; stats need the game ids
+        db.session.add_all(game for game, _ in played)
+        db.session.flush()
+        stat_rows = []
+        for game, result in played:
+            stat_rows.extend(player_stat_rows(game, result))
+        bulk_insert_player_stats(stat_rows)
+
+        from services.game_service import _record_checkpoint
+        self.simulation.current_date = round_date
+        self.last_game = played[-1][0]
+        _record_checkpoint(self.simulation, 'playoffs', self.last_game)
+        self.games_played += len(played)
+        return len(played)
+
+    def _play_round(self, round_num, round_date, played):
+        """Play every active series of a round to the end with one engine call"""
+        from services.game_service import _ensure_playoff_winner, _playoff_game_seed, _series_home_team
+
+        active = [s for s in self.round_series(round_num) if s.status == 'in_progress']
+        scheduled = []
+        for series in active:
+            for game_number in range(series.next_game_number, 8):
+                home_id, away_id = _series_home_team(series, game_number)
+                seed = _playoff_game_seed(
+                    self.simulation, self.season, series.round,
+                    series.higher_seed_team_id, series.lower_seed_team_id, game_number
+                )
+                # Every other day from the round start (or from where the series stands)
+                game_date = round_date + timedelta(days=2 * (game_number - series.next_game_number))
+                scheduled.append((series, game_number, game_date, home_id, away_id, seed))
+
+        results = simulate_games(
+            [(home_id, away_id) for _, _, _, home_id, away_id, _ in scheduled],
+            True,
+            snapshot=self.snapshot,
+            seeds=[seed for *_, seed in scheduled]
+        )
+
+        last_date = round_date
+        for (series, game_number, game_date, home_id, away_id, seed), result in zip(scheduled, results):
+            if series.status != 'in_progress':
+                continue  # Decided earlier - the rest of its games are never played
+            result = _ensure_playoff_winner(result, seed)
+            game = Game(
+                simulation_id=self.simulation.id,
+                season=self.season,
+                date=game_date,
+                home_team_id=home_id,
+                away_team_id=away_id,
+                home_score=result['home_score'],
+                away_score=result['away_score'],
+                went_to_overtime=result.get('went_to_overtime', False),
+                went_to_shootout=result.get('went_to_shootout', False),
+                is_playoff=True,
+                playoff_round=series.round,
+                series=series,
+                simulated=True,
+                seed=seed
+            )
+            played.append((game, result))
+            last_date = max(last_date, game_date)
+
+            winner_id = home_id if result['home_score'] > result['away_score'] else away_id
+            if winner_id == series.higher_seed_team_id:
+                series.higher_seed_wins += 1
+            else:
+                series.lower_seed_wins += 1
+            series.next_game_number = game_number + 1
+            if series.higher_seed_wins >= 4 or series.lower_seed_wins >= 4:
+                series.status = 'complete'
+                series.winner_team_id = winner_id
+        return last_date
+
+    def _create_next_round(self, round_num):
+        current = self.round_series(round_num)
+        if any(s.status != 'complete' for s in current) or self.round_series(round_num + 1):
+            return
+        for higher_seed, lower_seed in next_round_pairs(current, self.conferences.get):
+            series = PlayoffSeries(
+                simulation_id=self.simulation.id,
+                season=self.season,
+                round=round_num + 1,
+                higher_seed_team_id=higher_seed,
+                lower_seed_team_id=lower_seed,
+                higher_seed_wins=0,
+                lower_seed_wins=0,
+                status='in_progress',
+                next_game_number=1
+            )
+            db.session.add(series)
+            self.series.append(series)
+
+
+def resolve_playoffs(simulation_id, through_round=None, snapshot=None):
+    """Play the current season's playoffs up to through_round (default: all) in one transaction.
+
+    Does not advance the season (see game_service.advance_season). Plays
+    nothing unless the simulation is in the playoffs when its row is
+    locked, so a request racing a finished rollover reports no playoffs.
+    """
+    resolver = PlayoffResolver(simulation_id, snapshot=snapshot)
+    in_playoffs = resolver.simulation.status == 'playoffs'
+    if in_playoffs:
+        resolver.resolve(through_round)
+    db.session.commit()
+    return {
+        'games_simulated': resolver.games_played,
+        'playoffs_complete': in_playoffs and resolver.current_round() is None and resolver.champion_id is not None,
+        'champion_id': resolver.champion_id if in_playoffs else None
+    }
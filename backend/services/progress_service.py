@@ -0,0 +1,78 @@
+"""In-process publish/subscribe of simulation progress for the SSE stream.
+
+The simulation loop calls a publisher after every engine batch; each open
+progress stream holds a subscriber queue. Events only reach streams served
+by the same process - streams in other processes fall back to the
+simulation_jobs row (see api/simulations.py progress_stream).
+"""
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class ProgressBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # simulation_id -> set of queues
+        self._latest = {}  # simulation_id -> last event
+
+    def publish(self, simulation_id, event):
+        with self._lock:
+            self._latest[simulation_id] = event
+            subscribers = list(self._subscribers.get(simulation_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                pass  # Slow client - it will catch up with a later event
+
+    def subscribe(self, simulation_id):
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(simulation_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, simulation_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(simulation_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[simulation_id]
+
+    def latest(self, simulation_id):
+        with self._lock:
+            return self._latest.get(simulation_id)
+
+
+broker = ProgressBroker()
+
+
+def progress_event(stage, done, total, **details):
+    percentage = round(done / total * 100, 1) if total else None
+    return dict(
+        details,
+        type='progress',
+        stage=stage,
+        games_simulated=done,
+        total_games=total,
+        percentage=percentage
+    )
+
+
+def progress_publisher(simulation_id):
+    """Progress hook for the simulation loop that publishes to open streams"""
+    def publish(stage, done, total, **details):
+        broker.publish(simulation_id, progress_event(stage, done, total, **details))
+    return publish
+
+
+def publish_finished(simulation_id, status, result=None, error=None):
+    """Tell open streams the simulation run ended (completed, failed or cancelled)"""
+    broker.publish(simulation_id, {
+        'type': 'finished',
+        'status': status,
+        'result': result,
+        'error': error
+    })
@@ -0,0 +1,88 @@
+"""Conditional GET and response caching for simulation read endpoints.
+
+Stats, standings and trophy responses only change when the simulation's
+data_version does (see simulation_service.bump_data_version). A response
+is identified by (endpoint, simulation, query string, data_version):
+
+- the ETag is derived from that key, so a client revalidating with
+  If-None-Match gets a 304 after a single version lookup;
+- the body of a 200 is kept in a small per-process LRU under the same
+  key, so other clients viewing the same page skip the queries too.
+
+Bumping the version makes every old key unreachable; stale entries
+simply age out of the LRU.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+from extensions import db
+from config import Config
+
+_responses = OrderedDict()
+_lock = threading.Lock()
+
+
+def _get(key):
+    with _lock:
+        body = _responses.get(key)
+        if body is not None:
+            _responses.move_to_end(key)
+        return body
+
+
+def _put(key, body):
+    with _lock:
+        _responses[key] = body
+        _responses.move_to_end(key)
+        while len(_responses) > Config.RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+
+
+def clear():
+    with _lock:
+        _responses.clear()
+
+
+def _data_version(simulation_id):
+    from models.simulation import Simulation
+    return db.session.query(Simulation.data_version).filter(Simulation.id == simulation_id).scalar()
+
+
+def _finish(response, etag):
+    response.set_etag(etag)
+    # Clients may keep the response but must revalidate it every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def versioned_response(view):
+    """Cache a GET view taking simulation_id by the simulation's data_version.
+
+    Only 200 responses are cached; unknown simulations go straight to the
+    view.
+    """
+    @wraps(view)
+    def wrapper(simulation_id, *args, **kwargs):
+        version = _data_version(simulation_id)
+        if version is None:
+            return view(simulation_id, *args, **kwargs)
+
+        query = tuple(sorted(request.args.items(multi=True)))
+        key = (request.endpoint, simulation_id, query, version)
+        etag = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+
+        if etag in request.if_none_match:
+            return _finish(current_app.response_class(status=304), etag)
+
+        body = _get(key)
+        if body is None:
+            response = current_app.make_response(view(simulation_id, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            _put(key, body)
+        response = current_app.response_class(body, mimetype='application/json')
+        return _finish(response, etag)
+    return wrapper
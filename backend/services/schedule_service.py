@@ -0,0 +1,341 @@
+"""Constructive regular season schedules.
+
+The schedule is built from round-robin cycles (circle method) instead of
+random pairing, so it is deterministic and every team plays exactly
+games_per_team games:
+
+- full league cycles: every team meets every other team once
+- one intra-conference cycle (or part of one) for the leftover games
+- part of an inter-conference cycle for whatever is still left
+
+Each round of a cycle is a game-day on which no team plays twice, so a
+game-day is directly a conflict-free slate for parallel simulation.
+
+There are only a few league sizes, so the schedule is built once per size
+and stored in schedule_template_games with teams as slots. A season is
+materialized with one INSERT ... SELECT that maps slots to team ids,
+shuffled per season within each conference by the simulation seed.
+"""
+from datetime import date
+from sqlalchemy import case, cast, exists, literal, select, Date
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from extensions import db
+from models.game import Game
+from models.schedule import ScheduleTemplateGame
+from models.team import Team
+from services.simulation_service import derive_game_seed, get_simulation_seed, simulation_rng
+
+GAMES_PER_TEAM = 82
+SEASON_LENGTH_DAYS = 181  # October 1st to March 31st
+
+
+def circle_rounds(slots):
+    """Circle method: rounds of pairs in which every slot meets every other once.
+
+    An odd number of slots gets a bye each round; the rounds are returned
+    with the bye as a (slot, None) pair so callers can use it.
+    """
+    slots = list(slots)
+    if len(slots) % 2:
+        slots.append(None)
+    n = len(slots)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            a, b = slots[i], slots[n - 1 - i]
+            if b is None:
+                pairs.append((a, None))
+            elif a is None:
+                pairs.append((b, None))
+            else:
+                pairs.append((a, b))
+        rounds.append(pairs)
+        # Keep the first slot fixed and rotate the rest
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def _games(pairs):
+    return [pair for pair in pairs if pair[1] is not None]
+
+
+def _byes(pairs):
+    return [a for a, b in pairs if b is None]
+
+
+def league_days(teams):
+    return [_games(pairs) for pairs in circle_rounds(teams)]
+
+
+def intra_conference_days(eastern, western, full_days=True):
+    """Both conferences play their own round robin on the same days.
+
+    With odd-sized conferences every day has one idle team per conference.
+    full_days=False pairs those two teams with each other so every team
+    plays every day (used when only part of the cycle is scheduled).
+    """
+    days = []
+    for east_pairs, west_pairs in zip(circle_rounds(eastern), circle_rounds(western)):
+        day = _games(east_pairs) + _games(west_pairs)
+        if not full_days:
+            day += list(zip(_byes(east_pairs), _byes(west_pairs)))
+        days.append(day)
+    return days
+
+
+def inter_conference_days(eastern, western, count):
+    """First `count` days of the cross-conference cycle (each team plays once a day)"""
+    size = len(eastern)
+    return [
+        [(eastern[i], western[(i + shift) % size]) for i in range(size)]
+        for shift in range(count)
+    ]
+
+
+def build_game_days(eastern, western, games_per_team=GAMES_PER_TEAM):
+    """Game-days of unordered (team, team) pairs for a season.
+
+    Conferences must be the same size (see league_service.TEAM_CONFIGS).
+    Each team plays every opponent games_per_team // (teams - 1) times;
+    the remainder goes to conference rivals first, then across.
+    """
+    if len(eastern) != len(western) or not eastern:
+        raise ValueError("Schedule needs two non-empty conferences of the same size")
+
+    teams = list(eastern) + list(western)
+    conference_size = len(eastern)
+    cycles, remaining = divmod(games_per_team, len(teams) - 1)
+    base_days = league_days(teams) * cycles
+
+    extra_days = []
+    intra_games = conference_size - 1
+    if remaining >= intra_games:
+        extra_days += intra_conference_days(eastern, western)
+        extra_days += inter_conference_days(eastern, western, remaining - intra_games)
+    elif remaining:
+        extra_days += intra_conference_days(eastern, western, full_days=False)[:remaining]
+
+    return _spread(base_days, extra_days)
+
+
+def _spread(days, extra_days):
+    """Interleave extra_days evenly through days"""
+    if not extra_days:
+        return days
+    if not days:
+        return extra_days
+    keyed = [((i + 0.5) / len(days), 0, day) for i, day in enumerate(days)]
+    keyed += [((i + 1) / (len(extra_days) + 1), 1, day) for i, day in enumerate(extra_days)]
+    keyed.sort(key=lambda item: item[:2])
+    return [day for _, _, day in keyed]
+
+
+def assign_home_away(days):
+    """Orient every pair as (home, away).
+
+    The team with fewer home games so far hosts; on a tie the team that
+    was away last time hosts, and after that pairs alternate meeting by
+    meeting. That greedy pass keeps running home counts close but can
+    leave a team a game or two off at the end, so _balance_home_games then
+    flips a few late-season games: every team ends with half its games at
+    home (rounded either way for an odd number of games).
+    """
+    home_games = {}
+    last_home = {}
+    meetings = {}
+    oriented = []
+
+    for day in days:
+        oriented_day = []
+        for a, b in day:
+            key = (min(a, b), max(a, b))
+            count = meetings.get(key, 0)
+            meetings[key] = count + 1
+
+            a_home, b_home = home_games.get(a, 0), home_games.get(b, 0)
+            if a_home != b_home:
+                home = a if a_home < b_home else b
+            elif last_home.get(a) != last_home.get(b):
+                home = b if last_home.get(a) else a
+            else:
+                home = key[count % 2]
+            away = b if home == a else a
+
+            home_games[home] = home_games.get(home, 0) + 1
+            last_home[home] = True
+            last_home[away] = False
+            oriented_day.append((home, away))
+        oriented.append(oriented_day)
+    _balance_home_games(oriented)
+    return oriented
+
+
+def _flip_path(oriented, start, is_target):
+    """Flip the games on a shortest hosting chain from start to a team matching is_target.
+
+    Following home -> away edges and flipping them moves one home game from
+    start to the last team, leaving every team in between unchanged.
+    Returns False if no such team can be reached.
+    """
+    # Latest games first, so the running counts early in the season stay as they were
+    hosted = {}
+    for d in reversed(range(len(oriented))):
+        for g, (home, away) in enumerate(oriented[d]):
+            hosted.setdefault(home, []).append((d, g, away))
+
+    previous = {start: None}
+    queue = [start]
+    for team in queue:
+        if team != start and is_target(team):
+            while previous[team] is not None:
+                d, g, host = previous[team]
+                oriented[d][g] = (team, host)
+                team = host
+            return True
+        for d, g, away in hosted.get(team, ()):
+            if away not in previous:
+                previous[away] = (d, g, team)
+                queue.append(away)
+    return False
+
+
+def _balance_home_games(oriented):
+    """Even out final home counts to half of each team's games, in place"""
+    games = {}
+    home_games = {}
+    for day in oriented:
+        for home, away in day:
+            games[home] = games.get(home, 0) + 1
+            games[away] = games.get(away, 0) + 1
+            home_games[home] = home_games.get(home, 0) + 1
+
+    def home(team):
+        return home_games.get(team, 0)
+
+    def shift(start, is_target):
+        moved = _flip_path(oriented, start, is_target)
+        if moved:
+            home_games.clear()
+            for day in oriented:
+                for host, _ in day:
+                    home_games[host] = home_games.get(host, 0) + 1
+        return moved
+
+    # Too many home games: hand one to a team below its ceiling
+    for team in sorted(games):
+        while home(team) > (games[team] + 1) // 2:
+            if not shift(team, lambda other: home(other) < (games[other] + 1) // 2):
+                break
+    # Too few: take one from a team above its floor
+    for team in sorted(games):
+        while home(team) < games[team] // 2:
+            donor = [other for other in sorted(games) if home(other) > games[other] // 2 and other != team]
+            if not any(shift(other, lambda t: t == team) for other in donor):
+                break
+
+
+def build_schedule(eastern, western, games_per_team=GAMES_PER_TEAM):
+    """Game-days of (home_team, away_team) pairs for one regular season"""
+    return assign_home_away(build_game_days(eastern, western, games_per_team))
+
+
+def season_start_date(season):
+    return date(1980 + season - 1, 10, 1)
+
+
+def template_rows(league_size):
+    """Schedule template rows for a league of two equal conferences"""
+    conference_size = league_size // 2
+    game_days = build_schedule(range(conference_size), range(conference_size, league_size))
+    # Spread game-days evenly over the season
+    day_gap = max(1, SEASON_LENGTH_DAYS // len(game_days))
+
+    rows = []
+    for day_index, day in enumerate(game_days):
+        for home_slot, away_slot in day:
+            rows.append({
+                'league_size': league_size,
+                'game_number': len(rows),
+                'day_index': day_index,
+                'day_offset': day_index * day_gap,
+                'home_slot': home_slot,
+                'away_slot': away_slot,
+                'seed_salt': derive_game_seed('schedule-template', league_size, len(rows))
+            })
+    return rows
+
+
+def ensure_schedule_template(league_size):
+    """Store the template for a league size the first time it is needed"""
+    stored = db.session.query(
+        exists().where(ScheduleTemplateGame.league_size == league_size)
+    ).scalar()
+    if not stored:
+        # Concurrent first uses build the same rows; the unique index drops the copy
+        db.session.execute(
+            pg_insert(ScheduleTemplateGame.__table__).on_conflict_do_nothing(
+                index_elements=['league_size', 'game_number']
+            ),
+            template_rows(league_size)
+        )
+
+
+def season_slot_teams(simulation, season):
+    """Team ids by template slot - each conference shuffled by the season seed"""
+    teams = db.session.query(Team.id, Team.conference)\
+        .filter(Team.simulation_id == simulation.id)\
+        .order_by(Team.id).all()
+    eastern = [team_id for team_id, conference in teams if conference == 'Eastern']
+    western = [team_id for team_id, conference in teams if conference == 'Western']
+    if len(eastern) != len(western) or not eastern:
+        raise ValueError("Schedule needs two non-empty conferences of the same size")
+
+    rng = simulation_rng(simulation, season, 'schedule')
+    rng.shuffle(eastern)
+    rng.shuffle(western)
+    return eastern + western
+
+
+def materialize_season_schedule(simulation, season):
+    """Insert the regular season games of a season from its template.
+
+    A single INSERT ... SELECT; does nothing if the season already has
+    regular season games. Returns the number of games inserted. The
+    caller commits.
+    """
+    slot_teams = season_slot_teams(simulation, season)
+    league_size = len(slot_teams)
+    ensure_schedule_template(league_size)
+
+    slot_map = dict(enumerate(slot_teams))
+    template = ScheduleTemplateGame.__table__
+    season_seed = derive_game_seed(get_simulation_seed(simulation), season, 'regular')
+    already_scheduled = exists().where(
+        Game.simulation_id == simulation.id,
+        Game.season == season,
+        Game.is_playoff.is_(False)
+    )
+
+    games = select(
+        literal(simulation.id),
+        literal(season),
+        cast(literal(season_start_date(season)), Date) + template.c.day_offset,
+        case(slot_map, value=template.c.home_slot),
+        case(slot_map, value=template.c.away_slot),
+        literal(False),
+        literal(False),
+        template.c.seed_salt.op('#')(season_seed)
+    ).where(
+        template.c.league_size == league_size,
+        ~already_scheduled
+    ).order_by(template.c.game_number)
+
+    result = db.session.execute(
+        Game.__table__.insert().from_select(
+            ['simulation_id', 'season', 'date', 'home_team_id', 'away_team_id',
+             'is_playoff', 'simulated', 'seed'],
+            games
+        )
+    )
+    return result.rowcount
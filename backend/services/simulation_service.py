@@ -1,13 +1,77 @@
 """Service for calling Rust simulation engine"""
-import subprocess
-import json
-import os
+import hashlib
+import random
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import update
+from extensions import db
 from config import Config
 from models.team import Team, LineAssignment
 from models.player import Player, Coach
+from services.engine_pool import get_engine_pool
 
-def prepare_game_data(home_team_id, away_team_id, is_playoff=False):
+# Serialized team payloads: team_id -> (lineup_version, payload), least recently used first.
+# Bounded so a long-running process doesn't keep the teams of every simulation it has seen.
+_team_payload_cache = OrderedDict()
+_team_payload_lock = threading.Lock()
+
+def get_cached_team_data(team):
+    """Return the cached payload for a team if its lineup version is unchanged"""
+    with _team_payload_lock:
+        cached = _team_payload_cache.get(team.id)
+        if cached is None:
+            return None
+        if cached[0] != (team.lineup_version or 0):
+            # Lineup changed - the payload can never be used again
+            del _team_payload_cache[team.id]
+            return None
+        _team_payload_cache.move_to_end(team.id)
+        return cached[1]
+
+def cache_team_data(team, payload):
+    with _team_payload_lock:
+        _team_payload_cache[team.id] = (team.lineup_version or 0, payload)
+        _team_payload_cache.move_to_end(team.id)
+        while len(_team_payload_cache) > Config.TEAM_PAYLOAD_CACHE_SIZE:
+            _team_payload_cache.popitem(last=False)
+    return payload
+
+def bump_lineup_version(team_id):
+    """Invalidate a team's cached payload. Call when lines, play style or coach change.
+    
+    The update joins the caller's transaction, so the new version becomes
+    visible together with the lineup change on commit.
+    """
+    db.session.execute(
+        update(Team)
+        .where(Team.id == team_id)
+        .values(lineup_version=Team.lineup_version + 1)
+    )
+
+def bump_data_version(simulation_id):
+    """Invalidate cached stats, standings and trophy responses of a simulation.
+    
+    Call when games, standings, trophies or rosters change. Like
+    bump_lineup_version, the update joins the caller's transaction.
+    """
+    from models.simulation import Simulation
+    db.session.execute(
+        update(Simulation)
+        .where(Simulation.id == simulation_id)
+        .values(data_version=Simulation.data_version + 1)
+    )
+
+def prepare_game_data(home_team_id, away_team_id, is_playoff=False, snapshot=None):
     """Prepare game data for Rust simulator"""
+    if snapshot is not None:
+        return {
+            'home_team': snapshot.team_data(home_team_id),
+            'away_team': snapshot.team_data(away_team_id),
+            'is_playoff': is_playoff
+        }
+    
     home_team = Team.query.get(home_team_id)
     away_team = Team.query.get(away_team_id)
     
@@ -23,14 +87,15 @@ def prepare_game_data(home_team_id, away_team_id, is_playoff=False):
         'is_playoff': is_playoff
     }
 
-def get_effective_play_style(team):
+def get_effective_play_style(team, coach=None):
     """Get effective play style - resolve 'auto' to coach-based style"""
     if team.play_style and team.play_style != 'auto':
         return team.play_style
     
     # Auto mode - derive from coach type
     if team.coach_id:
-        coach = Coach.query.get(team.coach_id)
+        if coach is None:
+            coach = Coach.query.get(team.coach_id)
         if coach and coach.coach_type:
             coach_type = coach.coach_type.lower()
             if 'defensive' in coach_type or 'trap' in coach_type:
@@ -47,43 +112,38 @@ def get_effective_play_style(team):
     # Default to possession (balanced)
     return 'possession'
 
-def get_team_data(team):
-    """Get team data including lines, play style, and player types"""
-    # Get line assignments with player data
-    lines = LineAssignment.query.filter_by(team_id=team.id).all()
+def build_team_data(team, lines, coach):
+    """Build the engine team payload from already-loaded rows.
     
+    lines is a list of (LineAssignment, Player) pairs, coach a Coach or None.
+    """
     line_data = []
-    for line in lines:
-        player = Player.query.get(line.player_id)
-        if player:
-            line_data.append({
-                'line_type': line.line_type,
-                'line_number': line.line_number,
-                'position': line.position,
-                'player': {
-                    'id': player.id,
-                    'name': player.name,
-                    'position': player.position,
-                    'player_type': player.player_type or '',
-                    'off': player.off,
-                    'def': player.def_,
-                    'phys': player.phys,
-                    'lead': player.lead,
-                    'const': player.const
-                }
-            })
+    for line, player in lines:
+        line_data.append({
+            'line_type': line.line_type,
+            'line_number': line.line_number,
+            'position': line.position,
+            'player': {
+                'id': player.id,
+                'name': player.name,
+                'position': player.position,
+                'player_type': player.player_type or '',
+                'off': player.off,
+                'def': player.def_,
+                'phys': player.phys,
+                'lead': player.lead,
+                'const': player.const
+            }
+        })
     
-    # Get coach
     coach_data = None
-    if team.coach_id:
-        coach = Coach.query.get(team.coach_id)
-        if coach:
-            coach_data = {
-                'id': coach.id,
-                'name': coach.name,
-                'rating': coach.rating,
-                'coach_type': coach.coach_type or ''
-            }
+    if coach:
+        coach_data = {
+            'id': coach.id,
+            'name': coach.name,
+            'rating': coach.rating,
+            'coach_type': coach.coach_type or ''
+        }
     
     return {
         'id': team.id,
@@ -91,44 +151,124 @@ def get_team_data(team):
         'city': team.city,
         'lines': line_data,
         'coach': coach_data,
-        'play_style': get_effective_play_style(team)
+        'play_style': get_effective_play_style(team, coach)
     }
 
-def simulate_game(home_team_id, away_team_id, is_playoff=False):
-    """Simulate a single game using Rust engine"""
-    # Prepare input data
-    game_data = prepare_game_data(home_team_id, away_team_id, is_playoff)
-    game_json = json.dumps(game_data)
+def get_team_data(team):
+    """Get team data including lines, play style, and player types"""
+    cached = get_cached_team_data(team)
+    if cached is not None:
+        return cached
     
-    # Get Rust binary path
-    rust_binary = Config.RUST_BINARY_PATH
+    # Get line assignments with player data
+    lines = db.session.query(LineAssignment, Player)\
+        .join(Player, LineAssignment.player_id == Player.id)\
+        .filter(LineAssignment.team_id == team.id)\
+        .order_by(LineAssignment.id)\
+        .all()
     
-    if not os.path.exists(rust_binary):
-        raise RuntimeError(
-            f"Rust simulation binary not found at {rust_binary}. "
-            f"Please compile it by running: cd simulation && cargo build --release"
-        )
+    # Get coach
+    coach = Coach.query.get(team.coach_id) if team.coach_id else None
     
-    try:
-        # Call Rust binary
-        process = subprocess.Popen(
-            [rust_binary, '--input', '-', '--output', '-'],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+    return cache_team_data(team, build_team_data(team, lines, coach))
+
+def derive_game_seed(*parts):
+    """Derive a stable 63-bit engine seed from identifying values (e.g. simulation, season, game)"""
+    key = ':'.join(str(part) for part in parts).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big') >> 1
+
+def new_simulation_seed():
+    """Random 63-bit master seed for a new simulation"""
+    return secrets.randbits(63)
+
+def get_simulation_seed(simulation):
+    """Master seed of a simulation. Older simulations get one derived from their id."""
+    if simulation.seed is None:
+        simulation.seed = derive_game_seed('simulation', simulation.id)
+    return simulation.seed
+
+def simulation_rng(simulation, *parts):
+    """Seeded random.Random for one decision stream (schedule, draft pick...) of a simulation"""
+    return random.Random(derive_game_seed(get_simulation_seed(simulation), *parts))
+
+def prepare_batch_data(matchups, is_playoff=False, snapshot=None, seeds=None):
+    """Prepare a multi-game request with a shared team table for the Rust simulator"""
+    team_ids = {team_id for matchup in matchups for team_id in matchup}
+    
+    if snapshot is not None:
+        team_table = [snapshot.team_data(team_id) for team_id in team_ids]
+    else:
+        teams = Team.query.filter(Team.id.in_(team_ids)).all()
+        if len(teams) != len(team_ids):
+            raise ValueError("Team not found")
+        team_table = [get_team_data(team) for team in teams]
+    
+    return {
+        'teams': team_table,
+        'games': [
+            {
+                'home_team_id': home_team_id,
+                'away_team_id': away_team_id,
+                'is_playoff': is_playoff,
+                'seed': seeds[idx] if seeds else None
+            }
+            for idx, (home_team_id, away_team_id) in enumerate(matchups)
+        ]
+    }
+
+def simulate_game(home_team_id, away_team_id, is_playoff=False, timeout=None, snapshot=None):
+    """Simulate a single game using the Rust engine worker pool"""
+    game_data = prepare_game_data(home_team_id, away_team_id, is_playoff, snapshot)
+    return get_engine_pool().simulate(game_data, timeout=timeout)
+
+def simulate_games(matchups, is_playoff=False, timeout=None, snapshot=None, seeds=None):
+    """Simulate a list of (home_team_id, away_team_id) games in one engine call.
+    
+    seeds optionally gives one engine seed per matchup. Results are returned
+    in the same order as matchups.
+    """
+    if not matchups:
+        return []
+    
+    batch_data = prepare_batch_data(matchups, is_playoff, snapshot, seeds)
+    return _run_batch(batch_data, timeout)
+
+def simulate_games_parallel(matchups, is_playoff=False, timeout=None, snapshot=None, seeds=None):
+    """Simulate games split across all engine pool workers at once.
+    
+    With seeds the results are identical to simulate_games, since each game
+    only depends on its seed and the two team payloads.
+    """
+    if not matchups:
+        return []
+    
+    pool = get_engine_pool()
+    chunk_size = -(-len(matchups) // pool.size)  # ceiling division
+    
+    # Payloads are built here - worker threads have no app context for DB access
+    batches = [
+        prepare_batch_data(
+            matchups[start:start + chunk_size],
+            is_playoff,
+            snapshot,
+            seeds[start:start + chunk_size] if seeds else None
         )
-        
-        stdout, stderr = process.communicate(input=game_json.encode())
-        
-        if process.returncode != 0:
-            raise RuntimeError(f"Rust simulation failed: {stderr.decode()}")
-        
-        # Parse result
-        result = json.loads(stdout.decode())
-        return result
-        
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Failed to parse Rust simulation output: {e}")
-    except Exception as e:
-        raise RuntimeError(f"Error calling Rust simulator: {e}")
+        for start in range(0, len(matchups), chunk_size)
+    ]
+    
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        futures = [executor.submit(_run_batch, batch, timeout) for batch in batches]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    return results
 
+def _run_batch(batch_data, timeout):
+    result = get_engine_pool().simulate(batch_data, timeout=timeout)
+    
+    results = result.get('results', [])
+    if len(results) != len(batch_data['games']):
+        raise RuntimeError(
+            f"Rust simulation returned {len(results)} results for {len(batch_data['games'])} games"
+        )
+    return results
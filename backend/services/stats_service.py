@@ -0,0 +1,424 @@
+"""Materialized player season and career stats.
+
+player_season_stats holds one row per (simulation, season, player, team,
+game type) with the player's totals. bulk_insert_player_stats adds the
+stat lines it writes with accumulate_season_stats, in the same
+transaction, so the table always matches player_stats. The stats
+endpoints read it instead of aggregating player_stats on every request.
+
+player_career_stats rolls completed seasons up per (simulation, player,
+team, game type). advance_season folds each season in once with
+fold_career_stats, so all-time leaderboards read the rollup plus the
+seasons after Simulation.career_stats_season instead of every season.
+
+team_totals builds team aggregates from the same tables plus the games.
+
+All aggregation is set-based: GROUP BY with SUMs, COUNT(DISTINCT game_id)
+and a CASE on the score for wins when building rows, and GROUP BY with
+ORDER BY, a keyset cursor and LIMIT when reading leaderboards.
+"""
+import base64
+import json
+from decimal import Decimal
+from sqlalchemy import (
+    and_, any_, asc, bindparam, case, cast, delete, desc, distinct, func, literal, select, true, tuple_,
+    Integer, Numeric
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, array_agg, insert as pg_insert
+from extensions import db
+from models.game import Game, PlayerStat, PlayerSeasonStat, PlayerCareerStat, PlayoffSeries
+from models.player import Player
+from models.simulation import Simulation
+from models.team import Team
+
+SEASON_STAT_KEYS = ('simulation_id', 'season', 'player_id', 'team_id', 'game_type')
+CAREER_STAT_KEYS = ('simulation_id', 'player_id', 'team_id', 'game_type')
+
+
+def _stat_fields():
+    from services.game_service import PLAYER_STAT_FIELDS
+    return PLAYER_STAT_FIELDS
+
+
+def _season_stats_select(*criteria):
+    """player_stats joined to games and summed into player_season_stats rows"""
+    game_type = case((Game.is_playoff.is_(True), 'playoff'), else_='regular')
+    team_won = case(
+        (and_(PlayerStat.team_id == Game.home_team_id, Game.home_score > Game.away_score), 1),
+        (and_(PlayerStat.team_id == Game.away_team_id, Game.away_score > Game.home_score), 1),
+        else_=0
+    )
+    return select(
+        Game.simulation_id,
+        Game.season,
+        PlayerStat.player_id,
+        PlayerStat.team_id,
+        game_type,
+        func.count(distinct(PlayerStat.game_id)),
+        func.sum(team_won),
+        *[func.coalesce(func.sum(getattr(PlayerStat, field)), 0) for field in _stat_fields()]
+    ).join(Game, PlayerStat.game_id == Game.id).where(*criteria).group_by(
+        Game.simulation_id, Game.season, PlayerStat.player_id, PlayerStat.team_id, game_type
+    )
+
+
+def _insert_season_stats(rows_select):
+    columns = list(SEASON_STAT_KEYS) + ['games_played', 'wins'] + list(_stat_fields())
+    return pg_insert(PlayerSeasonStat.__table__).from_select(columns, rows_select)
+
+
+def accumulate_season_stats(player_stat_ids):
+    """Add freshly inserted player_stats rows to the season totals.
+
+    Takes the ids of the new rows only, so stat lines skipped as duplicates
+    are never counted twice. Runs in the caller's transaction; game scores
+    must be flushed first.
+    """
+    if not player_stat_ids:
+        return
+    table = PlayerSeasonStat.__table__
+    new_rows = PlayerStat.id == any_(bindparam('stat_ids', list(player_stat_ids), type_=ARRAY(Integer)))
+    stmt = _insert_season_stats(_season_stats_select(new_rows))
+    added = ['games_played', 'wins'] + list(_stat_fields())
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=list(SEASON_STAT_KEYS),
+        set_={column: table.c[column] + stmt.excluded[column] for column in added}
+    ))
+
+
+def rebuild_season_stats(simulation_id=None):
+    """Recompute player_season_stats from player_stats (one simulation or all).
+
+    Returns the number of rows written. The caller commits.
+    """
+    table = PlayerSeasonStat.__table__
+    criteria = []
+    if simulation_id is not None:
+        criteria.append(Game.simulation_id == simulation_id)
+        db.session.execute(delete(table).where(table.c.simulation_id == simulation_id))
+    else:
+        db.session.execute(delete(table))
+    result = db.session.execute(_insert_season_stats(_season_stats_select(*criteria)))
+    return result.rowcount
+
+
+def fold_career_stats(simulation):
+    """Add the seasons completed since the last fold to player_career_stats.
+
+    Folds every season before simulation.current_season that is newer than
+    simulation.career_stats_season, then moves the marker. Runs in the
+    caller's transaction, so the fold and the season rollover commit
+    together.
+    """
+    through = simulation.current_season - 1
+    if through <= simulation.career_stats_season:
+        return
+    season_stat = PlayerSeasonStat
+    summed = ['games_played', 'wins'] + list(_stat_fields())
+    seasons = select(
+        *[getattr(season_stat, key) for key in CAREER_STAT_KEYS],
+        *[func.sum(getattr(season_stat, field)) for field in summed]
+    ).where(
+        season_stat.simulation_id == simulation.id,
+        season_stat.season > simulation.career_stats_season,
+        season_stat.season <= through
+    ).group_by(*[getattr(season_stat, key) for key in CAREER_STAT_KEYS])
+
+    table = PlayerCareerStat.__table__
+    stmt = pg_insert(table).from_select(list(CAREER_STAT_KEYS) + summed, seasons)
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['simulation_id', 'game_type', 'player_id', 'team_id'],
+        set_={column: table.c[column] + stmt.excluded[column] for column in summed}
+    ))
+    simulation.career_stats_season = through
+
+
+def rebuild_career_stats(simulation_id=None):
+    """Recompute player_career_stats from player_season_stats (one simulation or all).
+
+    Returns the number of simulations folded. The caller commits.
+    """
+    table = PlayerCareerStat.__table__
+    query = Simulation.query
+    if simulation_id is not None:
+        query = query.filter(Simulation.id == simulation_id)
+        db.session.execute(delete(table).where(table.c.simulation_id == simulation_id))
+    else:
+        db.session.execute(delete(table))
+    simulations = query.all()
+    for simulation in simulations:
+        simulation.career_stats_season = 0
+        fold_career_stats(simulation)
+    return len(simulations)
+
+
+def _stat_source(simulation_id, game_type, season=None, team_id=None):
+    """Subquery of (player_id, team_id, sums) rows for a season or all seasons.
+
+    A season reads player_season_stats; all seasons read the career rollup
+    plus the season rows not folded into it yet.
+    """
+    summed = ['games_played', 'wins'] + list(_stat_fields())
+
+    def stat_rows(model, *extra):
+        criteria = [model.simulation_id == simulation_id, *extra]
+        if game_type in ('regular', 'playoff'):
+            criteria.append(model.game_type == game_type)
+        if team_id:
+            criteria.append(model.team_id == team_id)
+        return select(
+            model.player_id, model.team_id, *[getattr(model, field) for field in summed]
+        ).where(*criteria)
+
+    if season:
+        return stat_rows(PlayerSeasonStat, PlayerSeasonStat.season == season).subquery()
+    folded = select(Simulation.career_stats_season).where(
+        Simulation.id == simulation_id
+    ).scalar_subquery()
+    return stat_rows(PlayerCareerStat).union_all(
+        stat_rows(PlayerSeasonStat, PlayerSeasonStat.season > folded)
+    ).subquery()
+
+
+# Leaderboard columns: player_season_stats sums plus the derived ratios
+SORT_COLUMNS = (
+    'games_played', 'goals', 'assists', 'points', 'plus_minus', 'hits', 'blocks', 'shots',
+    'time_on_ice', 'takeaways', 'giveaways', 'wins', 'saves', 'goals_against', 'shots_against',
+    'save_percentage', 'goals_against_average'
+)
+# Only meaningful for goalies - sorting by them lists goalies only
+GOALIE_COLUMNS = {'wins', 'saves', 'goals_against', 'shots_against', 'save_percentage', 'goals_against_average'}
+ASCENDING_BY_DEFAULT = {'goals_against_average'}
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """Opaque page token from the sort key values of the last row"""
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Sort key values of a page token; ValueError if it is not one of ours"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = [Decimal(value) for value in json.loads(raw)]
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise ValueError('Invalid cursor') from e
+    if len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def player_totals(simulation_id, game_type='regular', season=None, team_id=None, positions=None,
+                  sort_by=None, order=None, limit=100, cursor=None):
+    """One page of a simulation's player leaderboard, aggregated and sorted in SQL.
+
+    Without sort_by the stats page order is used: goalies by save
+    percentage, skaters by points. sort_by takes any of SORT_COLUMNS;
+    goalie columns only list goalies (with shots against for the ratios).
+    Pages are keyset-paginated on (sort value, player id): pass the
+    returned cursor to get the next page. Each player is shown with the
+    team they played the most games for. Filters apply to the season rows:
+    season (None for all seasons), game_type ('regular', 'playoff' or
+    'all'), team_id and positions. All seasons read the career rollup plus
+    the seasons not folded into it yet.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for an unknown sort column, order or cursor.
+    """
+    if sort_by is not None and sort_by not in SORT_COLUMNS:
+        raise ValueError(f'Unknown sort column: {sort_by}')
+    if order is None:
+        order = 'asc' if sort_by in ASCENDING_BY_DEFAULT else 'desc'
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    summed = ['games_played', 'wins'] + list(_stat_fields())
+    stats = _stat_source(simulation_id, game_type, season, team_id)
+
+    per_team = select(
+        stats.c.player_id,
+        stats.c.team_id,
+        *[func.sum(stats.c[field]).label(field) for field in summed]
+    ).group_by(stats.c.player_id, stats.c.team_id).subquery()
+
+    main_team = array_agg(aggregate_order_by(
+        per_team.c.team_id, per_team.c.games_played.desc(), per_team.c.team_id
+    ))[1]
+    totals = select(
+        per_team.c.player_id,
+        main_team.label('team_id'),
+        *[cast(func.sum(per_team.c[field]), Integer).label(field) for field in summed]
+    ).group_by(per_team.c.player_id).subquery()
+
+    is_goalie = Player.position == 'G'
+    save_percentage = func.round(cast(totals.c.saves, Numeric) * 100 / totals.c.shots_against, 3)
+    goals_against_average = cast(totals.c.goals_against, Numeric) / totals.c.games_played
+    points = totals.c.goals + totals.c.assists
+
+    filters = []
+    if positions:
+        filters.append(Player.position.in_(positions))
+    if sort_by is None:
+        # Stats page order - goalies by save percentage, skaters by points
+        sort_keys = [
+            case((and_(is_goalie, totals.c.shots_against > 0), save_percentage), else_=0),
+            case((is_goalie, 0), else_=points)
+        ]
+    else:
+        sort_keys = [{
+            'points': points,
+            'save_percentage': save_percentage,
+            'goals_against_average': goals_against_average,
+        }.get(sort_by, totals.c.get(sort_by))]
+        if sort_by in GOALIE_COLUMNS:
+            filters.append(is_goalie)
+        if sort_by in ('save_percentage', 'goals_against_average'):
+            filters.append(totals.c.shots_against > 0)
+    sort_keys.append(Player.id)
+
+    if cursor is not None:
+        after = decode_cursor(cursor, len(sort_keys))
+        key_tuple = tuple_(*sort_keys)
+        filters.append(key_tuple > tuple(after) if order == 'asc' else key_tuple < tuple(after))
+
+    direction = asc if order == 'asc' else desc
+    query = select(
+        Player.id.label('player_id'),
+        Player.name.label('player_name'),
+        Player.position,
+        Player.is_goalie,
+        Player.off,
+        Player.def_.label('def_val'),
+        Player.phys,
+        Player.lead,
+        Player.const,
+        totals.c.team_id,
+        Team.name.label('team_name'),
+        *[totals.c[field] for field in summed],
+        *[key.label(f'sort_key_{i}') for i, key in enumerate(sort_keys)]
+    ).join(totals, totals.c.player_id == Player.id)\
+     .join(Team, Team.id == totals.c.team_id)\
+     .where(*filters)\
+     .order_by(*[direction(key) for key in sort_keys])\
+     .limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[f'sort_key_{i}'] for i in range(len(sort_keys))])
+    return rows, next_cursor
+
+
+# Player stat columns summed per team; shots_against and saves come from the goalies
+TEAM_STAT_FIELDS = ('shots', 'hits', 'blocks', 'takeaways', 'giveaways', 'saves', 'shots_against')
+
+
+def _team_games(simulation_id, season):
+    """One row per (team, simulated game) from that team's side of the score"""
+    criteria = [Game.simulation_id == simulation_id, Game.simulated.is_(True)]
+    if season:
+        criteria.append(Game.season == season)
+
+    def side(team, goals_for, goals_against, is_home):
+        return select(
+            team.label('team_id'),
+            literal(is_home).label('is_home'),
+            Game.is_playoff,
+            Game.went_to_overtime,
+            Game.went_to_shootout,
+            goals_for.label('goals_for'),
+            goals_against.label('goals_against')
+        ).where(*criteria)
+
+    return side(Game.home_team_id, Game.home_score, Game.away_score, True).union_all(
+        side(Game.away_team_id, Game.away_score, Game.home_score, False)
+    ).subquery()
+
+
+def team_totals(simulation_id, season=None, game_type='regular'):
+    """Per-team aggregates for a season (None for all seasons), one row per team.
+
+    Skater and goalie totals are summed from the materialized player stats
+    (see _stat_source); records come from one pass over the games, split
+    home/away, overtime and shootout. game_type ('regular', 'playoff' or
+    'all') selects the games of both; the playoff_* columns always cover
+    the playoffs, with series from playoff_series.
+    """
+    stats = _stat_source(simulation_id, game_type, season)
+    team_stats = select(
+        stats.c.team_id,
+        *[func.sum(stats.c[field]).label(field) for field in TEAM_STAT_FIELDS]
+    ).group_by(stats.c.team_id).subquery()
+
+    games = _team_games(simulation_id, season)
+    won = games.c.goals_for > games.c.goals_against
+    lost = games.c.goals_for < games.c.goals_against
+    playoff = games.c.is_playoff.is_(True)
+    # Same rule as the standings: regular season overtime/shootout losses are OTL
+    ot_loss = and_(lost, games.c.went_to_overtime.is_(True), ~playoff)
+    selected = {'regular': ~playoff, 'playoff': playoff}.get(game_type, true())
+    overtime = and_(games.c.went_to_overtime.is_(True), games.c.went_to_shootout.is_(False))
+    shootout = games.c.went_to_shootout.is_(True)
+
+    def count(*conditions):
+        return func.count().filter(and_(*conditions))
+
+    def goals(column, *conditions):
+        return func.coalesce(func.sum(column).filter(and_(*conditions)), 0)
+
+    splits = {'': [], 'home_': [games.c.is_home], 'away_': [~games.c.is_home]}
+    record_columns = [count(selected).label('games_played')]
+    for prefix, split in splits.items():
+        record_columns += [
+            count(selected, *split, won).label(f'{prefix}wins'),
+            count(selected, *split, lost, ~ot_loss).label(f'{prefix}losses'),
+            count(selected, *split, ot_loss).label(f'{prefix}ot_losses'),
+            goals(games.c.goals_for, selected, *split).label(f'{prefix}goals_for'),
+            goals(games.c.goals_against, selected, *split).label(f'{prefix}goals_against'),
+        ]
+    record_columns += [
+        count(selected, overtime, won).label('overtime_wins'),
+        count(selected, overtime, lost).label('overtime_losses'),
+        count(selected, shootout, won).label('shootout_wins'),
+        count(selected, shootout, lost).label('shootout_losses'),
+        count(playoff).label('playoff_games_played'),
+        count(playoff, won).label('playoff_wins'),
+        count(playoff, lost).label('playoff_losses'),
+        count(playoff, games.c.went_to_overtime.is_(True), won).label('playoff_overtime_wins'),
+        count(playoff, games.c.went_to_overtime.is_(True), lost).label('playoff_overtime_losses'),
+    ]
+    records = select(games.c.team_id, *record_columns).group_by(games.c.team_id).subquery()
+
+    series_criteria = [PlayoffSeries.simulation_id == simulation_id, PlayoffSeries.status == 'complete']
+    if season:
+        series_criteria.append(PlayoffSeries.season == season)
+    series_sides = select(PlayoffSeries.higher_seed_team_id.label('team_id'), PlayoffSeries.winner_team_id)\
+        .where(*series_criteria)\
+        .union_all(
+            select(PlayoffSeries.lower_seed_team_id, PlayoffSeries.winner_team_id).where(*series_criteria)
+        ).subquery()
+    series = select(
+        series_sides.c.team_id,
+        count(series_sides.c.winner_team_id == series_sides.c.team_id).label('playoff_series_won'),
+        count(series_sides.c.winner_team_id != series_sides.c.team_id).label('playoff_series_lost')
+    ).group_by(series_sides.c.team_id).subquery()
+
+    query = select(
+        Team.id.label('team_id'),
+        Team.name.label('team_name'),
+        *[func.coalesce(team_stats.c[field], 0).label(field) for field in TEAM_STAT_FIELDS],
+        *[func.coalesce(column, 0).label(column.name)
+          for column in records.c if column.name != 'team_id'],
+        *[func.coalesce(column, 0).label(column.name)
+          for column in series.c if column.name != 'team_id'],
+    ).outerjoin(team_stats, team_stats.c.team_id == Team.id)\
+     .outerjoin(records, records.c.team_id == Team.id)\
+     .outerjoin(series, series.c.team_id == Team.id)\
+     .where(Team.simulation_id == simulation_id)\
+     .order_by(Team.name, Team.id)
+    return db.session.execute(query).all()
@@ -5,9 +5,14 @@ from models.game import PlayoffSeries, Standing
 from models.team import Team
 from models.player import Player
 from sqlalchemy import func, desc
+from services.simulation_service import bump_data_version
 
-def award_trophies(simulation_id, season):
-    """Award all trophies for a completed season"""
+def award_trophies(simulation_id, season, commit=True):
+    """Award all trophies for a completed season.
+    
+    With commit=False the trophies join the caller's transaction (used by
+    the season rollover so both commit together).
+    """
     # Check if trophies already awarded for this season
     existing = Trophy.query.filter_by(
         simulation_id=simulation_id,
@@ -133,7 +138,9 @@ def award_trophies(simulation_id, season):
         db.session.add(trophy)
         trophies_awarded.append('Conn Smythe Trophy')
     
-    db.session.commit()
+    bump_data_version(simulation_id)
+    if commit:
+        db.session.commit()
     
     return {
         'message': f'Awarded {len(trophies_awarded)} trophies',
@@ -3,7 +3,7 @@
 import { useState, useEffect, useRef } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import Link from 'next/link';
-import api from '@/lib/api';
+import api, { streamSimulationProgress, SimulationProgressEvent } from '@/lib/api';
 import { Simulation, Standing } from '@/lib/types';
 import DashboardLayout from '@/app/components/DashboardLayout';
 
@@ -17,9 +17,15 @@ export default function SimulationPage() {
   const [loading, setLoading] = useState(true);
   const [simulating, setSimulating] = useState(false);
   const [simulationProgress, setSimulationProgress] = useState<{
+    stage?: SimulationProgressEvent['stage'];
     games_simulated: number;
     total_games: number;
     percentage: number;
+    current_date?: string;
+    latest_scores?: SimulationProgressEvent['latest_scores'];
+    season_number?: number;
+    seasons_total?: number;
+    last_champion?: string | null;
   } | null>(null);
   
   // Season complete animation state
@@ -113,82 +119,62 @@ export default function SimulationPage() {
     }
   };
 
-  const simulateToPlayoffs = async () => {
+  // Runs the simulation as a background job and follows the pushed progress stream
+  const runSimulation = async (endpoint: 'simulate-to-playoffs' | 'simulate-season' | 'simulate-seasons') => {
     setSimulating(true);
-    
-    // Get initial progress to show total games
-    try {
-      const initialProgress = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-      setSimulationProgress(initialProgress.data);
-    } catch (error) {
-      console.error('Failed to get initial progress', error);
-      setSimulationProgress({ games_simulated: 0, total_games: 0, percentage: 0 });
-    }
-    
-    // Start polling for progress
-    const progressInterval = setInterval(async () => {
-      try {
-        const progressResponse = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-        setSimulationProgress(progressResponse.data);
-      } catch (error) {
-        console.error('Failed to get progress', error);
+    setSimulationProgress({ games_simulated: 0, total_games: 0, percentage: 0 });
+
+    const stream = streamSimulationProgress(simulationId, (event) => {
+      if (event.type !== 'progress') {
+        return;
       }
-    }, 300); // Poll every 300ms for smoother updates
-    
-    try {
-      await api.post(`/api/simulations/${simulationId}/simulate-to-playoffs`);
-      clearInterval(progressInterval);
-      // Get final progress
-      const finalProgress = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-      setSimulationProgress(finalProgress.data);
-      await loadSimulation();
-    } catch (error) {
-      console.error('Simulation failed', error);
-      clearInterval(progressInterval);
-    } finally {
-      setSimulating(false);
-      setSimulationProgress(null);
-    }
-  };
+      if (event.stage === 'seasons') {
+        // Multi-season runs report each finished season; keep the game progress as is
+        setSimulationProgress((previous) => previous && {
+          ...previous,
+          season_number: event.games_simulated,
+          seasons_total: event.total_games ?? undefined,
+          last_champion: event.champion,
+        });
+        return;
+      }
+      setSimulationProgress((previous) => ({
+        stage: event.stage,
+        games_simulated: event.games_simulated ?? 0,
+        total_games: event.total_games ?? 0,
+        percentage: event.percentage ?? 0,
+        current_date: event.current_date,
+        latest_scores: event.latest_scores,
+        season_number: event.season_number,
+        seasons_total: event.seasons_total,
+        last_champion: previous?.last_champion,
+      }));
+    });
 
-  const simulateSeason = async () => {
-    setSimulating(true);
-    
-    // Get initial progress to show total games
     try {
-      const initialProgress = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-      setSimulationProgress(initialProgress.data);
-    } catch (error) {
-      console.error('Failed to get initial progress', error);
-      setSimulationProgress({ games_simulated: 0, total_games: 0, percentage: 0 });
-    }
-    
-    // Start polling for progress
-    const progressInterval = setInterval(async () => {
-      try {
-        const progressResponse = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-        setSimulationProgress(progressResponse.data);
-      } catch (error) {
-        console.error('Failed to get progress', error);
+      // Subscribe before starting so no progress is missed
+      await stream.ready;
+      await api.post(`/api/simulations/${simulationId}/${endpoint}`, { background: true });
+      const finished = await stream.finished;
+      if (finished?.status === 'failed') {
+        console.error('Simulation failed', finished.error);
       }
-    }, 300); // Poll every 300ms for smoother updates
-    
-    try {
-      await api.post(`/api/simulations/${simulationId}/simulate-season`);
-      clearInterval(progressInterval);
-      // Get final progress
-      const finalProgress = await api.get(`/api/simulations/${simulationId}/simulation-progress`);
-      setSimulationProgress(finalProgress.data);
       await loadSimulation();
     } catch (error) {
       console.error('Simulation failed', error);
-      clearInterval(progressInterval);
+      stream.close();
     } finally {
       setSimulating(false);
       setSimulationProgress(null);
     }
   };
 
+  const simulateToPlayoffs = () => runSimulation('simulate-to-playoffs');
+
+  const simulateSeason = () => runSimulation('simulate-season');
+
+  const simulateRemainingSeasons = () => runSimulation('simulate-seasons');
+
   const enterPlayoffs = async () => {
     setSimulating(true);
     try {
@@ -305,13 +291,36 @@ export default function SimulationPage() {
                 >
                   {simulating ? 'Simulating...' : 'Simulate Full Season'}
                 </button>
+
+                <button
+                  onClick={simulateRemainingSeasons}
+                  disabled={simulating || simulation?.status !== 'season'}
+                  className="btn btn-secondary w-full text-lg py-4 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {simulating ? 'Simulating...' : 'Simulate Remaining Seasons'}
+                </button>
               </div>
 
               {simulating && simulationProgress && (
                 <div className="mt-6 bg-primary-500/10 border border-primary-500/20 p-4 rounded-lg">
+                  {(simulationProgress.seasons_total ?? 0) > 1 && (
+                    <div className="mb-2 flex items-center justify-between text-sm text-dark-text">
+                      <span>Season {simulationProgress.season_number} of {simulationProgress.seasons_total}</span>
+                      {simulationProgress.last_champion && (
+                        <span className="text-dark-text-muted">Last champion: {simulationProgress.last_champion}</span>
+                      )}
+                    </div>
+                  )}
                   <div className="mb-2 flex items-center justify-between text-sm">
-                    <span className="text-primary-400 font-medium">Simulating games...</span>
-                    {simulationProgress.total_games > 0 ? (
+                    <span className="text-primary-400 font-medium">
+                      {simulationProgress.stage === 'playoffs' ? 'Simulating playoffs...' : 'Simulating games...'}
+                      {simulationProgress.current_date && ` (${simulationProgress.current_date})`}
+                    </span>
+                    {simulationProgress.stage === 'playoffs' ? (
+                      <span className="text-primary-400">
+                        {simulationProgress.games_simulated} playoff games
+                      </span>
+                    ) : simulationProgress.total_games > 0 ? (
                       <span className="text-primary-400">
                         {simulationProgress.games_simulated} / {simulationProgress.total_games} games
                       </span>
@@ -336,6 +345,18 @@ export default function SimulationPage() {
                       <div className="bg-primary-500 h-full animate-pulse" style={{ width: '30%' }}></div>
                     </div>
                   )}
+                  {simulationProgress.latest_scores && simulationProgress.latest_scores.length > 0 && (
+                    <ul className="mt-3 space-y-1 text-xs text-dark-text-muted">
+                      {simulationProgress.latest_scores.map((score, idx) => (
+                        <li key={idx} className="flex justify-between">
+                          <span>
+                            {score.away_team} {score.away_score} @ {score.home_team} {score.home_score}
+                          </span>
+                          <span>{score.date}</span>
+                        </li>
+                      ))}
+                    </ul>
+                  )}
                 </div>
               )}
             </div>
@@ -27,6 +27,8 @@ export default function StatsPage() {
   const simulationId = params.id;
 
   const [stats, setStats] = useState<PlayerStats[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [teams, setTeams] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
   const [sortBy, setSortBy] = useState('points');
@@ -43,7 +45,7 @@ export default function StatsPage() {
     if (teams.length > 0) {
       loadStats();
     }
-  }, [positionFilter, teamFilter, viewMode, gameType]);
+  }, [positionFilter, teamFilter, viewMode, gameType, sortBy]);
 
   const loadTeams = async () => {
     try {
@@ -61,15 +63,21 @@ export default function StatsPage() {
     }
   };
 
-  const loadStats = async () => {
+  // Sorting and paging happen on the server; `cursor` fetches the page after the last one loaded
+  const loadStats = async (cursor?: string) => {
     try {
-      setLoading(true);
-      const queryParams: Record<string, string> = {};
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
+      const queryParams: Record<string, string> = { sort_by: sortBy };
       
       if (viewMode === 'skaters') {
-        if (positionFilter === 'forward' || positionFilter === 'defenseman') {
-          queryParams.position_filter = positionFilter;
-        }
+        queryParams.position_filter =
+          positionFilter === 'forward' || positionFilter === 'defenseman' ? positionFilter : 'skater';
+      } else {
+        queryParams.position_filter = 'goalie';
       }
       
       if (teamFilter !== 'all') {
@@ -80,27 +88,26 @@ export default function StatsPage() {
       if (gameType !== 'all') {
         queryParams.game_type = gameType;
       }
+
+      if (cursor) {
+        queryParams.cursor = cursor;
+      }
       
       const queryString = new URLSearchParams(queryParams).toString();
       const url = `/api/stats/season/${simulationId}${queryString ? '?' + queryString : ''}`;
       const response = await api.get(url);
-      setStats(response.data.stats);
+      setStats((previous) => (cursor ? [...previous, ...response.data.stats] : response.data.stats));
+      setNextCursor(response.data.next_cursor ?? null);
     } catch (error) {
       console.error('Failed to load stats', error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  // Filter stats by position
-  const skaterStats = stats.filter(s => s.position !== 'G');
-  const goalieStats = stats.filter(s => s.position === 'G');
-
-  const sortedStats = [...(viewMode === 'skaters' ? skaterStats : goalieStats)].sort((a, b) => {
-    const aVal = (a as any)[sortBy] || 0;
-    const bVal = (b as any)[sortBy] || 0;
-    return bVal - aVal;
-  });
+  // Already sorted by the server; the roster fallback (no games yet) lists everyone
+  const sortedStats = stats.filter(s => (viewMode === 'skaters' ? s.position !== 'G' : s.position === 'G'));
 
   if (loading) {
     return (
@@ -330,6 +337,17 @@ export default function StatsPage() {
                   </tbody>
                 </table>
               </div>
+              {nextCursor && (
+                <div className="p-3 text-center">
+                  <button
+                    className="px-4 py-2 rounded text-sm bg-dark-surface text-dark-text disabled:opacity-50"
+                    disabled={loadingMore}
+                    onClick={() => loadStats(nextCursor)}
+                  >
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         </div>
@@ -58,4 +58,95 @@ api.interceptors.response.use(
   }
 );
 
+export interface SimulationProgressEvent {
+  type: 'progress' | 'finished';
+  stage?: 'regular_season' | 'playoffs' | 'seasons';
+  games_simulated?: number;
+  total_games?: number | null;
+  percentage?: number | null;
+  current_date?: string;
+  latest_scores?: {
+    date: string;
+    home_team: string;
+    away_team: string;
+    home_score: number;
+    away_score: number;
+  }[];
+  season?: number;
+  season_number?: number;  // Multi-season runs: position of the season in the run
+  seasons_total?: number;
+  champion?: string | null;  // 'seasons' events: cup winner of the season just finished
+  status?: 'completed' | 'failed' | 'cancelled';
+  error?: string | null;
+}
+
+/**
+ * Open the server-sent progress stream of a simulation.
+ *
+ * Uses fetch instead of EventSource so the auth header can be sent.
+ * Resolves `ready` once the server has registered the subscriber, and
+ * `finished` with the final event when the run ends.
+ */
+export function streamSimulationProgress(
+  simulationId: string | string[],
+  onEvent: (event: SimulationProgressEvent) => void
+) {
+  const controller = new AbortController();
+  const token = Cookies.get('token');
+  let resolveReady: () => void;
+  let rejectReady: (error: unknown) => void;
+  const ready = new Promise<void>((resolve, reject) => {
+    resolveReady = resolve;
+    rejectReady = reject;
+  });
+
+  const finished = (async () => {
+    const response = await fetch(`${api.defaults.baseURL}/api/simulations/${simulationId}/progress-stream`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal: controller.signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Progress stream failed: ${response.status}`);
+    }
+    resolveReady();
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        return null;
+      }
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; lines starting with ':' are keepalives
+      let boundary: number;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const data = block
+          .split('\n')
+          .filter((line) => line.startsWith('data:'))
+          .map((line) => line.slice(5).trim())
+          .join('\n');
+        if (!data) {
+          continue;
+        }
+        const event: SimulationProgressEvent = JSON.parse(data);
+        onEvent(event);
+        if (event.type === 'finished') {
+          controller.abort();
+          return event;
+        }
+      }
+    }
+  })().catch((error) => {
+    rejectReady(error);
+    throw error;
+  });
+
+  return { ready, finished, close: () => controller.abort() };
+}
+
 export default api;
@@ -3,8 +3,11 @@ use rand::Rng;
 use rand::distributions::WeightedIndex;
 use rand::prelude::*;
 use clap::Parser;
+use std::collections::HashMap;
 use std::fs;
-use std::io::{self, Read};
+use std::io::{self, BufRead, Read, Write};
+
+mod wire;
 
 #[derive(Parser, Debug)]
 #[command(author, version, about, long_about = None)]
@@ -16,6 +19,14 @@ struct Args {
     /// Output JSON file (use '-' for stdout)
     #[arg(short, long, default_value = "-")]
     output: String,
+
+    /// Run as a long-lived worker: one JSON request per stdin line, one JSON result per stdout line
+    #[arg(long, default_value_t = false)]
+    serve: bool,
+
+    /// Wire format for --serve: "json" (line per message) or "packed" (length-prefixed binary, see wire.rs)
+    #[arg(long, default_value = "json")]
+    wire: String,
 }
 
 #[derive(Debug, Deserialize, Serialize, Clone)]
@@ -70,6 +81,33 @@ struct GameInput {
     home_team: Team,
     away_team: Team,
     is_playoff: bool,
+    /// Seed for this game's RNG; the same seed and teams give the same result
+    #[serde(default)]
+    seed: Option<u64>,
+}
+
+/// A slate of games sharing one team table, so each team is sent once per batch
+#[derive(Debug, Deserialize, Serialize)]
+struct BatchInput {
+    teams: Vec<Team>,
+    games: Vec<BatchGame>,
+}
+
+#[derive(Debug, Deserialize, Serialize)]
+struct BatchGame {
+    home_team_id: i32,
+    away_team_id: i32,
+    #[serde(default)]
+    is_playoff: bool,
+    #[serde(default)]
+    seed: Option<u64>,
+}
+
+#[derive(Debug, Deserialize)]
+#[serde(untagged)]
+enum EngineRequest {
+    Batch(BatchInput),
+    Single(GameInput),
 }
 
 #[derive(Debug, Clone, Copy)]
@@ -188,6 +226,11 @@ struct GameResult {
     went_to_shootout: bool,
 }
 
+#[derive(Debug, Serialize)]
+struct BatchResult {
+    results: Vec<GameResult>,
+}
+
 // Ice time percentages (in seconds for a 60-minute game = 3600 seconds)
 const GAME_LENGTH_SECONDS: i32 = 3600;
 const FORWARD_LINE_TIME: [f64; 4] = [0.35, 0.30, 0.20, 0.15];
@@ -397,9 +440,26 @@ fn calculate_netfront_presence(team: &Team) -> f64 {
     presence.min(1.35)  // Cap at +35%
 }
 
+#[derive(Debug, Serialize)]
+struct ErrorResponse {
+    error: String,
+}
+
 fn main() {
     let args = Args::parse();
     
+    if args.serve {
+        match args.wire.as_str() {
+            "json" => serve(),
+            "packed" => serve_packed(),
+            other => {
+                eprintln!("Unknown wire format: {}", other);
+                std::process::exit(2);
+            }
+        }
+        return;
+    }
+    
     // Read input
     let input_json = if args.input == "-" {
         let mut buffer = String::new();
@@ -409,16 +469,19 @@ fn main() {
         fs::read_to_string(&args.input).expect("Failed to read input file")
     };
     
-    // Parse input
-    let game_input: GameInput = serde_json::from_str(&input_json)
+    // Parse input (single game or batch)
+    let request: EngineRequest = serde_json::from_str(&input_json)
         .expect("Failed to parse JSON input");
     
-    // Simulate game
-    let result = simulate_game(game_input);
-    
-    // Output result
-    let output_json = serde_json::to_string_pretty(&result)
-        .expect("Failed to serialize result");
+    // Simulate and serialize result
+    let output_json = match request {
+        EngineRequest::Single(game_input) => serde_json::to_string_pretty(&simulate_single(&game_input)),
+        EngineRequest::Batch(batch) => {
+            let results = simulate_batch(&batch).unwrap_or_else(|e| panic!("{}", e));
+            serde_json::to_string_pretty(&results)
+        }
+    }
+    .expect("Failed to serialize result");
     
     if args.output == "-" {
         println!("{}", output_json);
@@ -427,24 +490,111 @@ fn main() {
     }
 }
 
-fn simulate_game(input: GameInput) -> GameResult {
-    let mut rng = rand::thread_rng();
+/// Worker loop used by the Python engine pool. Bad requests are answered with an
+/// error line instead of exiting, so one malformed game does not kill the worker.
+fn serve() {
+    let stdin = io::stdin();
+    let stdout = io::stdout();
+    let mut out = stdout.lock();
+    
+    for line in stdin.lock().lines() {
+        let line = match line {
+            Ok(line) => line,
+            Err(_) => break,
+        };
+        if line.trim().is_empty() {
+            continue;
+        }
+        
+        let response = match serde_json::from_str::<EngineRequest>(&line) {
+            Ok(EngineRequest::Single(game_input)) => serde_json::to_string(&simulate_single(&game_input)),
+            Ok(EngineRequest::Batch(batch)) => match simulate_batch(&batch) {
+                Ok(results) => serde_json::to_string(&results),
+                Err(error) => serde_json::to_string(&ErrorResponse { error }),
+            },
+            Err(e) => serde_json::to_string(&ErrorResponse {
+                error: format!("Failed to parse JSON input: {}", e),
+            }),
+        }
+        .expect("Failed to serialize result");
+        
+        // Parent closed the pipe - shut down quietly
+        if writeln!(out, "{}", response).and_then(|_| out.flush()).is_err() {
+            break;
+        }
+    }
+}
+
+/// Worker loop for the packed binary format: one framed batch in, one framed result out
+fn serve_packed() {
+    let stdin = io::stdin();
+    let stdout = io::stdout();
+    let mut input = stdin.lock();
+    let mut out = stdout.lock();
+    
+    loop {
+        let frame = match wire::read_frame(&mut input) {
+            Ok(Some(frame)) => frame,
+            Ok(None) | Err(_) => break,
+        };
+        
+        let response = match wire::decode_batch(&frame) {
+            Ok(batch) => match simulate_batch(&batch) {
+                Ok(results) => wire::encode_results(&results),
+                Err(error) => wire::encode_error(&error),
+            },
+            Err(error) => wire::encode_error(&format!("Failed to decode request: {}", error)),
+        };
+        
+        // Parent closed the pipe - shut down quietly
+        if wire::write_frame(&mut out, &response).is_err() {
+            break;
+        }
+    }
+}
+
+fn simulate_single(input: &GameInput) -> GameResult {
+    simulate_game(&input.home_team, &input.away_team, input.is_playoff, input.seed)
+}
+
+/// Simulate every game of a batch against the shared team table, in order
+fn simulate_batch(batch: &BatchInput) -> Result<BatchResult, String> {
+    let teams: HashMap<i32, &Team> = batch.teams.iter().map(|t| (t.id, t)).collect();
+    
+    let mut results = Vec::with_capacity(batch.games.len());
+    for game in &batch.games {
+        let home_team = teams.get(&game.home_team_id)
+            .ok_or_else(|| format!("Unknown home team id {} in batch", game.home_team_id))?;
+        let away_team = teams.get(&game.away_team_id)
+            .ok_or_else(|| format!("Unknown away team id {} in batch", game.away_team_id))?;
+        results.push(simulate_game(home_team, away_team, game.is_playoff, game.seed));
+    }
+    
+    Ok(BatchResult { results })
+}
+
+fn simulate_game(home_team: &Team, away_team: &Team, is_playoff: bool, seed: Option<u64>) -> GameResult {
+    // Seeded games are reproducible regardless of batch or worker placement
+    let mut rng = match seed {
+        Some(seed) => StdRng::seed_from_u64(seed),
+        None => StdRng::from_entropy(),
+    };
     
     // Select goalies for this game (60% G1, 40% G2)
-    let home_goalie_idx = select_goalie(&input.home_team, &mut rng);
-    let away_goalie_idx = select_goalie(&input.away_team, &mut rng);
+    let home_goalie_idx = select_goalie(home_team, &mut rng);
+    let away_goalie_idx = select_goalie(away_team, &mut rng);
     
     // Get play style modifiers
-    let home_style = get_style_modifiers(&input.home_team.play_style);
-    let away_style = get_style_modifiers(&input.away_team.play_style);
+    let home_style = get_style_modifiers(&home_team.play_style);
+    let away_style = get_style_modifiers(&away_team.play_style);
     
     // Calculate team ratings
-    let home_rating = calculate_team_rating(&input.home_team, home_goalie_idx, true, input.is_playoff);
-    let away_rating = calculate_team_rating(&input.away_team, away_goalie_idx, false, input.is_playoff);
+    let home_rating = calculate_team_rating(home_team, home_goalie_idx, true, is_playoff);
+    let away_rating = calculate_team_rating(away_team, away_goalie_idx, false, is_playoff);
     
     // Initialize stats with TOI (only for players who play this game)
-    let mut home_stats = init_team_stats(&input.home_team, home_goalie_idx);
-    let mut away_stats = init_team_stats(&input.away_team, away_goalie_idx);
+    let mut home_stats = init_team_stats(home_team, home_goalie_idx);
+    let mut away_stats = init_team_stats(away_team, away_goalie_idx);
     
     let mut home_score = 0;
     let mut away_score = 0;
@@ -452,15 +602,15 @@ fn simulate_game(input: GameInput) -> GameResult {
     // Simulate 3 periods
     for _period in 1..=3 {
         let (h_goals, a_goals) = simulate_period(
-            &input.home_team,
-            &input.away_team,
+            home_team,
+            away_team,
             home_goalie_idx,
             away_goalie_idx,
             home_rating,
             away_rating,
             &home_style,
             &away_style,
-            input.is_playoff,
+            is_playoff,
             &mut home_stats,
             &mut away_stats,
             &mut rng,
@@ -474,12 +624,12 @@ fn simulate_game(input: GameInput) -> GameResult {
     let mut went_to_shootout = false;
     
     // Handle ties
-    if home_score == away_score && !input.is_playoff {
+    if home_score == away_score && !is_playoff {
         went_to_overtime = true;
         
         let (h_ot, a_ot) = simulate_overtime(
-            &input.home_team,
-            &input.away_team,
+            home_team,
+            away_team,
             home_goalie_idx,
             away_goalie_idx,
             home_rating,
@@ -498,8 +648,8 @@ fn simulate_game(input: GameInput) -> GameResult {
         if home_score == away_score {
             went_to_shootout = true;
             let (h_so, a_so) = simulate_shootout(
-                &input.home_team,
-                &input.away_team,
+                home_team,
+                away_team,
                 home_rating,
                 away_rating,
                 &mut rng,
@@ -507,14 +657,14 @@ fn simulate_game(input: GameInput) -> GameResult {
             home_score += h_so;
             away_score += a_so;
         }
-    } else if home_score == away_score && input.is_playoff {
+    } else if home_score == away_score && is_playoff {
         went_to_overtime = true;
         
         // Playoff OT - sudden death until someone scores
         loop {
             let (h_ot, a_ot) = simulate_overtime(
-                &input.home_team,
-                &input.away_team,
+                home_team,
+                away_team,
                 home_goalie_idx,
                 away_goalie_idx,
                 home_rating,
@@ -550,7 +700,7 @@ fn simulate_game(input: GameInput) -> GameResult {
     }
 }
 
-fn select_goalie(team: &Team, rng: &mut ThreadRng) -> usize {
+fn select_goalie(team: &Team, rng: &mut StdRng) -> usize {
     let goalie_indices: Vec<usize> = team.lines.iter()
         .enumerate()
         .filter(|(_, la)| la.line_type == "goalie")
@@ -766,7 +916,7 @@ fn simulate_period(
     is_playoff: bool,
     home_stats: &mut Vec<PlayerGameStat>,
     away_stats: &mut Vec<PlayerGameStat>,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) -> (i32, i32) {
     let mut home_goals = 0;
     let mut away_goals = 0;
@@ -924,7 +1074,7 @@ fn simulate_play(
     defender_intimidation: f64,
     attacker_leadership: f64,
     attacker_netfront: f64,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) -> Option<(bool, usize, Option<usize>, Option<usize>)> {
     // 25% of plays result in a shot attempt (calibrated for ~28-30 shots/team/game)
     if rng.gen::<f64>() > SHOT_ATTEMPT_RATE {
@@ -1019,7 +1169,7 @@ fn simulate_play(
     Some((is_goal, shooter_idx, primary_assist, secondary_assist))
 }
 
-fn select_shooter_weighted(team: &Team, rng: &mut ThreadRng) -> (usize, i32) {
+fn select_shooter_weighted(team: &Team, rng: &mut StdRng) -> (usize, i32) {
     // Exponential weighting: ice_time^1.5 * (off/80)^1.3
     let weights: Vec<f64> = team.lines.iter()
         .map(|la| {
@@ -1056,7 +1206,7 @@ fn select_shooter_weighted(team: &Team, rng: &mut ThreadRng) -> (usize, i32) {
     (idx, line_num)
 }
 
-fn get_shot_quality(line_num: i32, player_off: i32, style: &PlayStyleModifiers, rng: &mut ThreadRng) -> ShotQuality {
+fn get_shot_quality(line_num: i32, player_off: i32, style: &PlayStyleModifiers, rng: &mut StdRng) -> ShotQuality {
     // Base high-danger chance by line
     let base_hd_chance = match line_num {
         1 => 0.40,
@@ -1084,7 +1234,7 @@ fn get_shot_quality(line_num: i32, player_off: i32, style: &PlayStyleModifiers,
 }
 
 /// Shot quality with defender DEF rating suppression and player type bonus
-fn get_shot_quality_with_defense(line_num: i32, player_off: i32, player_type: &str, style: &PlayStyleModifiers, defender_def: f64, rng: &mut ThreadRng) -> ShotQuality {
+fn get_shot_quality_with_defense(line_num: i32, player_off: i32, player_type: &str, style: &PlayStyleModifiers, defender_def: f64, rng: &mut StdRng) -> ShotQuality {
     // Base high-danger chance by line
     let base_hd_chance = match line_num {
         1 => 0.40,
@@ -1170,7 +1320,7 @@ fn get_player_type_shot_quality_modifier(player_type: &str) -> f64 {
     }
 }
 
-fn select_assist_player(team: &Team, shooter_idx: usize, line_num: i32, rng: &mut ThreadRng) -> Option<usize> {
+fn select_assist_player(team: &Team, shooter_idx: usize, line_num: i32, rng: &mut StdRng) -> Option<usize> {
     let shooter_type = &team.lines[shooter_idx].line_type;
     
     // Primary assist: prefer same position type (forwards assist forwards, D assists D)
@@ -1240,7 +1390,7 @@ fn select_assist_player(team: &Team, shooter_idx: usize, line_num: i32, rng: &mu
     Some(candidates[dist.sample(rng)])
 }
 
-fn select_secondary_assist(team: &Team, shooter_idx: usize, primary_idx: Option<usize>, line_num: i32, rng: &mut ThreadRng) -> Option<usize> {
+fn select_secondary_assist(team: &Team, shooter_idx: usize, primary_idx: Option<usize>, line_num: i32, rng: &mut StdRng) -> Option<usize> {
     let shooter_type = &team.lines[shooter_idx].line_type;
     
     // Secondary assist: 50% chance to cross position (often D-man feeding play)
@@ -1316,7 +1466,7 @@ fn simulate_physical_stats(
     team: &Team,
     style: &PlayStyleModifiers,
     is_playoff: bool,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) {
     for (line_idx, la) in team.lines.iter().enumerate() {
         if la.line_type == "goalie" {
@@ -1390,7 +1540,7 @@ fn simulate_physical_stats(
 fn simulate_turnovers(
     stats: &mut Vec<PlayerGameStat>,
     team: &Team,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) {
     for (line_idx, la) in team.lines.iter().enumerate() {
         if la.line_type == "goalie" {
@@ -1464,7 +1614,7 @@ fn simulate_overtime(
     is_playoff: bool,
     home_stats: &mut Vec<PlayerGameStat>,
     away_stats: &mut Vec<PlayerGameStat>,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) -> (i32, i32) {
     let mut home_goals = 0;
     let mut away_goals = 0;
@@ -1592,7 +1742,7 @@ fn simulate_ot_play(
     defender_intimidation: f64,
     attacker_leadership: f64,
     attacker_netfront: f64,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) -> Option<(bool, usize, Option<usize>, Option<usize>)> {
     // Higher shot rate in 3-on-3 OT (35% vs 25% regular)
     if rng.gen::<f64>() > 0.35 {
@@ -1673,7 +1823,7 @@ fn simulate_shootout(
     away_team: &Team,
     home_rating: f64,
     away_rating: f64,
-    rng: &mut ThreadRng,
+    rng: &mut StdRng,
 ) -> (i32, i32) {
     let mut home_goals = 0;
     let mut away_goals = 0;
@@ -1712,7 +1862,7 @@ fn simulate_shootout(
     (home_goals, away_goals)
 }
 
-fn select_best_shooter(team: &Team, rng: &mut ThreadRng) -> usize {
+fn select_best_shooter(team: &Team, rng: &mut StdRng) -> usize {
     let forward_indices: Vec<usize> = team.lines.iter()
         .enumerate()
         .filter(|(_, la)| la.line_type == "forward")
@@ -0,0 +1,225 @@
+//! Packed binary wire format for `--serve --wire packed`.
+//!
+//! Every request and response is a frame: a little-endian u32 byte length
+//! followed by the payload. All integers are little-endian. Strings are a u8
+//! byte length followed by UTF-8 bytes. Players are identified by id only;
+//! names, team names and cities are not sent. The Python side of this layout
+//! lives in backend/services/engine_wire.py - keep the two in sync.
+//!
+//! Request (always a batch):
+//!   u16 team count, then per team:
+//!     i32 id, str play_style, u8 has_coach,
+//!     [i32 coach id, i16 rating, str coach_type]  (only if has_coach)
+//!     u16 line count, then per line:
+//!       str line_type, i16 line_number, str position,
+//!       i32 player id, str player position, str player_type,
+//!       i16 off, i16 def, i16 phys, i16 lead, i16 const
+//!   u32 game count, then per game:
+//!     i32 home_team_id, i32 away_team_id, u8 flags (1 = playoff, 2 = seeded), u64 seed
+//!
+//! Response:
+//!   u8 status: 0 = ok, 1 = error (rest of the frame is a UTF-8 message)
+//!   u32 game count, then per game:
+//!     i16 home_score, i16 away_score, u8 flags (1 = overtime, 2 = shootout),
+//!     u16 home stat count, u16 away stat count, then home and away stats:
+//!       i32 player_id, i16 goals, assists, shots, hits, blocks, plus_minus,
+//!       time_on_ice, takeaways, giveaways, saves, goals_against, shots_against
+
+use std::io::{self, Read, Write};
+
+use crate::{BatchGame, BatchInput, BatchResult, Coach, LineAssignment, Player, PlayerGameStat, Team};
+
+const STATUS_OK: u8 = 0;
+const STATUS_ERROR: u8 = 1;
+
+const GAME_PLAYOFF: u8 = 1;
+const GAME_SEEDED: u8 = 2;
+
+const RESULT_OVERTIME: u8 = 1;
+const RESULT_SHOOTOUT: u8 = 2;
+
+/// Read one frame; Ok(None) on a clean end of input
+pub fn read_frame(input: &mut impl Read) -> io::Result<Option<Vec<u8>>> {
+    let mut len_bytes = [0u8; 4];
+    match input.read_exact(&mut len_bytes) {
+        Ok(()) => {}
+        Err(e) if e.kind() == io::ErrorKind::UnexpectedEof => return Ok(None),
+        Err(e) => return Err(e),
+    }
+    let mut payload = vec![0u8; u32::from_le_bytes(len_bytes) as usize];
+    input.read_exact(&mut payload)?;
+    Ok(Some(payload))
+}
+
+pub fn write_frame(out: &mut impl Write, payload: &[u8]) -> io::Result<()> {
+    out.write_all(&(payload.len() as u32).to_le_bytes())?;
+    out.write_all(payload)?;
+    out.flush()
+}
+
+struct Reader<'a> {
+    buf: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> Reader<'a> {
+    fn take(&mut self, n: usize) -> Result<&'a [u8], String> {
+        if self.pos + n > self.buf.len() {
+            return Err(format!("Truncated request at byte {}", self.pos));
+        }
+        let bytes = &self.buf[self.pos..self.pos + n];
+        self.pos += n;
+        Ok(bytes)
+    }
+
+    fn u8(&mut self) -> Result<u8, String> {
+        Ok(self.take(1)?[0])
+    }
+
+    fn i16(&mut self) -> Result<i16, String> {
+        Ok(i16::from_le_bytes(self.take(2)?.try_into().unwrap()))
+    }
+
+    fn u16(&mut self) -> Result<u16, String> {
+        Ok(u16::from_le_bytes(self.take(2)?.try_into().unwrap()))
+    }
+
+    fn i32(&mut self) -> Result<i32, String> {
+        Ok(i32::from_le_bytes(self.take(4)?.try_into().unwrap()))
+    }
+
+    fn u32(&mut self) -> Result<u32, String> {
+        Ok(u32::from_le_bytes(self.take(4)?.try_into().unwrap()))
+    }
+
+    fn u64(&mut self) -> Result<u64, String> {
+        Ok(u64::from_le_bytes(self.take(8)?.try_into().unwrap()))
+    }
+
+    fn string(&mut self) -> Result<String, String> {
+        let len = self.u8()? as usize;
+        String::from_utf8(self.take(len)?.to_vec()).map_err(|e| format!("Invalid string: {}", e))
+    }
+}
+
+pub fn decode_batch(buf: &[u8]) -> Result<BatchInput, String> {
+    let mut r = Reader { buf, pos: 0 };
+
+    let team_count = r.u16()?;
+    let mut teams = Vec::with_capacity(team_count as usize);
+    for _ in 0..team_count {
+        let id = r.i32()?;
+        let play_style = r.string()?;
+        let coach = if r.u8()? != 0 {
+            Some(Coach {
+                id: r.i32()?,
+                name: String::new(),
+                rating: r.i16()? as i32,
+                coach_type: r.string()?,
+            })
+        } else {
+            None
+        };
+
+        let line_count = r.u16()?;
+        let mut lines = Vec::with_capacity(line_count as usize);
+        for _ in 0..line_count {
+            let line_type = r.string()?;
+            let line_number = r.i16()? as i32;
+            let position = r.string()?;
+            let player = Player {
+                id: r.i32()?,
+                name: String::new(),
+                position: r.string()?,
+                player_type: r.string()?,
+                off: r.i16()? as i32,
+                def: r.i16()? as i32,
+                phys: r.i16()? as i32,
+                lead: r.i16()? as i32,
+                consistency: r.i16()? as i32,
+            };
+            lines.push(LineAssignment { line_type, line_number, position, player });
+        }
+
+        teams.push(Team {
+            id,
+            name: String::new(),
+            city: String::new(),
+            lines,
+            coach,
+            play_style,
+        });
+    }
+
+    let game_count = r.u32()?;
+    let mut games = Vec::with_capacity(game_count as usize);
+    for _ in 0..game_count {
+        let home_team_id = r.i32()?;
+        let away_team_id = r.i32()?;
+        let flags = r.u8()?;
+        let seed = r.u64()?;
+        games.push(BatchGame {
+            home_team_id,
+            away_team_id,
+            is_playoff: flags & GAME_PLAYOFF != 0,
+            seed: if flags & GAME_SEEDED != 0 { Some(seed) } else { None },
+        });
+    }
+
+    if r.pos != buf.len() {
+        return Err(format!("{} trailing bytes in request", buf.len() - r.pos));
+    }
+    Ok(BatchInput { teams, games })
+}
+
+pub fn encode_results(batch: &BatchResult) -> Vec<u8> {
+    let mut out = Vec::with_capacity(5 + batch.results.len() * 1024);
+    out.push(STATUS_OK);
+    out.extend_from_slice(&(batch.results.len() as u32).to_le_bytes());
+
+    for result in &batch.results {
+        out.extend_from_slice(&(result.home_score as i16).to_le_bytes());
+        out.extend_from_slice(&(result.away_score as i16).to_le_bytes());
+        let mut flags = 0u8;
+        if result.went_to_overtime {
+            flags |= RESULT_OVERTIME;
+        }
+        if result.went_to_shootout {
+            flags |= RESULT_SHOOTOUT;
+        }
+        out.push(flags);
+        out.extend_from_slice(&(result.home_stats.len() as u16).to_le_bytes());
+        out.extend_from_slice(&(result.away_stats.len() as u16).to_le_bytes());
+        for stat in result.home_stats.iter().chain(result.away_stats.iter()) {
+            encode_stat(stat, &mut out);
+        }
+    }
+    out
+}
+
+fn encode_stat(stat: &PlayerGameStat, out: &mut Vec<u8>) {
+    out.extend_from_slice(&stat.player_id.to_le_bytes());
+    for value in [
+        stat.goals,
+        stat.assists,
+        stat.shots,
+        stat.hits,
+        stat.blocks,
+        stat.plus_minus,
+        stat.time_on_ice,
+        stat.takeaways,
+        stat.giveaways,
+        stat.saves,
+        stat.goals_against,
+        stat.shots_against,
+    ] {
+        out.extend_from_slice(&(value as i16).to_le_bytes());
+    }
+}
+
+pub fn encode_error(message: &str) -> Vec<u8> {
+    let mut out = Vec::with_capacity(1 + message.len());
+    out.push(STATUS_ERROR);
+    out.extend_from_slice(message.as_bytes());
+    out
+}